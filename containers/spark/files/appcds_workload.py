@@ -0,0 +1,96 @@
+"""Representative driver workload used to record the AppCDS class list, and a startup probe.
+
+``appcds_workload.py`` runs the local-mode equivalent of the compose smoke jobs
+(DataFrame/SQL, Parquet, an Iceberg table with a schema change and snapshot
+expiry, and loading the S3A/AWS SDK classes) so the class list covers what
+short jobs touch. ``appcds_workload.py startup`` only creates a SparkSession and
+prints how long that took and which CDS archive, if any, the JVM mapped.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from pyspark.sql import SparkSession
+
+# Classes the S3A smoke jobs load; forName keeps the build offline.
+S3A_CLASSES = (
+    "org.apache.hadoop.fs.s3a.S3AFileSystem",
+    "org.apache.hadoop.fs.s3a.commit.magic.MagicS3GuardCommitter",
+    "org.apache.spark.internal.io.cloud.PathOutputCommitProtocol",
+    "software.amazon.awssdk.services.s3.S3Client",
+    "software.amazon.awssdk.services.s3.S3AsyncClient",
+    "software.amazon.awssdk.auth.credentials.DefaultCredentialsProvider",
+    "software.amazon.awssdk.http.apache.ApacheHttpClient",
+)
+
+
+def startup() -> int:
+    spark = SparkSession.builder.appName("appcds-startup").getOrCreate()
+    ready = time.time_ns()
+    try:
+        jvm = spark.sparkContext._jvm
+        # STARTED_NS is taken before spark-submit, so the launcher JVM counts too.
+        started = os.environ.get("STARTED_NS")
+        if not started:
+            started = jvm.java.lang.management.ManagementFactory.getRuntimeMXBean().getStartTime() * 1_000_000
+        started = int(started)
+        diagnostics = jvm.java.lang.management.ManagementFactory.getPlatformMXBean(
+            jvm.java.lang.Class.forName("com.sun.management.HotSpotDiagnosticMXBean")
+        )
+        # With -Xshare:auto a stale archive silently turns sharing off, so check both flags.
+        mapped = diagnostics.getVMOption("UseSharedSpaces").getValue() == "true"
+        archive = diagnostics.getVMOption("SharedArchiveFile").getValue()
+        print(
+            json.dumps(
+                {
+                    "seconds_to_session": round((ready - started) / 1e9, 3),
+                    "cds_archive": archive if mapped and archive else None,
+                }
+            )
+        )
+        return 0
+    finally:
+        spark.stop()
+
+
+def workload() -> int:
+    warehouse = tempfile.mkdtemp(prefix="appcds-")
+    spark = (
+        SparkSession.builder.appName("appcds-workload")
+        .config("spark.sql.catalog.local", "org.apache.iceberg.spark.SparkCatalog")
+        .config("spark.sql.catalog.local.type", "hadoop")
+        .config("spark.sql.catalog.local.warehouse", f"file://{warehouse}/iceberg")
+        .getOrCreate()
+    )
+    try:
+        jvm = spark.sparkContext._jvm
+        loader = jvm.java.lang.Thread.currentThread().getContextClassLoader()
+        for name in S3A_CLASSES:
+            jvm.java.lang.Class.forName(name, True, loader)
+
+        df = spark.range(0, 10000).selectExpr("id", "id % 7 AS bucket", "cast(id AS string) AS name")
+        df.write.mode("overwrite").partitionBy("bucket").parquet(f"{warehouse}/parquet")
+        total = spark.read.parquet(f"{warehouse}/parquet").groupBy("bucket").count().agg({"count": "sum"}).collect()
+        if total[0][0] != 10000:
+            raise RuntimeError("parquet round trip returned unexpected rows")
+
+        spark.sql("CREATE DATABASE IF NOT EXISTS local.smoke")
+        spark.sql("CREATE TABLE local.smoke.appcds (id INT, name STRING) USING iceberg")
+        spark.sql("INSERT INTO local.smoke.appcds VALUES (1, 'alpha'), (2, 'beta')")
+        spark.sql("ALTER TABLE local.smoke.appcds ADD COLUMN category STRING")
+        spark.sql("INSERT INTO local.smoke.appcds VALUES (3, 'gamma', 'delta')")
+        spark.sql("SELECT * FROM local.smoke.appcds ORDER BY id").collect()
+        spark.sql(
+            "CALL local.system.expire_snapshots(table => 'local.smoke.appcds', "
+            "older_than => TIMESTAMP '2999-01-01 00:00:00', retain_last => 1)"
+        )
+        print("AppCDS workload OK")
+        return 0
+    finally:
+        spark.stop()
+
+
+if __name__ == "__main__":
+    raise SystemExit(startup() if sys.argv[1:] == ["startup"] else workload())
@@ -0,0 +1,70 @@
+# shellcheck shell=bash
+# AppCDS support shared by entrypoint.sh and healthcheck.sh.
+#
+# The image bakes a static CDS archive for the SparkSubmit JVM. The JVM only maps
+# it when the runtime class path starts with the dump-time class path and every
+# directory on that prefix is empty, so the archive is dumped with an empty
+# SPARK_CONF_DIR. The image's own configuration is then passed explicitly, and the
+# conf directory moves behind the jars via SPARK_DIST_CLASSPATH. Any other conf dir
+# (a custom SPARK_CONF_DIR, or files mounted over $SPARK_HOME/conf) is left in place
+# and the archive is skipped, because Spark reads more from SPARK_CONF_DIR than
+# those files, e.g. cluster-mode submission ships it to the driver and executors.
+
+SPARK_CDS_DIR="${SPARK_CDS_DIR:-$SPARK_HOME/cds}"
+SPARK_CDS_ARCHIVE="${SPARK_CDS_ARCHIVE:-$SPARK_CDS_DIR/spark.jsa}"
+SPARK_CDS_ARGS=()
+
+# Jar names and sizes of $SPARK_HOME/jars; the archive is only valid for the set it was dumped from.
+spark_cds_fingerprint() {
+  find "$SPARK_HOME/jars" -maxdepth 1 -name '*.jar' -printf '%f %s\n' | LC_ALL=C sort | sha256sum | cut -d' ' -f1
+}
+
+# Usage: spark_cds_conf_fingerprint <dir>. Digest of every file under a conf dir; the
+# archive is only used with the configuration recorded next to it at build time.
+spark_cds_conf_fingerprint() {
+  [[ -d "$1" ]] || return 0
+  (cd "$1" && find . -type f -print0 | LC_ALL=C sort -z | xargs -0 -r sha256sum) | sha256sum | cut -d' ' -f1
+}
+
+# Usage: spark_cds_enable "$@" (the spark-submit arguments). Sets SPARK_CDS_ARGS and
+# exports the environment that lets SparkSubmit map the archive. It does nothing
+# when SPARK_CDS=off, when the archive is missing or stale, when the conf dir is
+# not the one baked into the image, or when the arguments would put entries in
+# front of the archived class path.
+spark_cds_enable() {
+  SPARK_CDS_ARGS=()
+  [[ "${SPARK_CDS:-auto}" != "off" && -f "$SPARK_CDS_ARCHIVE" ]] || return 0
+  [[ -z "${SPARK_CLASSPATH:-}" ]] || return 0
+  local arg properties=""
+  for arg in "$@"; do
+    case "$arg" in
+      --driver-class-path | --driver-class-path=* | *spark.driver.extraClassPath*) return 0 ;;
+      --properties-file | --properties-file=*) properties="set" ;;
+    esac
+  done
+  [[ "$(spark_cds_fingerprint)" == "$(cat "$SPARK_CDS_ARCHIVE.classpath" 2>/dev/null)" ]] || return 0
+
+  local conf_dir="${SPARK_CONF_DIR:-$SPARK_HOME/conf}"
+  if [[ "$(spark_cds_conf_fingerprint "$conf_dir")" != "$(cat "$SPARK_CDS_ARCHIVE.conf" 2>/dev/null)" ]]; then
+    echo "AppCDS archive not used: $conf_dir differs from the image's configuration (set SPARK_CDS=off to silence)" >&2
+    return 0
+  fi
+  if [[ -f "$conf_dir/spark-env.sh" ]]; then
+    set -a
+    # shellcheck disable=SC1091
+    . "$conf_dir/spark-env.sh"
+    set +a
+  fi
+  export SPARK_ENV_LOADED=1
+  export SPARK_CONF_DIR="$SPARK_CDS_DIR/conf"
+  export SPARK_DIST_CLASSPATH="$conf_dir${SPARK_DIST_CLASSPATH:+:$SPARK_DIST_CLASSPATH}"
+  local opts="-XX:SharedArchiveFile=$SPARK_CDS_ARCHIVE -Xshare:auto"
+  if [[ -f "$conf_dir/log4j2.properties" && "${SPARK_SUBMIT_OPTS:-}" != *log4j2.configurationFile* ]]; then
+    opts+=" -Dlog4j2.configurationFile=file:$conf_dir/log4j2.properties"
+  fi
+  export SPARK_SUBMIT_OPTS="${SPARK_SUBMIT_OPTS:+$SPARK_SUBMIT_OPTS }$opts"
+  if [[ -z "$properties" && -f "$conf_dir/spark-defaults.conf" ]]; then
+    # shellcheck disable=SC2034  # read by entrypoint.sh and healthcheck.sh
+    SPARK_CDS_ARGS=(--properties-file "$conf_dir/spark-defaults.conf")
+  fi
+}
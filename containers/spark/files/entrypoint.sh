@@ -1,8 +1,49 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
+SPARK_LIB_DIR="${SPARK_LIB_DIR:-/usr/local/lib/spark}"
+
 if [[ "${1:-}" == "spark-submit" ]]; then
   shift
 fi
 
-exec "$SPARK_HOME/bin/spark-submit" "$@"
+# shellcheck source=tuning.sh
+. "$SPARK_LIB_DIR/tuning.sh"
+# shellcheck source=profiles.sh
+. "$SPARK_LIB_DIR/profiles.sh"
+# shellcheck source=iostats.sh
+. "$SPARK_LIB_DIR/iostats.sh"
+print_tuning=""
+if [[ "${1:-}" == "--print-tuning" ]]; then
+  shift
+  print_tuning=1
+fi
+case "${SPARK_MODE:-submit}" in
+  submit) ;;
+  connect)
+    # A long-lived Spark Connect server; the arguments are extra spark-submit options.
+    set -- --class org.apache.spark.sql.connect.service.SparkConnectServer --name "Spark Connect server" \
+      --conf "spark.connect.grpc.binding.port=${SPARK_CONNECT_PORT:-15002}" "$@"
+    ;;
+  *)
+    echo "unknown SPARK_MODE: ${SPARK_MODE} (submit, connect)" >&2
+    exit 1
+    ;;
+esac
+spark_iostats "$@"
+set -- "${SPARK_IOSTATS_SUBMIT_ARGS[@]}"
+spark_tuning "$@"
+spark_profiles "$@"
+if [[ -n "$print_tuning" ]]; then
+  printf '%s\n' "${SPARK_TUNING_REPORT[@]}" "${SPARK_PROFILE_REPORT[@]}" "${SPARK_IOSTATS_REPORT[@]}"
+  printf 'spark-submit'
+  printf ' %q' "${SPARK_TUNING_ARGS[@]}" "${SPARK_PROFILE_ARGS[@]}" "${SPARK_IOSTATS_ARGS[@]}" "$@"
+  printf '\n'
+  exit 0
+fi
+
+# shellcheck source=cds.sh
+. "$SPARK_LIB_DIR/cds.sh"
+spark_cds_enable "$@"
+
+exec "$SPARK_HOME/bin/spark-submit" "${SPARK_CDS_ARGS[@]}" "${SPARK_TUNING_ARGS[@]}" "${SPARK_PROFILE_ARGS[@]}" "${SPARK_IOSTATS_ARGS[@]}" "$@"
@@ -1,9 +1,121 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-if ! "$SPARK_HOME/bin/spark-submit" --version >/dev/null 2>&1; then
-  echo "spark-submit failed"
-  exit 1
-fi
+# SPARK_HEALTHCHECK_MODE selects how much work each probe does:
+#   static  installation only: spark-submit, JAVA_HOME and the Spark jars (no JVM)
+#   driver  static, plus the driver UI REST API when a SparkSubmit driver is running (default)
+#   cached  static, plus `spark-submit --version` at most once per SPARK_HEALTHCHECK_CACHE_SECONDS
+#   full    `spark-submit --version` on every probe
+# With SPARK_MODE=connect, driver mode also requires the Spark Connect port to accept connections.
+mode="${SPARK_HEALTHCHECK_MODE:-driver}"
 
-echo "spark runtime healthy"
+static_check() {
+  if [[ ! -x "$SPARK_HOME/bin/spark-submit" ]]; then
+    echo "spark-submit missing under $SPARK_HOME"
+    exit 1
+  fi
+  if [[ ! -x "${JAVA_HOME:-}/bin/java" ]]; then
+    echo "java missing under JAVA_HOME=${JAVA_HOME:-}"
+    exit 1
+  fi
+  if ! compgen -G "$SPARK_HOME/jars/spark-core_*.jar" >/dev/null; then
+    echo "spark-core jar missing under $SPARK_HOME/jars"
+    exit 1
+  fi
+}
+
+full_check() {
+  # shellcheck source=cds.sh
+  . "${SPARK_LIB_DIR:-/usr/local/lib/spark}/cds.sh"
+  spark_cds_enable --version
+  "$SPARK_HOME/bin/spark-submit" --version >/dev/null 2>&1
+}
+
+driver_check() {
+  if ! pgrep -f org.apache.spark.deploy.SparkSubmit >/dev/null; then
+    return 0
+  fi
+  local url="${SPARK_HEALTHCHECK_UI_URL:-http://127.0.0.1:4040}"
+  local authority="${url#http://}"
+  authority="${authority%%/*}"
+  local host="${authority%%:*}" port="${authority##*:}"
+  [[ "$port" != "$authority" ]] || port=80
+  # Bash's /dev/tcp keeps the probe free of curl and of a Python interpreter.
+  local status rc=0
+  # shellcheck disable=SC2016  # $1/$2 expand in the child bash
+  status="$(
+    timeout "${SPARK_HEALTHCHECK_TIMEOUT:-5}" bash -c '
+      {
+        printf "GET /api/v1/applications HTTP/1.0\r\nHost: %s\r\n\r\n" "$1" >&3
+        head -n 1 <&3
+      } 3<>"/dev/tcp/$1/$2" || exit 2
+    ' _ "$host" "$port" 2>/dev/null
+  )" || rc=$?
+  if ((rc == 2)); then
+    # Nothing listening: the UI is disabled or not up yet; the driver process is alive.
+    return 0
+  fi
+  if ((rc != 0)); then
+    echo "driver UI at $url did not answer within ${SPARK_HEALTHCHECK_TIMEOUT:-5}s"
+    exit 1
+  fi
+  if [[ "$status" != *" 200 "* ]]; then
+    echo "driver UI at $url returned: ${status%$'\r'}"
+    exit 1
+  fi
+}
+
+connect_check() {
+  local port="${SPARK_CONNECT_PORT:-15002}"
+  # shellcheck disable=SC2016  # $1 expands in the child bash
+  if ! timeout "${SPARK_HEALTHCHECK_TIMEOUT:-5}" bash -c ': 3<>"/dev/tcp/127.0.0.1/$1"' _ "$port" 2>/dev/null; then
+    echo "Spark Connect server is not accepting connections on port $port"
+    exit 1
+  fi
+}
+
+cached_check() {
+  local state="${SPARK_HEALTHCHECK_STATE:-/tmp/spark-healthcheck.state}"
+  local window="${SPARK_HEALTHCHECK_CACHE_SECONDS:-300}"
+  local now checked=0 status=1
+  now="$(date +%s)"
+  if [[ -r "$state" ]]; then
+    read -r checked status <"$state" || true
+  fi
+  if ((now - checked >= window)); then
+    checked="$now" status=0
+    full_check || status=$?
+    printf '%s %s\n' "$now" "$status" >"$state.tmp" && mv -f "$state.tmp" "$state"
+  fi
+  if [[ "$status" != "0" ]]; then
+    echo "spark-submit failed (checked at $(date -d "@$checked" +%FT%T 2>/dev/null || echo "$checked"))"
+    exit 1
+  fi
+}
+
+case "$mode" in
+  static) static_check ;;
+  driver)
+    static_check
+    if [[ "${SPARK_MODE:-submit}" == "connect" ]]; then
+      connect_check
+    fi
+    driver_check
+    ;;
+  cached)
+    static_check
+    cached_check
+    ;;
+  full)
+    if ! full_check; then
+      echo "spark-submit failed"
+      exit 1
+    fi
+    ;;
+  *)
+    echo "unknown SPARK_HEALTHCHECK_MODE: $mode (static, driver, cached, full)"
+    exit 1
+    ;;
+esac
+
+echo "spark runtime healthy ($mode)"
@@ -0,0 +1,74 @@
+# shellcheck shell=bash
+# Opt-in Hadoop/S3A IOStatistics capture (SPARK_IOSTATS=<dir, s3a:// prefix or ->).
+#
+# Sourced by entrypoint.sh. spark_iostats "$@" copies the spark-submit arguments
+# into SPARK_IOSTATS_SUBMIT_ARGS, replacing a local Python primary resource with
+# iostats_hook.py followed by the original script, so the hook can dump the
+# statistics when the application stops. SPARK_IOSTATS_ARGS adds
+# fs.iostatistics.logging.level so every JVM also logs its totals when its
+# filesystems close, which is the only record from remote executors and JVM apps.
+
+SPARK_IOSTATS_ARGS=()
+SPARK_IOSTATS_SUBMIT_ARGS=()
+SPARK_IOSTATS_REPORT=()
+
+spark_iostats() {
+  SPARK_IOSTATS_ARGS=()
+  SPARK_IOSTATS_SUBMIT_ARGS=("$@")
+  SPARK_IOSTATS_REPORT=()
+  [[ -n "${SPARK_IOSTATS:-}" && "${SPARK_IOSTATS}" != "off" ]] || return 0
+
+  local -a args=("$@")
+  local i arg value primary="" deploy_mode="client" log_level="" name=""
+  for ((i = 0; i < ${#args[@]}; i++)); do
+    arg="${args[i]}" value=""
+    case "$arg" in
+      --version | --help | -h | --kill | --status) return 0 ;;
+      --verbose | -v | --supervise) continue ;;
+      --*=*) value="${arg#*=}" arg="${arg%%=*}" ;;
+      # Every other spark-submit option takes a value.
+      -*)
+        ((i += 1))
+        value="${args[i]:-}"
+        ;;
+      *)
+        # Everything after the primary resource belongs to the application.
+        primary="$i"
+        break
+        ;;
+    esac
+    case "$arg $value" in
+      "--deploy-mode "*) deploy_mode="$value" ;;
+      "--conf spark.submit.deployMode="* | "-c spark.submit.deployMode="*) deploy_mode="${value#*=}" ;;
+      "--conf spark.hadoop.fs.iostatistics.logging.level="* | "-c spark.hadoop.fs.iostatistics.logging.level="*) log_level="user" ;;
+      "--name "* | "--conf spark.app.name="* | "-c spark.app.name="*) name="user" ;;
+    esac
+  done
+
+  if [[ -z "$log_level" ]]; then
+    SPARK_IOSTATS_ARGS+=(--conf "spark.hadoop.fs.iostatistics.logging.level=${SPARK_IOSTATS_LOG_LEVEL:-warn}")
+  fi
+  SPARK_IOSTATS_REPORT+=("iostats=${SPARK_IOSTATS}")
+  if [[ -z "$primary" ]]; then
+    return 0
+  fi
+  local app="${args[primary]}"
+  app="${app#local:}"
+  app="${app#file:}"
+  [[ "$app" != ///* ]] || app="${app#//}"
+  if [[ "$deploy_mode" == "cluster" || "$app" != *.py || "$app" == *://* ]]; then
+    # The hook has to run in this container, next to a local Python driver.
+    SPARK_IOSTATS_REPORT+=("iostats.hook=skipped (${args[primary]})")
+    return 0
+  fi
+  # Keep the default application name from the script rather than the hook.
+  [[ -n "$name" ]] || SPARK_IOSTATS_ARGS+=(--name "$(basename "$app")")
+  # shellcheck disable=SC2034  # read by entrypoint.sh
+  SPARK_IOSTATS_SUBMIT_ARGS=(
+    "${args[@]:0:primary}"
+    "${SPARK_IOSTATS_HOOK:-${SPARK_LIB_DIR:-/usr/local/lib/spark}/iostats_hook.py}"
+    "$app"
+    "${args[@]:primary+1}"
+  )
+  SPARK_IOSTATS_REPORT+=("iostats.hook=$app")
+}
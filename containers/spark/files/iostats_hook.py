@@ -0,0 +1,179 @@
+"""Runs a PySpark application and dumps Hadoop/S3A IOStatistics when it finishes.
+
+entrypoint.sh starts ``iostats_hook.py <app.py> [args...]`` in place of the app
+when SPARK_IOSTATS is set. The hook runs the app unchanged and, when the app
+stops its SparkContext (or exits without stopping it), snapshots the
+IOStatistics of every FileSystem instance cached in the driver JVM. That covers
+S3A request counts, retries, throttles, bytes, committer counters and
+min/mean/max request durations. It writes one JSON document per application
+to SPARK_IOSTATS: a local directory, a ``s3a://`` prefix, or ``-`` for stderr.
+
+In local mode the executors share the driver's FileSystem instances, so their
+I/O is included. Executors on other hosts log their own totals when their
+FileSystems close, via ``fs.iostatistics.logging.level``.
+"""
+import json
+import os
+import runpy
+import sys
+import time
+
+STARTED = time.time()
+_dumped = set()
+
+
+def summarize(snapshot: dict) -> dict:
+    """Condense an IOStatisticsSnapshot JSON document into the numbers investigations start from."""
+    counters = snapshot.get("counters") or {}
+    latency = {}
+    for key, mean in sorted((snapshot.get("meanstatistics") or {}).items()):
+        samples = mean.get("samples", 0)
+        if not key.endswith(".mean") or not samples:
+            continue
+        name = key[: -len(".mean")]
+        latency[name] = {
+            "count": samples,
+            "mean_ms": round(mean.get("sum", 0) / samples, 3),
+            "min_ms": (snapshot.get("minimums") or {}).get(f"{name}.min"),
+            "max_ms": (snapshot.get("maximums") or {}).get(f"{name}.max"),
+        }
+    return {
+        "requests": {
+            key: value for key, value in sorted(counters.items()) if value and "request" in key and "." not in key
+        },
+        "failures": {key: value for key, value in sorted(counters.items()) if value and key.endswith(".failures")},
+        "retries": counters.get("store_io_retry", 0),
+        "throttles": sum(value for key, value in counters.items() if "throttled" in key and "." not in key),
+        "bytes_read": counters.get("stream_read_bytes", 0),
+        "bytes_written": counters.get("stream_write_bytes", 0),
+        "committer": {key: value for key, value in sorted(counters.items()) if value and key.startswith("committer_")},
+        "latency": latency,
+    }
+
+
+def totals(filesystems: dict) -> dict:
+    result = {"requests": 0, "failures": 0, "retries": 0, "throttles": 0, "bytes_read": 0, "bytes_written": 0}
+    for entry in filesystems.values():
+        summary = entry["summary"]
+        result["requests"] += sum(summary["requests"].values())
+        result["failures"] += sum(summary["failures"].values())
+        for key in ("retries", "throttles", "bytes_read", "bytes_written"):
+            result[key] += summary[key]
+    return result
+
+
+def _cached_filesystems(jvm, conf) -> list:
+    """Every FileSystem in Hadoop's cache; falls back to the default FS if the cache cannot be read."""
+    try:
+        field = jvm.java.lang.Class.forName("org.apache.hadoop.fs.FileSystem").getDeclaredField("CACHE")
+        field.setAccessible(True)
+        cache = field.get(None)
+        entries = cache.getClass().getDeclaredField("map")
+        entries.setAccessible(True)
+        return list(entries.get(cache).values())
+    except Exception:  # noqa: BLE001 - reflection is best effort across Hadoop versions
+        return [jvm.org.apache.hadoop.fs.FileSystem.get(conf)]
+
+
+def collect(sc) -> dict:
+    jvm = sc._jvm
+    support = jvm.org.apache.hadoop.fs.statistics.IOStatisticsSupport
+    serializer = jvm.org.apache.hadoop.fs.statistics.IOStatisticsSnapshot.serializer()
+    snapshots = {}
+    for fs in _cached_filesystems(jvm, sc._jsc.hadoopConfiguration()):
+        stats = support.retrieveIOStatistics(fs)
+        if stats is None:
+            continue
+        uri = fs.getUri().toString()
+        if uri in snapshots:
+            # One instance per (URI, user); fold them together.
+            snapshots[uri].aggregate(stats)
+        else:
+            snapshots[uri] = support.snapshotIOStatistics(stats)
+    filesystems = {}
+    for uri, snapshot in sorted(snapshots.items()):
+        raw = json.loads(serializer.toJson(snapshot))
+        filesystems[uri] = {"summary": summarize(raw), "iostatistics": raw}
+    return {
+        "app_id": sc.applicationId,
+        "app_name": sc.appName,
+        "master": sc.master,
+        "started": STARTED,
+        "finished": time.time(),
+        "seconds": round(time.time() - STARTED, 3),
+        "totals": totals(filesystems),
+        "filesystems": filesystems,
+    }
+
+
+def write(sc, report: dict, destination: str) -> str:
+    payload = json.dumps(report, indent=2, sort_keys=True)
+    if destination == "-":
+        print(payload, file=sys.stderr)
+        return destination
+    name = f"iostats-{report['app_id']}.json"
+    if "://" in destination and not destination.startswith("file:"):
+        target = f"{destination.rstrip('/')}/{name}"
+        jvm = sc._jvm
+        path = jvm.org.apache.hadoop.fs.Path(target)
+        stream = path.getFileSystem(sc._jsc.hadoopConfiguration()).create(path, True)
+        try:
+            stream.write(bytearray(payload.encode("utf-8")))
+        finally:
+            stream.close()
+        return target
+    directory = destination[len("file:") :] if destination.startswith("file:") else destination
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, name)
+    with open(target, "w", encoding="utf-8") as handle:
+        handle.write(payload + "\n")
+    return target
+
+
+def dump(sc=None) -> None:
+    """Write the report for ``sc`` (default: the active context) once per application."""
+    from pyspark import SparkContext
+
+    sc = sc or SparkContext._active_spark_context
+    if sc is None:
+        return
+    try:
+        if sc.applicationId in _dumped:
+            return
+        _dumped.add(sc.applicationId)
+        target = write(sc, collect(sc), os.environ.get("SPARK_IOSTATS") or "-")
+        print(f"IOStatistics written to {target}", file=sys.stderr)
+    except Exception as exc:  # noqa: BLE001 - never fail the job over its statistics
+        print(f"IOStatistics capture failed: {exc}", file=sys.stderr)
+
+
+def main() -> None:
+    from pyspark import SparkContext
+
+    stop = SparkContext.stop
+
+    def stop_with_dump(self):
+        # Only the first stop of each context reports; later contexts get their own.
+        dump(self)
+        stop(self)
+
+    SparkContext.stop = stop_with_dump
+
+    app = sys.argv[1]
+    sys.argv = sys.argv[1:]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(app)))
+    try:
+        runpy.run_path(app, run_name="__main__")
+    except BaseException:
+        # sys.exit() or a crash without stopping Spark: report while the JVM is still up,
+        # then let the app's SystemExit (and so its exit status) or traceback through unchanged.
+        dump()
+        raise
+    else:
+        dump()
+    finally:
+        SparkContext.stop = stop
+
+
+if __name__ == "__main__":
+    main()
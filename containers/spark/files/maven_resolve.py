@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+"""Lock and install the Maven jars the Spark image adds on top of the Spark distribution.
+
+``lock`` walks the AWS SDK v2 module closure, adds the directly pinned jars
+(Iceberg, Hadoop client, JAXB, SLF4J, ...) and writes a lockfile with the sha256
+of every jar. ``install`` downloads exactly that set, in parallel, verifying both
+the published ``.sha1`` and the locked sha256, and refuses a ``--lock`` that does
+not exist; without ``--lock`` it resolves the same plan live. POMs and jars are
+fetched over pooled keep-alive connections and kept in a ``~/.m2``-style local
+repository so repeated builds (via a BuildKit cache mount) only touch the network
+for artifacts they have not seen before.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Set, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_REPO = "https://repo1.maven.org/maven2"
+AWS_GROUP = "software.amazon.awssdk"
+CHUNK_SIZE = 1024 * 1024
+LOCK_VERSION = 1
+
+# Build args that decide the jar set; a lockfile records them and install refuses a mismatch.
+LOCK_INPUTS = (
+    "SPARK_VERSION",
+    "HADOOP_VERSION",
+    "HADOOP_AWS_VERSION",
+    "AWS_SDK_BUNDLE_VERSION",
+    "AWS_SDK_MODULES",
+    "ICEBERG_VERSION",
+    "ICEBERG_RUNTIME_FLAVOR",
+    "JAXB_API_VERSION",
+    "JAXB_IMPL_VERSION",
+    "JAXB_CORE_VERSION",
+    "ACTIVATION_VERSION",
+    "SLF4J_API_VERSION",
+)
+
+# Modules whose POMs are missing for some SDK releases; their classes are split out of the bundle jar.
+BUNDLE_FALLBACKS: Dict[str, Tuple[str, bytes]] = {
+    "s3-transfer-manager": ("software/amazon/awssdk/transfer/", b"software.amazon.awssdk.transfer"),
+    "protocols-json": ("software/amazon/awssdk/protocols/json/", b"protocols.json"),
+    "protocols-jsoncore": ("software/amazon/awssdk/protocols/jsoncore/", b"protocols.jsoncore"),
+    "thirdparty-jackson-core": ("software/amazon/awssdk/thirdparty/jackson/core/", b"jackson.core"),
+    "thirdparty-slf4j-api": ("software/amazon/awssdk/thirdparty/org/slf4j/", b"org.slf4j"),
+}
+
+Coordinate = Tuple[str, str, str]
+
+
+class ChecksumError(RuntimeError):
+    pass
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections shared by worker threads, one idle stack per host."""
+
+    def __init__(self, max_idle: int = 8, timeout: float = 60.0) -> None:
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.opened = 0
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _checkout(self, key: Tuple[str, str]) -> http.client.HTTPConnection:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+            self.opened += 1
+        scheme, netloc = key
+        factory = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return factory(netloc, timeout=self.timeout)
+
+    def _checkin(self, key: Tuple[str, str], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def get(self, url: str) -> Iterator[bytes] | None:
+        """Stream the body of ``url`` in chunks, or return None on 404."""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):
+            conn = self._checkout(key)
+            try:
+                conn.request("GET", path, headers={"User-Agent": "maven-resolve/1", "Connection": "keep-alive"})
+                resp = conn.getresponse()
+                break
+            except (http.client.HTTPException, ConnectionError, OSError):
+                # A pooled connection the server already closed; retry once on a fresh one.
+                conn.close()
+                if attempt:
+                    raise
+        if resp.status == 404:
+            resp.read()
+            self._release(key, conn, resp)
+            return None
+        if resp.status != 200:
+            resp.read()
+            conn.close()
+            raise RuntimeError(f"GET {url} failed: HTTP {resp.status}")
+        return self._stream(key, conn, resp)
+
+    def _stream(self, key, conn, resp) -> Iterator[bytes]:
+        try:
+            while True:
+                chunk = resp.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        except BaseException:
+            conn.close()
+            raise
+        self._release(key, conn, resp)
+
+    def _release(self, key, conn, resp) -> None:
+        if resp.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+
+    def close(self) -> None:
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle.clear()
+
+
+class Repository:
+    """A remote Maven repository fronted by a checksum-verified local repository."""
+
+    def __init__(self, base_url: str, local_repo: Path, pool: ConnectionPool) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.local_repo = local_repo
+        self.pool = pool
+        self.stats = {"cached": 0, "downloaded": 0, "bytes": 0, "missing": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path(coord: Coordinate, extension: str) -> str:
+        group, artifact, version = coord
+        return f"{group.replace('.', '/')}/{artifact}/{version}/{artifact}-{version}.{extension}"
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def _remote_sha1(self, relpath: str) -> str:
+        chunks = self.pool.get(f"{self.base_url}/{relpath}.sha1")
+        if chunks is None:
+            raise ChecksumError(f"no .sha1 published for {relpath}")
+        # Some publishers append the file name after the digest.
+        return b"".join(chunks).decode("ascii", "replace").split()[0].strip().lower()
+
+    def fetch(self, coord: Coordinate, extension: str) -> Path | None:
+        """Return the local path of an artifact, downloading and verifying it when needed."""
+        relpath = self.path(coord, extension)
+        target = self.local_repo / relpath
+        sidecar = target.with_name(target.name + ".sha1")
+        if target.is_file() and sidecar.is_file():
+            if _sha1_file(target) == sidecar.read_text().strip():
+                self._count("cached")
+                return target
+
+        chunks = self.pool.get(f"{self.base_url}/{relpath}")
+        if chunks is None:
+            self._count("missing")
+            return None
+        target.parent.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha1()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+            expected = self._remote_sha1(relpath)
+            if digest.hexdigest() != expected:
+                raise ChecksumError(f"sha1 mismatch for {relpath}: got {digest.hexdigest()}, expected {expected}")
+            os.replace(tmp_name, target)
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+        sidecar.write_text(digest.hexdigest() + "\n")
+        self._count("downloaded")
+        self._count("bytes", size)
+        return target
+
+
+def _sha1_file(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _localname(tag: str) -> str:
+    return tag.split("}", 1)[-1]
+
+
+def parse_props(root: ET.Element, props: Dict[str, str]) -> None:
+    props_elem = root.find("./{*}properties")
+    if props_elem is None:
+        return
+    for child in list(props_elem):
+        props[_localname(child.tag)] = (child.text or "").strip()
+
+
+def parse_deps(root: ET.Element) -> List[Dict[str, str]]:
+    deps = []
+    deps_elem = root.find("./{*}dependencies")
+    if deps_elem is None:
+        return deps
+    for dep in deps_elem.findall("./{*}dependency"):
+        deps.append({_localname(child.tag): (child.text or "").strip() for child in list(dep)})
+    return deps
+
+
+def resolve_version(value: str | None, props: Dict[str, str]) -> str | None:
+    if not value:
+        return None
+    match = re.match(r"^\$\{([^}]+)\}$", value)
+    if match:
+        return props.get(match.group(1))
+    return value
+
+
+def _skipped(group: str, artifact: str) -> bool:
+    # Spark ships its own SLF4J API and binding; the SDK's copies would conflict.
+    return group == "org.slf4j" and artifact.startswith("slf4j-")
+
+
+class Resolver:
+    """Walk the runtime dependency closure of AWS SDK modules, fetching POMs in parallel."""
+
+    def __init__(self, repo: Repository, version: str, jobs: int = 8) -> None:
+        self.repo = repo
+        self.version = version
+        self.jobs = max(1, jobs)
+        self.props: Dict[str, str] = {}
+        self.bom_versions: Dict[Tuple[str, str], str] = {}
+
+    def _pom(self, coord: Coordinate) -> ET.Element | None:
+        path = self.repo.fetch(coord, "pom")
+        return ET.parse(path).getroot() if path else None
+
+    def load_bom(self) -> None:
+        parent = self._pom((AWS_GROUP, "aws-sdk-java-pom", self.version))
+        if parent is None:
+            raise RuntimeError("AWS SDK parent POM not found")
+        bom = self._pom((AWS_GROUP, "bom-internal", self.version))
+        if bom is None:
+            raise RuntimeError("AWS SDK bom-internal POM not found")
+        self.props = {
+            "awsjavasdk.version": self.version,
+            "project.version": self.version,
+            "project.parent.version": self.version,
+        }
+        parse_props(parent, self.props)
+        parse_props(bom, self.props)
+        managed = bom.find("./{*}dependencyManagement/{*}dependencies")
+        for dep in managed.findall("./{*}dependency") if managed is not None else []:
+            group = dep.findtext("./{*}groupId", "").strip()
+            artifact = dep.findtext("./{*}artifactId", "").strip()
+            version = resolve_version(dep.findtext("./{*}version", "").strip(), self.props)
+            if group and artifact and version:
+                self.bom_versions[(group, artifact)] = version
+
+    def _visit(self, coord: Coordinate) -> Tuple[Coordinate, List[Coordinate] | None]:
+        """Return the runtime dependencies of ``coord``, or None when its POM is absent."""
+        root = self._pom(coord)
+        if root is None:
+            return coord, None
+        props = dict(self.props)
+        parse_props(root, props)
+        deps: List[Coordinate] = []
+        for dep in parse_deps(root):
+            if dep.get("scope", "") in ("test", "provided") or dep.get("optional", "false").lower() == "true":
+                continue
+            if dep.get("type") and dep["type"] != "jar":
+                continue
+            group, artifact = dep.get("groupId", ""), dep.get("artifactId", "")
+            if not group or not artifact or _skipped(group, artifact):
+                continue
+            version = resolve_version(dep.get("version") or "", props)
+            if version and version.startswith("${"):
+                version = None
+            version = version or self.bom_versions.get((group, artifact))
+            if version:
+                deps.append((group, artifact, version))
+        return coord, deps
+
+    def resolve(self, modules: Iterable[str]) -> Tuple[List[Coordinate], List[str]]:
+        """Return the sorted jar closure and the modules that must come from the bundle."""
+        self.load_bom()
+        seen: Set[Coordinate] = set()
+        jars: List[Coordinate] = []
+        fallbacks: List[str] = []
+        pending: Set[Future] = set()
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+
+            def submit(coord: Coordinate) -> None:
+                if coord in seen or _skipped(coord[0], coord[1]):
+                    return
+                seen.add(coord)
+                pending.add(pool.submit(self._visit, coord))
+
+            for module in modules:
+                submit((AWS_GROUP, module, self.version))
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    coord, deps = future.result()
+                    if deps is None:
+                        if coord[0] == AWS_GROUP and coord[1] in BUNDLE_FALLBACKS:
+                            fallbacks.append(coord[1])
+                            continue
+                        raise RuntimeError(f"Missing POM for {':'.join(coord)}")
+                    jars.append(coord)
+                    for dep in deps:
+                        submit(dep)
+        return sorted(jars), sorted(fallbacks)
+
+
+def _peak_rss_mib() -> float | None:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - not on Linux
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _copy_raw(src: IO[bytes], info: zipfile.ZipInfo, dst: zipfile.ZipFile) -> None:
+    """Append ``info``'s compressed bytes to ``dst`` unchanged, writing a fresh local header."""
+    src.seek(info.header_offset)
+    header = src.read(30)
+    if header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"bad local header for {info.filename}")
+    name_len, extra_len = int.from_bytes(header[26:28], "little"), int.from_bytes(header[28:30], "little")
+    src.seek(name_len + extra_len, os.SEEK_CUR)
+
+    out = zipfile.ZipInfo(info.filename, info.date_time)
+    out.compress_type = info.compress_type
+    out.CRC, out.compress_size, out.file_size = info.CRC, info.compress_size, info.file_size
+    out.external_attr, out.create_system = info.external_attr, info.create_system
+    out.flag_bits = info.flag_bits & ~0x08  # sizes are known up front, so no data descriptor
+    out.header_offset = dst.fp.tell()
+    dst.fp.write(out.FileHeader())
+    remaining = info.compress_size
+    while remaining:
+        chunk = src.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"truncated entry {info.filename}")
+        dst.fp.write(chunk)
+        remaining -= len(chunk)
+    dst.filelist.append(out)
+    dst.NameToInfo[out.filename] = out
+    dst.start_dir = dst.fp.tell()
+
+
+def split_bundle(bundle: Path, modules: Iterable[str], version: str, dest: Path) -> Dict[str, object]:
+    """Carve the classes of ``modules`` out of the AWS SDK bundle jar in a single pass.
+
+    Entries are routed to every module whose package prefix they fall under and
+    their compressed bytes are copied as-is, so nothing is inflated or held in
+    memory; only the small ``META-INF/services`` files are read to match markers.
+    """
+    started = time.monotonic()
+    modules = sorted(set(modules))
+    stats: Dict[str, object] = {"modules": modules, "entries": 0, "bytes": 0}
+    targets: Dict[str, zipfile.ZipFile] = {}
+    try:
+        for module in modules:
+            targets[module] = zipfile.ZipFile(dest / f"{module}-{version}.jar", "w")
+        with zipfile.ZipFile(bundle) as src, open(bundle, "rb") as raw:
+            for info in src.infolist():
+                name = info.filename
+                if name.startswith("META-INF/services/"):
+                    data = src.read(name)
+                    for module in modules:
+                        if BUNDLE_FALLBACKS[module][1] in data:
+                            service = zipfile.ZipInfo(name, info.date_time)
+                            service.compress_type = info.compress_type
+                            targets[module].writestr(service, data)
+                            stats["entries"] += 1
+                    continue
+                for module in modules:
+                    if name.startswith(BUNDLE_FALLBACKS[module][0]):
+                        _copy_raw(raw, info, targets[module])
+                        stats["entries"] += 1
+                        stats["bytes"] += info.compress_size
+    finally:
+        for dst in targets.values():
+            dst.close()
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    stats["peak_rss_mib"] = _peak_rss_mib()
+    return stats
+
+
+def pinned_jars(repo: Repository, inputs: Dict[str, str]) -> List[Coordinate]:
+    """Jars pinned directly by build args rather than found through the SDK's POM graph."""
+    jars: List[Coordinate] = []
+    flavor = inputs.get("ICEBERG_RUNTIME_FLAVOR", "")
+    scala = os.environ.get("SCALA_BINARY_VERSION") or (flavor.rsplit("_", 1)[-1] if "_" in flavor else "2.13")
+    if inputs.get("ICEBERG_VERSION") and flavor:
+        jars.append(("org.apache.iceberg", f"iceberg-spark-runtime-{flavor}", inputs["ICEBERG_VERSION"]))
+    if inputs.get("HADOOP_VERSION"):
+        jars.append(("org.apache.hadoop", "hadoop-client-api", inputs["HADOOP_VERSION"]))
+        jars.append(("org.apache.hadoop", "hadoop-client-runtime", inputs["HADOOP_VERSION"]))
+    if inputs.get("HADOOP_AWS_VERSION"):
+        jars.append(("org.apache.hadoop", "hadoop-aws", inputs["HADOOP_AWS_VERSION"]))
+    if inputs.get("SPARK_VERSION"):
+        spark = inputs["SPARK_VERSION"]
+        jars.append(("org.apache.spark", f"spark-hadoop-cloud_{scala}", spark))
+        # The SLF4J 1.x binding must match the log4j-core that ships in the Spark distribution.
+        parent = repo.fetch(("org.apache.spark", f"spark-parent_{scala}", spark), "pom")
+        if parent is None:
+            raise RuntimeError(f"spark-parent_{scala} {spark} POM not found")
+        props: Dict[str, str] = {}
+        parse_props(ET.parse(parent).getroot(), props)
+        if not props.get("log4j.version"):
+            raise RuntimeError(f"log4j.version not set in spark-parent_{scala} {spark}")
+        jars.append(("org.apache.logging.log4j", "log4j-slf4j-impl", props["log4j.version"]))
+    for key, group, artifact in (
+        ("JAXB_API_VERSION", "javax.xml.bind", "jaxb-api"),
+        ("JAXB_IMPL_VERSION", "com.sun.xml.bind", "jaxb-impl"),
+        ("JAXB_CORE_VERSION", "com.sun.xml.bind", "jaxb-core"),
+        ("ACTIVATION_VERSION", "javax.activation", "javax.activation-api"),
+        ("SLF4J_API_VERSION", "org.slf4j", "slf4j-api"),
+    ):
+        if inputs.get(key):
+            jars.append((group, artifact, inputs[key]))
+    return jars
+
+
+def plan(repo: Repository, inputs: Dict[str, str], jobs: int) -> Tuple[List[Coordinate], List[str]]:
+    """Return every jar the image needs plus the SDK modules that come from the bundle."""
+    jars: List[Coordinate] = pinned_jars(repo, inputs)
+    fallbacks: List[str] = []
+    modules = [module.strip() for module in inputs.get("AWS_SDK_MODULES", "").split(",") if module.strip()]
+    if inputs.get("AWS_SDK_BUNDLE_VERSION") and modules:
+        sdk_jars, fallbacks = Resolver(repo, inputs["AWS_SDK_BUNDLE_VERSION"], jobs).resolve(modules)
+        jars.extend(sdk_jars)
+    return sorted(set(jars)), fallbacks
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry(repo: Repository, coord: Coordinate) -> Dict[str, object]:
+    path = repo.fetch(coord, "jar")
+    if path is None:
+        raise RuntimeError(f"Missing jar for {':'.join(coord)}")
+    return {
+        "coordinate": ":".join(coord),
+        "file": f"{coord[1]}-{coord[2]}.jar",
+        "sha256": _sha256_file(path),
+        "size": path.stat().st_size,
+    }
+
+
+def write_lock(repo: Repository, inputs: Dict[str, str], output: Path, jobs: int) -> Dict[str, object]:
+    jars, fallbacks = plan(repo, inputs, jobs)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        entries = list(pool.map(lambda coord: _entry(repo, coord), jars))
+    lock: Dict[str, object] = {
+        "version": LOCK_VERSION,
+        "generated_by": "./scripts/package.py lock spark",
+        "repository": repo.base_url,
+        "inputs": inputs,
+        "jars": entries,
+    }
+    if fallbacks:
+        bundle = _entry(repo, (AWS_GROUP, "bundle", inputs["AWS_SDK_BUNDLE_VERSION"]))
+        lock["bundle"] = {**bundle, "split": fallbacks}
+    output.write_text(json.dumps(lock, indent=2) + "\n")
+    return lock
+
+
+def install(repo: Repository, entries: List[Dict[str, object]], dest: Path, jobs: int) -> None:
+    """Fetch every locked jar into the local repository in parallel, verify it and copy it into ``dest``."""
+    dest.mkdir(parents=True, exist_ok=True)
+
+    def one(entry: Dict[str, object]) -> None:
+        target = dest / str(entry["file"])
+        if target.exists():
+            return
+        group, artifact, version = str(entry["coordinate"]).split(":")
+        path = repo.fetch((group, artifact, version), "jar")
+        if path is None:
+            raise RuntimeError(f"Missing jar for {entry['coordinate']}")
+        if entry.get("sha256") and _sha256_file(path) != entry["sha256"]:
+            raise ChecksumError(f"sha256 mismatch for {entry['coordinate']}; the lockfile pins {entry['sha256']}")
+        shutil.copyfile(path, target)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        list(pool.map(one, entries))
+
+
+def load_lock(path: Path, inputs: Dict[str, str]) -> Dict[str, object]:
+    lock = json.loads(path.read_text())
+    stale = [
+        f"{key} locked {value!r} but building {inputs[key]!r}"
+        for key, value in lock.get("inputs", {}).items()
+        if key in inputs and inputs[key] != value
+    ]
+    if stale:
+        raise SystemExit(f"{path} is stale ({', '.join(stale)}); run ./scripts/package.py lock spark")
+    return lock
+
+
+def live_lock(repo: Repository, inputs: Dict[str, str], jobs: int) -> Dict[str, object]:
+    """The lockfile ``plan`` would produce, minus sha256 pins (``.sha1`` is still verified)."""
+    jars, fallbacks = plan(repo, inputs, jobs)
+    lock: Dict[str, object] = {
+        "jars": [{"coordinate": ":".join(coord), "file": f"{coord[1]}-{coord[2]}.jar"} for coord in jars]
+    }
+    if fallbacks:
+        lock["bundle"] = {"coordinate": f"{AWS_GROUP}:bundle:{inputs['AWS_SDK_BUNDLE_VERSION']}", "split": fallbacks}
+    return lock
+
+
+def install_bundle_split(repo: Repository, entry: Dict[str, object], dest: Path) -> Dict[str, object]:
+    group, artifact, version = str(entry["coordinate"]).split(":")
+    bundle = repo.fetch((group, artifact, version), "jar")
+    if bundle is None:
+        raise RuntimeError(f"AWS SDK bundle {version} not found")
+    if entry.get("sha256") and _sha256_file(bundle) != entry["sha256"]:
+        raise ChecksumError(f"sha256 mismatch for {entry['coordinate']}; the lockfile pins {entry['sha256']}")
+    return split_bundle(bundle, entry["split"], version, dest)
+
+
+def current_inputs() -> Dict[str, str]:
+    return {key: os.environ[key] for key in LOCK_INPUTS if os.environ.get(key)}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", default=os.environ.get("MAVEN_REPO_URL", DEFAULT_REPO), help="Remote repository URL")
+    parser.add_argument(
+        "--local-repo",
+        default=os.environ.get("MAVEN_LOCAL_REPO", str(Path.home() / ".m2" / "repository")),
+        help="Local repository used as a verified download cache",
+    )
+    parser.add_argument("--jobs", type=int, default=int(os.environ.get("MAVEN_RESOLVE_JOBS", "8")))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    lock_parser = subparsers.add_parser("lock", help="Resolve the jar set from build args in the environment")
+    lock_parser.add_argument("--output", required=True, help="Lockfile to write")
+    install_parser = subparsers.add_parser("install", help="Install the locked (or live-resolved) jar set")
+    install_parser.add_argument("--dest", required=True, help="Directory the jars are copied into")
+    install_parser.add_argument("--lock", help="Lockfile; without --lock the set is resolved live from build args")
+    args = parser.parse_args(argv)
+
+    started = time.monotonic()
+    split: Dict[str, object] | None = None
+    inputs = current_inputs()
+    pool = ConnectionPool(max_idle=args.jobs)
+    repo = Repository(args.repo, Path(args.local_repo), pool)
+    try:
+        if args.command == "lock":
+            lock = write_lock(repo, inputs, Path(args.output), args.jobs)
+        else:
+            if args.lock and not Path(args.lock).is_file():
+                raise SystemExit(f"{args.lock} not found; run ./scripts/package.py lock spark")
+            lock = load_lock(Path(args.lock), inputs) if args.lock else None
+            if lock is None:
+                print("no lockfile; resolving the jar set from build args", file=sys.stderr)
+                lock = live_lock(repo, inputs, args.jobs)
+            install(repo, lock["jars"], Path(args.dest), args.jobs)
+            if lock.get("bundle"):
+                split = install_bundle_split(repo, lock["bundle"], Path(args.dest))
+    finally:
+        pool.close()
+
+    summary = {
+        "command": args.command,
+        "jars": len(lock["jars"]),
+        "bundle_fallbacks": (lock.get("bundle") or {}).get("split", []),
+        "cached": repo.stats["cached"],
+        "downloaded": repo.stats["downloaded"],
+        "downloaded_bytes": repo.stats["bytes"],
+        "connections": pool.opened,
+        "seconds": round(time.monotonic() - started, 2),
+    }
+    if split:
+        summary["bundle_split"] = split
+    print(json.dumps(summary), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
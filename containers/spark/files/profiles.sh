@@ -0,0 +1,72 @@
+# shellcheck shell=bash
+# Named runtime profiles layered on top of spark-defaults.conf.
+#
+# Sourced by entrypoint.sh. SPARK_PROFILE is a comma-separated list of names;
+# each one is a spark-defaults style file in SPARK_PROFILE_DIR (default
+# $SPARK_HOME/conf/profiles), applied left to right. spark_profiles "$@" fills
+# SPARK_PROFILE_ARGS with `--conf` flags for every key the user has not set on
+# the command line, and SPARK_PROFILE_REPORT with key=value lines for
+# `entrypoint.sh --print-tuning`.
+
+SPARK_PROFILE_ARGS=()
+SPARK_PROFILE_REPORT=()
+
+# Prints "key value" for each setting in a profile file, skipping comments and blank lines.
+_spark_profile_settings() {
+  local line key value
+  while IFS= read -r line || [[ -n "$line" ]]; do
+    line="${line#"${line%%[![:space:]]*}"}"
+    [[ -z "$line" || "$line" == \#* ]] && continue
+    if [[ "$line" =~ ^([^[:space:]=]+)[[:space:]]*[=[:space:]][[:space:]]*(.*)$ ]]; then
+      key="${BASH_REMATCH[1]}"
+      value="${BASH_REMATCH[2]%"${BASH_REMATCH[2]##*[![:space:]]}"}"
+      printf '%s %s\n' "$key" "$value"
+    fi
+  done <"$1"
+}
+
+spark_profiles() {
+  SPARK_PROFILE_ARGS=()
+  SPARK_PROFILE_REPORT=()
+  local names="${SPARK_PROFILE:-}"
+  [[ -n "${names//[[:space:],]/}" && "$names" != "none" ]] || return 0
+  local dir="${SPARK_PROFILE_DIR:-$SPARK_HOME/conf/profiles}"
+
+  local -A values=()
+  local -a order=() requested=()
+  local name file key value available
+  IFS=',' read -r -a requested <<<"$names"
+  for name in "${requested[@]}"; do
+    name="${name//[[:space:]]/}"
+    [[ -n "$name" ]] || continue
+    file="$dir/$name.conf"
+    if [[ ! -f "$file" ]]; then
+      available="$(find "$dir" -maxdepth 1 -name '*.conf' -printf '%f\n' 2>/dev/null | sed 's/\.conf$//' | LC_ALL=C sort | paste -sd, - || true)"
+      echo "unknown SPARK_PROFILE: $name (available: ${available:-none} in $dir)" >&2
+      return 1
+    fi
+    while read -r key value; do
+      [[ -n "${values[$key]+set}" ]] || order+=("$key")
+      values[$key]="$value"
+    done < <(_spark_profile_settings "$file")
+  done
+  SPARK_PROFILE_REPORT+=("profile=${names//[[:space:]]/}")
+
+  local arg user
+  for key in "${order[@]}"; do
+    user=""
+    for arg in "$@"; do
+      # `--conf key=value`, `-c key=value` and `--conf=key=value`.
+      if [[ "$arg" == "$key="* || "$arg" == "--conf=$key="* ]]; then
+        user=1
+        break
+      fi
+    done
+    if [[ -n "$user" ]]; then
+      SPARK_PROFILE_REPORT+=("$key=(user)")
+    else
+      SPARK_PROFILE_ARGS+=(--conf "$key=${values[$key]}")
+      SPARK_PROFILE_REPORT+=("$key=${values[$key]}")
+    fi
+  done
+}
@@ -0,0 +1,152 @@
+# shellcheck shell=bash
+# Derives driver memory and parallelism from the container's cgroup limits.
+#
+# Sourced by entrypoint.sh. spark_tuning "$@" fills SPARK_TUNING_ARGS with
+# spark-submit flags for whatever the user has not set on the command line or
+# in spark-defaults.conf. SPARK_TUNING_REPORT holds key=value lines for
+# `entrypoint.sh --print-tuning`. Set SPARK_AUTOTUNE=off to disable it.
+# SPARK_CGROUP_ROOT (default /sys/fs/cgroup) lets tests point it at fake files.
+
+SPARK_TUNING_ARGS=()
+SPARK_TUNING_REPORT=()
+
+# Prints "<cpus> <memory MiB> <source>"; 0 means no limit was found.
+spark_cgroup_limits() {
+  local root="${SPARK_CGROUP_ROOT:-/sys/fs/cgroup}"
+  local cpus=0 memory=0 source="none" quota period limit dir
+  if [[ -f "$root/cgroup.controllers" || -f "$root/cpu.max" || -f "$root/memory.max" ]]; then
+    source="v2"
+    if [[ -r "$root/cpu.max" ]]; then
+      read -r quota period <"$root/cpu.max"
+      if [[ "$quota" != "max" && "$quota" -gt 0 && "${period:-0}" -gt 0 ]]; then
+        cpus=$(((quota + period - 1) / period))
+      fi
+    fi
+    if [[ -r "$root/memory.max" ]]; then
+      read -r limit <"$root/memory.max"
+      [[ "$limit" == "max" ]] || memory=$((limit / 1048576))
+    fi
+  else
+    for dir in "$root/cpu" "$root/cpu,cpuacct" "$root/cpuacct,cpu"; do
+      if [[ -r "$dir/cpu.cfs_quota_us" ]]; then
+        source="v1"
+        read -r quota <"$dir/cpu.cfs_quota_us"
+        read -r period <"$dir/cpu.cfs_period_us"
+        if [[ "$quota" -gt 0 && "$period" -gt 0 ]]; then
+          cpus=$(((quota + period - 1) / period))
+        fi
+        break
+      fi
+    done
+    if [[ -r "$root/memory/memory.limit_in_bytes" ]]; then
+      source="v1"
+      read -r limit <"$root/memory/memory.limit_in_bytes"
+      # v1 reports "unlimited" as a page-rounded LONG_MAX.
+      ((limit >= 1 << 60)) || memory=$((limit / 1048576))
+    fi
+  fi
+  echo "$cpus $memory $source"
+}
+
+# True when the user already chose a value for the spark.* key (or one of its flags).
+_spark_tuning_user_set() {
+  local key="$1"
+  shift
+  local flag arg
+  for arg in "${SPARK_TUNING_USER_ARGS[@]}"; do
+    # `--conf key=value`, `-c key=value` and `--conf=key=value`.
+    [[ "$arg" == "$key="* || "$arg" == "--conf=$key="* ]] && return 0
+    for flag in "$@"; do
+      [[ "$arg" == "$flag" || "$arg" == "$flag="* ]] && return 0
+    done
+  done
+  [[ -n "$SPARK_TUNING_DEFAULTS" && -f "$SPARK_TUNING_DEFAULTS" ]] \
+    && grep -Eq "^[[:space:]]*${key//./\\.}([[:space:]=]|$)" "$SPARK_TUNING_DEFAULTS"
+}
+
+spark_tuning() {
+  SPARK_TUNING_ARGS=()
+  SPARK_TUNING_REPORT=()
+  SPARK_TUNING_USER_ARGS=("$@")
+  SPARK_TUNING_DEFAULTS="${SPARK_CONF_DIR:-$SPARK_HOME/conf}/spark-defaults.conf"
+  if [[ "${SPARK_AUTOTUNE:-on}" == "off" ]]; then
+    SPARK_TUNING_REPORT+=("autotune=off")
+    return 0
+  fi
+
+  local arg prev="" master="" deploy_mode="client"
+  for arg in "$@"; do
+    case "$prev" in
+      --master) master="$arg" ;;
+      --deploy-mode) deploy_mode="$arg" ;;
+    esac
+    case "$arg" in
+      --version | --help | -h | --kill | --status) return 0 ;;
+      --master=*) master="${arg#--master=}" ;;
+      --deploy-mode=*) deploy_mode="${arg#--deploy-mode=}" ;;
+      spark.submit.deployMode=* | --conf=spark.submit.deployMode=*) deploy_mode="${arg##*=}" ;;
+    esac
+    prev="$arg"
+  done
+  if [[ "$deploy_mode" == "cluster" ]]; then
+    # The driver runs elsewhere; this container only submits.
+    SPARK_TUNING_REPORT+=("autotune=skipped (cluster deploy mode)")
+    return 0
+  fi
+
+  local cpus memory source host_cpus host_memory
+  read -r cpus memory source < <(spark_cgroup_limits)
+  host_cpus="$(nproc 2>/dev/null || echo 1)"
+  host_memory="$(awk '/^MemTotal:/ {print int($2 / 1024)}' /proc/meminfo 2>/dev/null || echo 0)"
+  ((cpus > 0 && cpus <= host_cpus)) || cpus="$host_cpus"
+  ((memory > 0 && (host_memory == 0 || memory <= host_memory))) || memory="$host_memory"
+  SPARK_TUNING_REPORT+=("cgroup=$source" "cpus=$cpus" "memory_limit_mb=$memory")
+
+  local local_mode=""
+  [[ -z "$master" || "$master" == local* ]] && local_mode=1
+
+  if ((memory > 0)); then
+    # Leave room outside the heap for metaspace, direct buffers, and (locally) Python workers.
+    local overhead=$((memory / 4))
+    ((overhead >= 384)) || overhead=384
+    local heap=$((memory - overhead))
+    if ((heap < memory / 2)); then
+      heap=$((memory / 2))
+      overhead=$((memory - heap))
+    fi
+    if _spark_tuning_user_set spark.driver.memory --driver-memory; then
+      SPARK_TUNING_REPORT+=("spark.driver.memory=(user)")
+    else
+      SPARK_TUNING_ARGS+=(--driver-memory "${heap}m")
+      SPARK_TUNING_REPORT+=("spark.driver.memory=${heap}m")
+    fi
+    if _spark_tuning_user_set spark.driver.memoryOverhead; then
+      SPARK_TUNING_REPORT+=("spark.driver.memoryOverhead=(user)")
+    else
+      SPARK_TUNING_ARGS+=(--conf "spark.driver.memoryOverhead=${overhead}m")
+      SPARK_TUNING_REPORT+=("spark.driver.memoryOverhead=${overhead}m")
+    fi
+  fi
+
+  if [[ -z "$local_mode" ]]; then
+    # Executors elsewhere decide parallelism; only the driver lives here.
+    return 0
+  fi
+  if _spark_tuning_user_set spark.master --master; then
+    SPARK_TUNING_REPORT+=("spark.master=(user)")
+  else
+    SPARK_TUNING_ARGS+=(--master "local[$cpus]")
+    SPARK_TUNING_REPORT+=("spark.master=local[$cpus]")
+  fi
+  local key value
+  for key in spark.default.parallelism spark.sql.shuffle.partitions; do
+    # Two tasks per core for RDDs; shuffles start at four and AQE coalesces them down.
+    if [[ "$key" == spark.default.parallelism ]]; then value=$((cpus * 2)); else value=$((cpus * 4)); fi
+    if _spark_tuning_user_set "$key"; then
+      SPARK_TUNING_REPORT+=("$key=(user)")
+    else
+      SPARK_TUNING_ARGS+=(--conf "$key=$value")
+      SPARK_TUNING_REPORT+=("$key=$value")
+    fi
+  done
+}
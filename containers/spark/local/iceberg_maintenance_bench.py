@@ -0,0 +1,185 @@
+"""Iceberg table-maintenance and scan-planning benchmark for the local MinIO stack.
+
+Builds a many-small-files table with BENCH_SNAPSHOTS appends of
+BENCH_FILES_PER_SNAPSHOT files each (BENCH_ROWS_PER_FILE rows per file), then
+times, in order:
+
+- ``plan_full``/``plan_filtered``: Iceberg scan planning (``planFiles``) of the
+  whole table and of a 1% id range, without reading data;
+- ``spark_plan``: Spark planning of a filtered count, which includes the above;
+- ``rewrite_data_files``, ``rewrite_manifests``, ``expire_snapshots`` and
+  ``remove_orphan_files`` (after planting BENCH_ORPHAN_FILES orphans);
+- ``plan_full_after``/``plan_filtered_after``: planning again after maintenance.
+
+Prints one JSON document with the Iceberg version and runtime flavor, the table
+shape before and after, and per-phase seconds plus the procedure outputs.
+"""
+import glob
+import json
+import os
+import re
+import time
+
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import col, concat, lit
+
+TABLE = "local.bench.maintenance"
+
+
+def _iceberg_runtime() -> dict:
+    jars = glob.glob(os.path.join(os.environ.get("SPARK_HOME", "/opt/spark"), "jars", "iceberg-spark-runtime-*.jar"))
+    match = re.match(r"iceberg-spark-runtime-(.+)-([0-9][^-]*)\.jar$", os.path.basename(jars[0])) if jars else None
+    return {"iceberg": match.group(2), "iceberg_runtime_flavor": match.group(1)} if match else {}
+
+
+def _shape(spark: SparkSession) -> dict:
+    def count(metadata_table: str) -> int:
+        return spark.sql(f"SELECT count(*) FROM {TABLE}.{metadata_table}").collect()[0][0]
+
+    return {
+        "data_files": count("files"),
+        "manifests": count("manifests"),
+        "snapshots": count("snapshots"),
+    }
+
+
+def _row(result) -> dict:
+    rows = result.collect()
+    return rows[0].asDict() if rows else {}
+
+
+def main() -> int:
+    warehouse = (os.environ.get("BENCH_WAREHOUSE") or "s3a://spark-test/bench/iceberg").rstrip("/")
+    snapshots = int(os.environ.get("BENCH_SNAPSHOTS") or "50")
+    files_per_snapshot = int(os.environ.get("BENCH_FILES_PER_SNAPSHOT") or "200")
+    rows_per_file = int(os.environ.get("BENCH_ROWS_PER_FILE") or "100")
+    orphan_files = int(os.environ.get("BENCH_ORPHAN_FILES") or "50")
+    spark = (
+        SparkSession.builder.appName("iceberg-maintenance-bench")
+        .config("spark.sql.catalog.local", "org.apache.iceberg.spark.SparkCatalog")
+        .config("spark.sql.catalog.local.type", "hadoop")
+        .config("spark.sql.catalog.local.warehouse", warehouse)
+        .getOrCreate()
+    )
+    try:
+        jvm = spark._jvm
+        phases: dict = {}
+
+        def measure(name: str, action, detail: str = "") -> object:
+            started = time.perf_counter()
+            result = action()
+            phases[name] = {"seconds": round(time.perf_counter() - started, 3)}
+            if detail:
+                phases[name][detail] = result
+            return result
+
+        spark.sql("CREATE DATABASE IF NOT EXISTS local.bench")
+        spark.sql(f"DROP TABLE IF EXISTS {TABLE} PURGE")
+        # No write distribution, so every task writes exactly one file per append.
+        spark.sql(
+            f"CREATE TABLE {TABLE} (id BIGINT, bucket INT, name STRING) USING iceberg "
+            "TBLPROPERTIES ('write.distribution-mode'='none')"
+        )
+
+        rows_per_snapshot = files_per_snapshot * rows_per_file
+
+        def load() -> None:
+            for snapshot in range(snapshots):
+                start = snapshot * rows_per_snapshot
+                (
+                    spark.range(start, start + rows_per_snapshot, numPartitions=files_per_snapshot)
+                    .withColumn("bucket", (col("id") % 16).cast("int"))
+                    .withColumn("name", concat(lit("row-"), col("id")))
+                    .writeTo(TABLE)
+                    .append()
+                )
+
+        measure("load", load)
+        before = _shape(spark)
+        total_rows = snapshots * rows_per_snapshot
+        low, high = total_rows // 2, total_rows // 2 + max(1, total_rows // 100)
+
+        expressions = jvm.org.apache.iceberg.expressions.Expressions
+        iterables = jvm.org.apache.iceberg.relocated.com.google.common.collect.Iterables
+        # Expressions.and is a Python keyword, so it is looked up by name.
+        in_range = getattr(expressions, "and")(
+            expressions.greaterThanOrEqual("id", low), expressions.lessThan("id", high)
+        )
+
+        def plan(expression=None):
+            def action() -> int:
+                # Reload so each plan reads the metadata and manifests from storage again.
+                table = jvm.org.apache.iceberg.spark.Spark3Util.loadIcebergTable(spark._jsparkSession, TABLE)
+                scan = table.newScan() if expression is None else table.newScan().filter(expression)
+                tasks = scan.planFiles()
+                try:
+                    return iterables.size(tasks)
+                finally:
+                    tasks.close()
+
+            return action
+
+        measure("plan_full", plan(), "files")
+        measure("plan_filtered", plan(in_range), "files")
+        measure(
+            "spark_plan",
+            lambda: spark.sql(f"SELECT count(*) FROM {TABLE} WHERE id >= {low} AND id < {high}")
+            ._jdf.queryExecution()
+            .executedPlan(),
+        )
+
+        procedures = {
+            "rewrite_data_files": f"CALL local.system.rewrite_data_files(table => '{TABLE}')",
+            "rewrite_manifests": f"CALL local.system.rewrite_manifests(table => '{TABLE}')",
+            "expire_snapshots": (
+                f"CALL local.system.expire_snapshots(table => '{TABLE}', "
+                "older_than => TIMESTAMP '2999-01-01 00:00:00', retain_last => 1)"
+            ),
+        }
+        for phase, statement in procedures.items():
+            measure(phase, lambda statement=statement: _row(spark.sql(statement)), "output")
+
+        location = spark.sql(f"DESCRIBE TABLE EXTENDED {TABLE}").where("col_name = 'Location'").collect()[0][1]
+        spark.range(0, orphan_files * 10, numPartitions=orphan_files).write.mode("overwrite").parquet(
+            f"{location}/data/orphans"
+        )
+        measure(
+            "remove_orphan_files",
+            lambda: {
+                "orphan_files_removed": spark.sql(
+                    f"CALL local.system.remove_orphan_files(table => '{TABLE}', "
+                    "older_than => TIMESTAMP '2999-01-01 00:00:00')"
+                ).count()
+            },
+            "output",
+        )
+
+        measure("plan_full_after", plan(), "files")
+        measure("plan_filtered_after", plan(in_range), "files")
+
+        print(
+            json.dumps(
+                {
+                    "benchmark": "iceberg-maintenance",
+                    "versions": {"spark": spark.version, **_iceberg_runtime()},
+                    "config": {
+                        "snapshots": snapshots,
+                        "files_per_snapshot": files_per_snapshot,
+                        "rows_per_file": rows_per_file,
+                        "orphan_files": orphan_files,
+                        "warehouse": warehouse,
+                    },
+                    "table": {"before": before, "after": _shape(spark)},
+                    "phases": phases,
+                },
+                sort_keys=True,
+                default=str,
+            )
+        )
+        return 0
+    finally:
+        spark.stop()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
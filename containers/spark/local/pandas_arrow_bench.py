@@ -0,0 +1,122 @@
+"""pandas/PySpark interchange benchmark with and without Arrow.
+
+For each row count in BENCH_ROW_COUNTS (comma-separated, default
+``100000,1000000``) it times, as the median of BENCH_ROUNDS runs:
+
+- ``to_pandas``: ``DataFrame.toPandas()``;
+- ``create_dataframe``: ``spark.createDataFrame(pandas_df)`` plus a count;
+- ``python_udf``: a row-at-a-time ``@udf`` over one column;
+- ``pandas_udf``: the same function as a ``@pandas_udf`` (always Arrow).
+
+``arrow`` runs enable ``spark.sql.execution.arrow.pyspark.enabled`` and
+``spark.sql.execution.pythonUDF.arrow.enabled`` with fallback disabled, so a
+silent fallback cannot pass for Arrow; ``rows`` runs disable them. Run it with
+SPARK_PROFILE=pyarrow to confirm the profile is applied (``session_defaults``).
+Prints one JSON document with the Python library versions and per-phase seconds.
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy
+import pandas
+import pyarrow
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import col, pandas_udf, udf
+
+ARROW_CONFS = ("spark.sql.execution.arrow.pyspark.enabled", "spark.sql.execution.pythonUDF.arrow.enabled")
+FALLBACK_CONF = "spark.sql.execution.arrow.pyspark.fallback.enabled"
+
+
+@udf("double")
+def scale(value):
+    return value * 1.5 + 1.0
+
+
+@pandas_udf("double")
+def scale_series(values: pandas.Series) -> pandas.Series:
+    return values * 1.5 + 1.0
+
+
+def _sum_of(df, column) -> None:
+    df.select(column.alias("y")).agg({"y": "sum"}).collect()
+
+
+def _versions(spark: SparkSession) -> dict:
+    versions = {
+        "spark": spark.version,
+        "python": sys.version.split()[0],
+        "pandas": pandas.__version__,
+        "pyarrow": pyarrow.__version__,
+        "numpy": numpy.__version__,
+    }
+    try:
+        import fastparquet
+
+        versions["fastparquet"] = fastparquet.__version__
+    except ImportError:
+        versions["fastparquet"] = None
+    return versions
+
+
+def main() -> int:
+    spark = SparkSession.builder.appName("pandas-arrow-bench").getOrCreate()
+    row_counts = [int(value) for value in (os.environ.get("BENCH_ROW_COUNTS") or "100000,1000000").split(",")]
+    rounds = int(os.environ.get("BENCH_ROUNDS") or "3")
+    try:
+        session_defaults = {key: spark.conf.get(key, "false") for key in (*ARROW_CONFS, FALLBACK_CONF)}
+        phases: dict = {}
+
+        def measure(name: str, action) -> None:
+            timings = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                action()
+                timings.append(time.perf_counter() - started)
+            phases[name] = {"seconds": round(statistics.median(timings), 3)}
+
+        for rows in row_counts:
+            df = spark.range(0, rows).selectExpr("id", "id * 0.5 AS x", "cast(id AS string) AS s").cache()
+            df.count()
+            pdf = df.toPandas()
+            for mode in ("rows", "arrow"):
+                enabled = "true" if mode == "arrow" else "false"
+                for key in ARROW_CONFS:
+                    spark.conf.set(key, enabled)
+                spark.conf.set(FALLBACK_CONF, "false")
+                measure(f"to_pandas.{mode}.{rows}", df.toPandas)
+                measure(f"create_dataframe.{mode}.{rows}", lambda: spark.createDataFrame(pdf).count())
+                measure(f"python_udf.{mode}.{rows}", lambda: _sum_of(df, scale(col("x"))))
+            measure(f"pandas_udf.arrow.{rows}", lambda: _sum_of(df, scale_series(col("x"))))
+            df.unpersist()
+
+        speedups = {}
+        for name, phase in phases.items():
+            operation, mode, rows = name.split(".")
+            # pandas UDFs have no row-at-a-time mode; compare them with the plain Python UDF.
+            baseline = phases.get(f"{operation}.rows.{rows}") or phases.get(f"python_udf.rows.{rows}")
+            if mode == "arrow" and baseline and phase["seconds"]:
+                speedups[f"{operation}.{rows}"] = round(baseline["seconds"] / phase["seconds"], 2)
+
+        print(
+            json.dumps(
+                {
+                    "benchmark": "pandas-arrow",
+                    "versions": _versions(spark),
+                    "config": {"row_counts": row_counts, "rounds": rounds, "profile": os.environ.get("SPARK_PROFILE")},
+                    "session_defaults": session_defaults,
+                    "phases": phases,
+                    "arrow_speedup": speedups,
+                },
+                sort_keys=True,
+            )
+        )
+        return 0
+    finally:
+        spark.stop()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
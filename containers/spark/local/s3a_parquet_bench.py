@@ -0,0 +1,138 @@
+"""S3A/Parquet throughput benchmark for the local MinIO stack.
+
+Generates BENCH_SIZE_MB of Parquet (approximately) in BENCH_FILES files under
+BENCH_OUTPUT, then times the write and BENCH_ROUNDS rounds (median reported) of
+three reads: a full scan that decodes every column, a column-pruned scan of one
+column, and a predicate-pushed range filter that row-group statistics can skip.
+Prints one JSON document with the Spark/Hadoop/AWS SDK versions, file counts,
+MB/s and the S3A request counters each phase added.
+
+The counters come from the S3A filesystem instance in this JVM, so they cover
+the executors only in local mode, which is how the compose stack runs Spark.
+"""
+import json
+import os
+import statistics
+import time
+
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import col, concat, lit, sha2
+
+MIB = 1024 * 1024
+# Rough Parquet bytes per generated row (snappy); only used to pick a row count.
+ROW_BYTES = 90
+# S3A counters that are not request counts but are worth reporting per phase.
+VOLUME_COUNTERS = ("stream_read_bytes", "stream_write_bytes", "stream_read_opened", "store_io_retry", "store_io_throttled")
+
+
+def _versions(spark: SparkSession) -> dict:
+    jvm = spark._jvm
+    versions = {"spark": spark.version, "hadoop": jvm.org.apache.hadoop.util.VersionInfo.getVersion()}
+    try:
+        versions["aws_sdk"] = jvm.software.amazon.awssdk.core.util.VersionInfo.SDK_VERSION
+    except Exception:  # noqa: BLE001 - the SDK is optional for non-S3A paths
+        versions["aws_sdk"] = None
+    return versions
+
+
+def _counters(fs) -> dict:
+    stats = fs.getIOStatistics()
+    if stats is None:
+        return {}
+    counters = stats.counters()
+    return {str(key): int(counters.get(key)) for key in counters.keySet()}
+
+
+def _requests(before: dict, after: dict) -> dict:
+    delta = {key: after[key] - before.get(key, 0) for key in after if after[key] != before.get(key, 0)}
+    return {
+        key: value
+        for key, value in sorted(delta.items())
+        if key in VOLUME_COUNTERS or (("request" in key or key.startswith("multipart_")) and not key.endswith(".failures"))
+    }
+
+
+def _files(fs, path) -> tuple[int, int]:
+    count = size = 0
+    for status in fs.listStatus(path):
+        name = status.getPath().getName()
+        if status.isFile() and not name.startswith(("_", ".")):
+            count += 1
+            size += status.getLen()
+    return count, size
+
+
+def main() -> int:
+    spark = SparkSession.builder.appName("s3a-parquet-bench").getOrCreate()
+    output = (os.environ.get("BENCH_OUTPUT") or "s3a://spark-test/bench/parquet").rstrip("/")
+    size_mb = int(os.environ.get("BENCH_SIZE_MB") or "512")
+    files = int(os.environ.get("BENCH_FILES") or "32")
+    rounds = int(os.environ.get("BENCH_ROUNDS") or "3")
+    rows = max(files, size_mb * MIB // ROW_BYTES)
+    try:
+        jvm = spark._jvm
+        path = jvm.org.apache.hadoop.fs.Path(output)
+        fs = path.getFileSystem(spark._jsc.hadoopConfiguration())
+        phases: dict = {}
+
+        def measure(name: str, action, repeat: int = 1) -> dict:
+            timings = []
+            before = _counters(fs)
+            for _ in range(repeat):
+                started = time.perf_counter()
+                action()
+                timings.append(time.perf_counter() - started)
+            requests = {key: value // repeat for key, value in _requests(before, _counters(fs)).items()}
+            phases[name] = {"seconds": round(statistics.median(timings), 3), "requests": requests}
+            return phases[name]
+
+        # Contiguous id ranges per file keep the min/max statistics selective for the pushed-down filter.
+        data = (
+            spark.range(0, rows, numPartitions=files)
+            .withColumn("bucket", (col("id") % 1024).cast("int"))
+            .withColumn("amount", (col("id") * 7 % 10007) / 100.0)
+            .withColumn("name", concat(lit("row-"), col("id")))
+            .withColumn("payload", sha2(col("name"), 256))
+        )
+        measure("write", lambda: data.write.mode("overwrite").parquet(output))
+        file_count, data_bytes = _files(fs, path)
+        data_mb = data_bytes / MIB
+
+        full_scan = ("sum(id)", "sum(bucket)", "sum(amount)", "max(name)", "max(payload)")
+        measure("full_scan", lambda: spark.read.parquet(output).selectExpr(*full_scan).collect(), rounds)
+        measure("column_pruned", lambda: spark.read.parquet(output).selectExpr("sum(amount)").collect(), rounds)
+        low = rows // 2
+        high = low + max(1, rows // 1000)
+        in_range = (col("id") >= low) & (col("id") < high)
+        measure(
+            "predicate_pushed",
+            lambda: spark.read.parquet(output).where(in_range).selectExpr("count(*)", "max(payload)").collect(),
+            rounds,
+        )
+
+        for name, phase in phases.items():
+            moved = phase["requests"].get("stream_write_bytes" if name == "write" else "stream_read_bytes", 0)
+            phase["mb"] = round(moved / MIB, 2)
+            # Dataset MB per second is the end-to-end rate; bytes actually fetched show pruning and skipping.
+            phase["dataset_mb_per_s"] = round(data_mb / phase["seconds"], 2) if phase["seconds"] else None
+            phase["mb_per_s"] = round(moved / MIB / phase["seconds"], 2) if phase["seconds"] else None
+
+        print(
+            json.dumps(
+                {
+                    "benchmark": "s3a-parquet",
+                    "versions": _versions(spark),
+                    "config": {"size_mb": size_mb, "files": files, "rounds": rounds, "rows": rows, "output": output},
+                    "dataset": {"files": file_count, "bytes": data_bytes, "mb": round(data_mb, 2)},
+                    "phases": phases,
+                },
+                sort_keys=True,
+            )
+        )
+        return 0
+    finally:
+        spark.stop()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""Times the S3A access patterns the SPARK_PROFILE presets target against MinIO.
+
+Run through the image entrypoint (the ``spark-bench`` compose service) so the
+profile named in SPARK_PROFILE is applied. Prints one JSON line with the seconds
+and bytes per phase:
+
+- ``large_write``/``large_scan``: BENCH_ROWS rows in BENCH_FILES Parquet files,
+  written and then fully scanned (throughput).
+- ``selective_read``: a filtered two-column read of the same data (low-latency).
+- ``small_write``/``small_read``: BENCH_SMALL_FILES tiny files (small-files).
+"""
+import json
+import os
+import time
+
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import col, concat, lit, sha2
+
+
+def _timed(results: dict, name: str, action) -> None:
+    started = time.perf_counter()
+    action()
+    results[name] = round(time.perf_counter() - started, 3)
+
+
+def _size(spark: SparkSession, path: str) -> int:
+    jvm = spark._jvm
+    target = jvm.org.apache.hadoop.fs.Path(path)
+    return target.getFileSystem(spark._jsc.hadoopConfiguration()).getContentSummary(target).getLength()
+
+
+def main() -> int:
+    spark = SparkSession.builder.appName("s3a-profile-bench").getOrCreate()
+    profile = os.environ.get("SPARK_PROFILE") or "none"
+    base = (os.environ.get("BENCH_OUTPUT") or "s3a://spark-test/bench/profiles").rstrip("/") + f"/{profile}"
+    rows = int(os.environ.get("BENCH_ROWS") or "4000000")
+    files = int(os.environ.get("BENCH_FILES") or "16")
+    small_files = int(os.environ.get("BENCH_SMALL_FILES") or "400")
+    seconds: dict = {}
+    try:
+        large = (
+            spark.range(0, rows, numPartitions=files)
+            .withColumn("bucket", col("id") % 1000)
+            .withColumn("name", concat(lit("row-"), col("id")))
+            .withColumn("payload", sha2(col("name"), 256))
+        )
+        _timed(seconds, "large_write", lambda: large.write.mode("overwrite").parquet(f"{base}/large"))
+        _timed(
+            seconds,
+            "large_scan",
+            lambda: spark.read.parquet(f"{base}/large").selectExpr("sum(id)", "count(distinct payload)").collect(),
+        )
+        _timed(
+            seconds,
+            "selective_read",
+            lambda: spark.read.parquet(f"{base}/large").where("bucket = 7").select("id", "name").collect(),
+        )
+        small = spark.range(0, small_files * 10, numPartitions=small_files).withColumn("name", concat(lit("row-"), col("id")))
+        _timed(seconds, "small_write", lambda: small.write.mode("overwrite").parquet(f"{base}/small"))
+        _timed(seconds, "small_read", lambda: spark.read.parquet(f"{base}/small").count())
+
+        conf = spark.sparkContext.getConf()
+        print(
+            json.dumps(
+                {
+                    "profile": profile,
+                    "rows": rows,
+                    "files": files,
+                    "small_files": small_files,
+                    "committer": conf.get("spark.hadoop.fs.s3a.committer.name", "file"),
+                    "bytes": {"large": _size(spark, f"{base}/large"), "small": _size(spark, f"{base}/small")},
+                    "seconds": seconds,
+                }
+            )
+        )
+        return 0
+    finally:
+        spark.stop()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
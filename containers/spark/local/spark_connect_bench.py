@@ -0,0 +1,85 @@
+"""Latency of short queries through Spark Connect versus cold spark-submit runs.
+
+Runs BENCH_QUERIES (default 10) short tasks each way, alternating so host drift
+affects both equally. Every task is a new process, like an Airflow task:
+
+- ``connect``: ``python3 spark_connect_query.py connect BENCH_CONNECT_URL``
+  against the long-lived ``spark-connect`` compose service;
+- ``spark_submit``: ``entrypoint.sh spark_connect_query.py submit``, a cold
+  driver JVM and SparkSession per task.
+
+Prints one JSON document with the median, min and max wall-clock seconds per
+mode (measured around each process), the in-process session/query split, and
+the speedup of Connect over spark-submit.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import pyspark
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+QUERY_SCRIPT = os.path.join(HERE, "spark_connect_query.py")
+
+
+def _child_env() -> dict:
+    # This script itself runs under spark-submit; its gateway must not leak into the tasks.
+    return {key: value for key, value in os.environ.items() if not key.startswith("PYSPARK_GATEWAY_")}
+
+
+def _task(command: list) -> dict:
+    started = time.perf_counter()
+    result = subprocess.run(command, env=_child_env(), capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise SystemExit(f"{' '.join(command)} failed:\n{result.stderr[-4000:]}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return {"wall_seconds": elapsed, **timings}
+
+
+def _summary(runs: list) -> dict:
+    walls = [run["wall_seconds"] for run in runs]
+    return {
+        "seconds": round(statistics.median(walls), 3),
+        "min_seconds": round(min(walls), 3),
+        "max_seconds": round(max(walls), 3),
+        "first_seconds": round(walls[0], 3),
+        "session_seconds": round(statistics.median(run["session_seconds"] for run in runs), 3),
+        "query_seconds": round(statistics.median(run["query_seconds"] for run in runs), 3),
+        "tasks": len(runs),
+    }
+
+
+def main() -> int:
+    queries = int(os.environ.get("BENCH_QUERIES") or "10")
+    url = os.environ.get("BENCH_CONNECT_URL") or "sc://spark-connect:15002"
+    entrypoint = os.environ.get("BENCH_ENTRYPOINT") or "/usr/local/bin/entrypoint.sh"
+    commands = {
+        "connect": [sys.executable, QUERY_SCRIPT, "connect", url],
+        "spark_submit": [entrypoint, "--conf", "spark.ui.enabled=false", QUERY_SCRIPT, "submit"],
+    }
+    runs: dict = {mode: [] for mode in commands}
+    for _ in range(queries):
+        for mode, command in commands.items():
+            runs[mode].append(_task(command))
+    phases = {mode: _summary(results) for mode, results in runs.items()}
+    print(
+        json.dumps(
+            {
+                "benchmark": "spark-connect",
+                "versions": {"spark": pyspark.__version__, "python": sys.version.split()[0]},
+                "config": {"queries": queries, "url": url, "query": os.environ.get("BENCH_QUERY")},
+                "phases": phases,
+                "speedup": round(phases["spark_submit"]["seconds"] / phases["connect"]["seconds"], 2),
+            },
+            sort_keys=True,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,45 @@
+"""One short "task" for the Spark Connect benchmark.
+
+``spark_connect_query.py connect <sc://host:port>`` runs BENCH_QUERY against a
+Spark Connect server; ``spark_connect_query.py submit`` runs it in a fresh local
+session (launch it with spark-submit). Prints one JSON line with the seconds to
+a usable session and to the query result, measured inside the process.
+"""
+import json
+import os
+import sys
+import time
+
+STARTED = time.perf_counter()
+
+from pyspark.sql import SparkSession  # noqa: E402 - import time counts as task startup
+
+QUERY = os.environ.get("BENCH_QUERY") or "SELECT count(*) AS n, sum(id) AS total FROM range(1000000)"
+
+
+def main() -> int:
+    mode = sys.argv[1]
+    builder = SparkSession.builder.appName("spark-connect-query")
+    if mode == "connect":
+        builder = builder.remote(sys.argv[2])
+    spark = builder.getOrCreate()
+    ready = time.perf_counter()
+    rows = spark.sql(QUERY).collect()
+    done = time.perf_counter()
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "session_seconds": round(ready - STARTED, 3),
+                "query_seconds": round(done - ready, 3),
+                "rows": len(rows),
+            }
+        )
+    )
+    if mode != "connect":
+        spark.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+CDS = ROOT / "files" / "cds.sh"
+
+# Sources cds.sh, enables the archive and prints what spark-submit would see.
+PROBE = """
+. "$CDS_SH"
+spark_cds_enable "$@"
+printf 'SPARK_CONF_DIR=%s\\n' "${SPARK_CONF_DIR:-}"
+printf 'SPARK_DIST_CLASSPATH=%s\\n' "${SPARK_DIST_CLASSPATH:-}"
+printf 'SPARK_SUBMIT_OPTS=%s\\n' "${SPARK_SUBMIT_OPTS:-}"
+printf 'args=%s\\n' "${SPARK_CDS_ARGS[*]}"
+"""
+
+
+def _assert_equal(actual, expected, label):
+    if actual != expected:
+        raise SystemExit(f"{label} mismatch: {actual!r} != {expected!r}")
+
+
+def _spark_home(tmp: Path) -> Path:
+    """A SPARK_HOME whose archive fingerprints were recorded the way the Dockerfile does."""
+    home = tmp / "spark"
+    for name, text in {
+        "jars/spark-core_2.13-4.0.1.jar": "jar",
+        "conf/spark-defaults.conf": "spark.ui.enabled false",
+        "conf/log4j2.properties": "rootLogger.level = warn",
+        "conf/profiles/throughput.conf": "spark.hadoop.fs.s3a.threads.max 64",
+        "cds/spark.jsa": "archive",
+    }.items():
+        path = home / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text + "\n")
+    (home / "cds" / "conf").mkdir()
+    subprocess.run(
+        [
+            "bash",
+            "-c",
+            '. "$CDS_SH" && spark_cds_fingerprint > "$SPARK_CDS_ARCHIVE.classpath"'
+            ' && spark_cds_conf_fingerprint "$SPARK_HOME/conf" > "$SPARK_CDS_ARCHIVE.conf"',
+        ],
+        env={"PATH": os.environ["PATH"], "CDS_SH": str(CDS), "SPARK_HOME": str(home)},
+        check=True,
+    )
+    return home
+
+
+def _enable(home: Path, *args: str, env: dict | None = None) -> tuple[dict, str]:
+    full_env = {"PATH": os.environ["PATH"], "CDS_SH": str(CDS), "SPARK_HOME": str(home), **(env or {})}
+    result = subprocess.run(
+        ["bash", "-c", PROBE, "probe", *args], env=full_env, capture_output=True, text=True, check=True
+    )
+    return dict(line.split("=", 1) for line in result.stdout.splitlines()), result.stderr
+
+
+def test_image_conf_is_swapped(tmp: Path) -> None:
+    home = _spark_home(tmp)
+    conf = home / "conf"
+    report, stderr = _enable(home, "app.py")
+    _assert_equal(report["SPARK_CONF_DIR"], str(home / "cds" / "conf"), "empty conf dir swapped in")
+    _assert_equal(report["SPARK_DIST_CLASSPATH"], str(conf), "conf dir moved behind the jars")
+    _assert_equal(report["args"], f"--properties-file {conf}/spark-defaults.conf", "defaults passed explicitly")
+    _assert_equal(
+        report["SPARK_SUBMIT_OPTS"],
+        f"-XX:SharedArchiveFile={home}/cds/spark.jsa -Xshare:auto"
+        f" -Dlog4j2.configurationFile=file:{conf}/log4j2.properties",
+        "archive and log4j2 options",
+    )
+    _assert_equal(stderr, "", "no notice for the image's configuration")
+
+
+def test_mounted_conf_is_left_alone(tmp: Path) -> None:
+    home = _spark_home(tmp)
+    (home / "conf" / "spark-defaults.conf").write_text("spark.sql.shuffle.partitions 8\n")
+    report, stderr = _enable(home, "app.py")
+    _assert_equal(
+        (report["SPARK_CONF_DIR"], report["args"], report["SPARK_SUBMIT_OPTS"]),
+        ("", "", ""),
+        "edited conf dir disables the archive",
+    )
+    if "differs from the image's configuration" not in stderr:
+        raise SystemExit(f"missing notice: {stderr!r}")
+
+    (home / "conf" / "spark-defaults.conf").write_text("spark.ui.enabled false\n")
+    (home / "conf" / "hive-site.xml").write_text("<configuration/>\n")
+    report, _ = _enable(home, "app.py")
+    _assert_equal(report["SPARK_CONF_DIR"], "", "an added file disables the archive")
+
+
+def test_custom_conf_dir_is_left_alone(tmp: Path) -> None:
+    home = _spark_home(tmp)
+    custom = tmp / "custom-conf"
+    custom.mkdir()
+    (custom / "spark-defaults.conf").write_text("spark.master k8s://https://kubernetes.default.svc\n")
+    report, _ = _enable(home, "app.py", env={"SPARK_CONF_DIR": str(custom)})
+    _assert_equal(report["SPARK_CONF_DIR"], str(custom), "custom SPARK_CONF_DIR kept")
+    _assert_equal(report["args"], "", "no properties file injected")
+
+
+def test_opt_outs(tmp: Path) -> None:
+    home = _spark_home(tmp)
+    report, _ = _enable(home, "app.py", env={"SPARK_CDS": "off"})
+    _assert_equal(report["SPARK_CONF_DIR"], "", "SPARK_CDS=off")
+    report, _ = _enable(home, "--driver-class-path", "/opt/extra.jar", "app.py")
+    _assert_equal(report["SPARK_CONF_DIR"], "", "prepended driver class path")
+    (home / "jars" / "extra.jar").write_text("jar\n")
+    report, _ = _enable(home, "app.py")
+    _assert_equal(report["SPARK_CONF_DIR"], "", "changed jar set")
+
+
+def main():
+    for test in (
+        test_image_conf_is_swapped,
+        test_mounted_conf_is_left_alone,
+        test_custom_conf_dir_is_left_alone,
+        test_opt_outs,
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print(json.dumps({"status": "ok"}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Compares time-to-SparkSession with and without the baked AppCDS archive and
+# fails if the archive is present but the JVM does not map it.
+# ROUNDS (default 3) sets how many cold starts are timed per mode. Opt-in: runs
+# only with RUN_COMPOSE_BENCH=1, which `make bench PACKAGE=spark` sets.
+
+if [[ "${RUN_COMPOSE_BENCH:-0}" != "1" ]]; then
+  echo "AppCDS startup benchmark skipped (run 'make bench PACKAGE=spark' or set RUN_COMPOSE_BENCH=1)" >&2
+  exit 0
+fi
+
+# shellcheck source=image_ref.sh
+source "$(dirname "${BASH_SOURCE[0]}")/image_ref.sh"
+rounds="${ROUNDS:-3}"
+
+if ! command -v docker >/dev/null 2>&1; then
+  echo "docker not available; cannot run AppCDS startup benchmark" >&2
+  exit 1
+fi
+
+if ! docker run --rm --entrypoint test "${image_ref}" -f /opt/spark/cds/spark.jsa; then
+  echo "AppCDS startup benchmark skipped (${image_ref} was built with SPARK_APPCDS=false)" >&2
+  exit 0
+fi
+
+probe() {
+  docker run --rm -e SPARK_CDS="$1" --entrypoint bash "${image_ref}" -c \
+    'export STARTED_NS="$(date +%s%N)"; exec /usr/local/bin/entrypoint.sh --master "local[1]" --conf spark.ui.enabled=false /opt/spark/cds/appcds_workload.py startup' \
+    2>/dev/null | tail -n 1
+}
+
+results=()
+for ((round = 1; round <= rounds; round++)); do
+  # Alternate the modes so drift on the host affects both equally.
+  for mode in off auto; do
+    line="$(probe "$mode")"
+    echo "round ${round} SPARK_CDS=${mode}: ${line}"
+    results+=("${mode} ${line}")
+  done
+done
+
+printf '%s\n' "${results[@]}" | python3 -c '
+import json
+import statistics
+import sys
+
+runs = {"off": [], "auto": []}
+archives = set()
+for line in sys.stdin:
+    mode, _, payload = line.strip().partition(" ")
+    result = json.loads(payload)
+    runs[mode].append(result["seconds_to_session"])
+    if mode == "auto":
+        archives.add(result["cds_archive"])
+
+summary = {mode: round(statistics.median(values), 3) for mode, values in runs.items()}
+summary["speedup"] = round(summary["off"] / summary["auto"], 2)
+print(json.dumps({"median_seconds_to_session": summary, "archive": sorted(map(str, archives))}))
+if None in archives:
+    raise SystemExit("AppCDS archive present but not mapped; check jars fingerprint and class path")
+'
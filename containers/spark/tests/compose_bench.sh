@@ -0,0 +1,105 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Usage: compose_bench.sh <script.py>
+#
+# Runs a benchmark job from containers/spark/local through the spark-bench
+# compose service against MinIO and saves its JSON result to OUTPUT (default
+# .cache/package/bench/spark/<script>-<timestamp>.json). BENCH_* variables and
+# SPARK_PROFILE are passed to the job. BENCH_SERVICES names extra compose
+# services (e.g. spark-connect) to start and wait for first. With BASELINE set to an earlier result,
+# it prints seconds per phase side by side and fails when a phase got slower by
+# more than BENCH_TOLERANCE (default 0.25, i.e. 25%). Compare results from the
+# current image with one built from a proposed Spark, Hadoop, AWS SDK or Iceberg
+# bump before applying it. Opt-in: runs only with RUN_COMPOSE_BENCH=1, which
+# `make bench PACKAGE=spark` sets.
+
+if [[ "${RUN_COMPOSE_BENCH:-0}" != "1" ]]; then
+  echo "${1:-compose_bench.sh} skipped (run 'make bench PACKAGE=spark' or set RUN_COMPOSE_BENCH=1)" >&2
+  exit 0
+fi
+
+script="${1:?usage: compose_bench.sh <script.py>}"
+script="$(basename "${script}")"
+
+if ! command -v docker >/dev/null 2>&1; then
+  echo "docker not available; cannot run ${script}" >&2
+  exit 1
+fi
+
+if ! docker compose version >/dev/null 2>&1; then
+  echo "docker compose not available; cannot run ${script}" >&2
+  exit 1
+fi
+
+repo_root="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+if git_root="$(git -C "${repo_root}" rev-parse --show-toplevel 2>/dev/null)"; then
+  repo_root="${git_root}"
+fi
+compose_file="${repo_root}/docker-compose.spark.local.yml"
+project_name="spark-bench-$$"
+output="${OUTPUT:-${repo_root}/.cache/package/bench/spark/${script%.py}-$(date -u +%Y%m%dT%H%M%SZ).json}"
+
+if [[ ! -f "${repo_root}/containers/spark/local/${script}" ]]; then
+  echo "benchmark job not found: containers/spark/local/${script}" >&2
+  exit 1
+fi
+
+cleanup() {
+  docker compose -f "${compose_file}" --project-name "${project_name}" down -v --remove-orphans >/dev/null 2>&1 || true
+}
+trap cleanup EXIT
+
+if ! docker image inspect spark-runtime:local >/dev/null 2>&1; then
+  echo "spark-runtime:local image not found; run 'make build PACKAGE=spark' first" >&2
+  exit 1
+fi
+
+env_args=(-e "BENCH_SCRIPT=${script}" -e "SPARK_PROFILE=${SPARK_PROFILE:-}")
+while IFS= read -r name; do
+  [[ "${name}" == BENCH_SCRIPT || "${name}" == BENCH_SERVICES ]] || env_args+=(-e "${name}")
+done < <(compgen -e | grep '^BENCH_' || true)
+
+if [[ -n "${BENCH_SERVICES:-}" ]]; then
+  # shellcheck disable=SC2086
+  docker compose -f "${compose_file}" --project-name "${project_name}" --profile bench \
+    up -d --wait ${BENCH_SERVICES}
+fi
+
+result="$(
+  docker compose -f "${compose_file}" --project-name "${project_name}" --profile bench \
+    run --rm "${env_args[@]}" spark-bench | tail -n 1
+)"
+mkdir -p "$(dirname "${output}")"
+printf '%s\n' "${result}" >"${output}"
+echo "${script} result written to ${output}"
+
+RESULT="${output}" BASELINE="${BASELINE:-}" TOLERANCE="${BENCH_TOLERANCE:-0.25}" python3 - <<'PY'
+import json
+import os
+from pathlib import Path
+
+current = json.loads(Path(os.environ["RESULT"]).read_text())
+baseline_path = os.environ["BASELINE"]
+baseline = json.loads(Path(baseline_path).read_text()) if baseline_path else None
+tolerance = float(os.environ["TOLERANCE"])
+
+print("versions:", json.dumps(current.get("versions", {}), sort_keys=True))
+if baseline:
+    print("baseline:", json.dumps(baseline.get("versions", {}), sort_keys=True))
+phases = current["phases"]
+width = max([len("phase")] + [len(name) for name in phases])
+print(f"{'phase':<{width}}  {'seconds':>9}  {'baseline':>9}  {'ratio':>6}")
+regressions = []
+for name, phase in phases.items():
+    before = (baseline or {}).get("phases", {}).get(name, {}).get("seconds")
+    ratio = phase["seconds"] / before if before else None
+    before_cell = f"{before:>9.3f}" if before is not None else f"{'-':>9}"
+    ratio_cell = f"{ratio:>6.2f}" if ratio else f"{'-':>6}"
+    print(f"{name:<{width}}  {phase['seconds']:>9.3f}  {before_cell}  {ratio_cell}")
+    # Sub-100ms differences (planning a small table, for instance) are noise, not regressions.
+    if ratio and ratio > 1 + tolerance and phase["seconds"] - before > 0.1:
+        regressions.append(f"{name} {ratio:.2f}x slower")
+if regressions:
+    raise SystemExit("regressions over {:.0%}: {}".format(tolerance, ", ".join(regressions)))
+PY
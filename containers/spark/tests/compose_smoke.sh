@@ -38,5 +38,13 @@ if ! docker image inspect spark-runtime:local >/dev/null 2>&1; then
   exit 1
 fi
 
+# `package.py analyze-classpath spark --collect` sets CLASS_TRACE_DIR to gather one
+# class-load log per JVM from the smoke jobs.
+if [[ -n "${CLASS_TRACE_DIR:-}" ]]; then
+  mkdir -p "${CLASS_TRACE_DIR}"
+  chmod 0777 "${CLASS_TRACE_DIR}"
+  export SPARK_SMOKE_TRACE_DIR="${CLASS_TRACE_DIR}"
+  export SPARK_SMOKE_JAVA_TOOL_OPTIONS="-Xlog:class+load=info:file=/opt/trace/class-load-%p.log"
+fi
 
 docker compose -f "${compose_file}" --project-name "${project_name}" up --exit-code-from spark-smoke
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+ENTRYPOINT = ROOT / "files" / "entrypoint.sh"
+GIB = 1024 * 1024 * 1024
+
+
+def _assert_equal(actual, expected, label):
+    if actual != expected:
+        raise SystemExit(f"{label} mismatch: {actual!r} != {expected!r}")
+
+
+def _host_cpus() -> int:
+    return int(subprocess.run(["nproc"], capture_output=True, text=True, check=True).stdout)
+
+
+def _write(root: Path, files: dict) -> None:
+    for name, value in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"{value}\n")
+
+
+def _run(tmp: Path, cgroup: dict, *args: str, env: dict | None = None):
+    """Return (report dict, spark-submit command line) from `entrypoint.sh --print-tuning`."""
+    root = tmp / "cgroup"
+    _write(root, cgroup)
+    spark_home = tmp / "spark"
+    (spark_home / "conf").mkdir(parents=True, exist_ok=True)
+    full_env = {
+        "PATH": os.environ["PATH"],
+        "SPARK_HOME": str(spark_home),
+        "SPARK_LIB_DIR": str(ROOT / "files"),
+        "SPARK_CGROUP_ROOT": str(root),
+        **(env or {}),
+    }
+    result = subprocess.run(
+        ["bash", str(ENTRYPOINT), "--print-tuning", *args], env=full_env, capture_output=True, text=True, check=True
+    )
+    lines = result.stdout.strip().splitlines()
+    report = dict(line.split("=", 1) for line in lines[:-1])
+    return report, lines[-1]
+
+
+def test_cgroup_v2(tmp: Path) -> None:
+    report, command = _run(tmp, {"cgroup.controllers": "cpu memory", "cpu.max": "250000 100000", "memory.max": 4 * GIB}, "app.py")
+    cpus = min(3, _host_cpus())
+    _assert_equal(report["cgroup"], "v2", "v2 detection")
+    _assert_equal(report["cpus"], str(cpus), "v2 cpus rounded up from the quota")
+    _assert_equal(report["spark.driver.memory"], "3072m", "v2 driver heap")
+    _assert_equal(report["spark.driver.memoryOverhead"], "1024m", "v2 overhead")
+    _assert_equal(report["spark.sql.shuffle.partitions"], str(cpus * 4), "v2 shuffle partitions")
+    _assert_equal(
+        command,
+        f"spark-submit --driver-memory 3072m --conf spark.driver.memoryOverhead=1024m --master local\\[{cpus}\\] "
+        f"--conf spark.default.parallelism={cpus * 2} --conf spark.sql.shuffle.partitions={cpus * 4} app.py",
+        "v2 spark-submit command",
+    )
+
+
+def test_cgroup_v1_small(tmp: Path) -> None:
+    report, _ = _run(
+        tmp,
+        {
+            "cpu,cpuacct/cpu.cfs_quota_us": 100000,
+            "cpu,cpuacct/cpu.cfs_period_us": 100000,
+            "memory/memory.limit_in_bytes": GIB,
+        },
+        "app.py",
+    )
+    _assert_equal(report["cgroup"], "v1", "v1 detection")
+    _assert_equal(report["cpus"], "1", "v1 cpus")
+    _assert_equal(report["spark.driver.memory"], "640m", "v1 heap keeps the 384m minimum overhead")
+    _assert_equal(report["spark.master"], "local[1]", "v1 master")
+
+
+def test_unlimited_falls_back_to_host(tmp: Path) -> None:
+    report, _ = _run(
+        tmp,
+        {"cpu/cpu.cfs_quota_us": -1, "cpu/cpu.cfs_period_us": 100000, "memory/memory.limit_in_bytes": 9223372036854771712},
+        "app.py",
+    )
+    _assert_equal(report["cpus"], str(_host_cpus()), "unlimited quota uses the host CPU count")
+    with open("/proc/meminfo") as fh:
+        host_mb = next(int(line.split()[1]) // 1024 for line in fh if line.startswith("MemTotal:"))
+    _assert_equal(report["memory_limit_mb"], str(host_mb), "unlimited memory uses MemTotal")
+
+
+def test_user_settings_win(tmp: Path) -> None:
+    _write(tmp / "spark" / "conf", {"spark-defaults.conf": "spark.default.parallelism 16"})
+    report, command = _run(
+        tmp,
+        {"cpu.max": "200000 100000", "memory.max": 2 * GIB},
+        "--driver-memory",
+        "1g",
+        "--master",
+        "local[8]",
+        "--conf",
+        "spark.sql.shuffle.partitions=50",
+        "app.py",
+    )
+    for key in ("spark.driver.memory", "spark.master", "spark.default.parallelism", "spark.sql.shuffle.partitions"):
+        _assert_equal(report[key], "(user)", f"{key} left to the user")
+    _assert_equal(
+        command,
+        "spark-submit --conf spark.driver.memoryOverhead=512m --driver-memory 1g --master local\\[8\\] "
+        "--conf spark.sql.shuffle.partitions=50 app.py",
+        "user flags are passed through untouched",
+    )
+
+
+def test_skipped(tmp: Path) -> None:
+    report, command = _run(tmp, {"cpu.max": "max 100000"}, "--deploy-mode", "cluster", "app.py")
+    _assert_equal(report, {"autotune": "skipped (cluster deploy mode)"}, "cluster deploy mode")
+    _assert_equal(command, "spark-submit --deploy-mode cluster app.py", "cluster command")
+    report, _ = _run(tmp, {"cpu.max": "max 100000"}, "app.py", env={"SPARK_AUTOTUNE": "off"})
+    _assert_equal(report, {"autotune": "off"}, "SPARK_AUTOTUNE=off")
+
+
+def test_non_local_master_only_sizes_the_driver(tmp: Path) -> None:
+    report, _ = _run(tmp, {"cpu.max": "100000 100000", "memory.max": 2 * GIB}, "--master", "k8s://https://api:6443", "app.py")
+    _assert_equal(sorted(report), sorted(["cgroup", "cpus", "memory_limit_mb", "spark.driver.memory", "spark.driver.memoryOverhead"]), "k8s keys")
+
+
+def test_profiles(tmp: Path) -> None:
+    env = {"SPARK_AUTOTUNE": "off", "SPARK_PROFILE_DIR": str(ROOT / "files" / "profiles")}
+    report, command = _run(
+        tmp,
+        {},
+        "--conf",
+        "spark.hadoop.fs.s3a.multipart.size=8M",
+        "app.py",
+        env={**env, "SPARK_PROFILE": "throughput, low-latency"},
+    )
+    _assert_equal(report["profile"], "throughput,low-latency", "profile names")
+    _assert_equal(report["spark.hadoop.fs.s3a.experimental.input.fadvise"], "random", "later profile wins")
+    _assert_equal(report["spark.hadoop.fs.s3a.threads.max"], "128", "earlier profile keys are kept")
+    _assert_equal(report["spark.hadoop.fs.s3a.multipart.size"], "(user)", "user --conf wins")
+    _assert_equal(report["spark.hadoop.fs.s3a.committer.name"], "magic", "committer settings")
+    if "--conf spark.hadoop.fs.s3a.multipart.size=8M app.py" not in command or "multipart.size=32M" in command:
+        raise SystemExit(f"profile overrode the user setting: {command}")
+    for name in ("throughput", "low-latency", "small-files", "pyarrow"):
+        report, _ = _run(tmp, {}, "app.py", env={**env, "SPARK_PROFILE": name})
+        _assert_equal(report["profile"], name, f"{name} profile loads")
+    report, command = _run(tmp, {}, "app.py", env={**env, "SPARK_PROFILE": "none"})
+    _assert_equal((report, command), ({"autotune": "off"}, "spark-submit app.py"), "SPARK_PROFILE=none")
+    result = subprocess.run(
+        ["bash", str(ENTRYPOINT), "--print-tuning", "app.py"],
+        env={**os.environ, **env, "SPARK_HOME": str(tmp), "SPARK_LIB_DIR": str(ROOT / "files"), "SPARK_PROFILE": "fast"},
+        capture_output=True,
+        text=True,
+    )
+    _assert_equal(result.returncode, 1, "unknown profile exit code")
+    if "available: low-latency,pyarrow,small-files,throughput" not in result.stderr:
+        raise SystemExit(f"unknown profile error does not list profiles: {result.stderr!r}")
+
+
+def test_connect_mode(tmp: Path) -> None:
+    report, command = _run(
+        tmp,
+        {"cpu.max": "100000 100000", "memory.max": 2 * GIB},
+        "--conf",
+        "spark.sql.catalog.local.type=hadoop",
+        env={"SPARK_MODE": "connect", "SPARK_CONNECT_PORT": "15010"},
+    )
+    _assert_equal(report["spark.master"], "local[1]", "the Connect server is tuned like any driver")
+    if not command.endswith(
+        "--class org.apache.spark.sql.connect.service.SparkConnectServer --name Spark\\ Connect\\ server "
+        "--conf spark.connect.grpc.binding.port=15010 --conf spark.sql.catalog.local.type=hadoop"
+    ):
+        raise SystemExit(f"unexpected Spark Connect command: {command}")
+    result = subprocess.run(
+        ["bash", str(ENTRYPOINT), "--print-tuning"],
+        env={**os.environ, "SPARK_HOME": str(tmp), "SPARK_LIB_DIR": str(ROOT / "files"), "SPARK_MODE": "thrift"},
+        capture_output=True,
+        text=True,
+    )
+    _assert_equal(result.returncode, 1, "unknown SPARK_MODE exit code")
+
+
+def main():
+    for test in (
+        test_cgroup_v2,
+        test_cgroup_v1_small,
+        test_unlimited_falls_back_to_host,
+        test_user_settings_win,
+        test_skipped,
+        test_non_local_master_only_sizes_the_driver,
+        test_profiles,
+        test_connect_mode,
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print(json.dumps({"status": "ok"}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Runs healthcheck.sh in every SPARK_HEALTHCHECK_MODE inside the image and
+# reports wall-clock and CPU time per probe. ROUNDS (default 5) sets the probes
+# per mode. Opt-in: runs only with RUN_COMPOSE_BENCH=1, which
+# `make bench PACKAGE=spark` sets.
+
+if [[ "${RUN_COMPOSE_BENCH:-0}" != "1" ]]; then
+  echo "healthcheck benchmark skipped (run 'make bench PACKAGE=spark' or set RUN_COMPOSE_BENCH=1)" >&2
+  exit 0
+fi
+
+# shellcheck source=image_ref.sh
+source "$(dirname "${BASH_SOURCE[0]}")/image_ref.sh"
+
+if ! command -v docker >/dev/null 2>&1; then
+  echo "docker not available; cannot run healthcheck benchmark" >&2
+  exit 1
+fi
+
+docker run --rm -e ROUNDS="${ROUNDS:-5}" --entrypoint python3 "${image_ref}" - <<'PY'
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+rounds = int(os.environ["ROUNDS"])
+failed = False
+for mode in ("static", "driver", "cached", "full"):
+    env = dict(os.environ, SPARK_HEALTHCHECK_MODE=mode, SPARK_HEALTHCHECK_STATE=f"/tmp/healthcheck-{mode}.state")
+    walls, cpus, status = [], [], 0
+    for _ in range(rounds):
+        before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        started = time.perf_counter()
+        result = subprocess.run(["/usr/local/bin/healthcheck.sh"], env=env, capture_output=True, text=True)
+        walls.append(time.perf_counter() - started)
+        after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpus.append(after.ru_utime - before.ru_utime + after.ru_stime - before.ru_stime)
+        status = status or result.returncode
+        if result.returncode:
+            print(result.stdout + result.stderr, file=sys.stderr)
+    failed = failed or status != 0
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "status": status,
+                "first_wall_ms": round(walls[0] * 1000, 1),
+                "mean_wall_ms": round(sum(walls) / rounds * 1000, 1),
+                "mean_cpu_ms": round(sum(cpus) / rounds * 1000, 1),
+            }
+        )
+    )
+sys.exit(1 if failed else 0)
+PY
@@ -0,0 +1,29 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Runs healthcheck.sh once in every SPARK_HEALTHCHECK_MODE inside the image.
+# Every mode must pass in an idle container. Timings are measured by
+# healthcheck_bench.sh (the healthcheck-bench benchmark).
+
+if ! command -v docker >/dev/null 2>&1; then
+  echo "healthcheck modes test skipped (docker not available)" >&2
+  exit 0
+fi
+
+# shellcheck source=image_ref.sh
+source "$(dirname "${BASH_SOURCE[0]}")/image_ref.sh"
+
+docker run --rm --entrypoint bash "${image_ref}" -c '
+failed=0
+for mode in static driver cached full; do
+  if output="$(SPARK_HEALTHCHECK_MODE="$mode" SPARK_HEALTHCHECK_STATE="/tmp/healthcheck-$mode.state" /usr/local/bin/healthcheck.sh 2>&1)"; then
+    echo "SPARK_HEALTHCHECK_MODE=$mode: ok"
+  else
+    status=$?
+    echo "$output" >&2
+    echo "SPARK_HEALTHCHECK_MODE=$mode: failed (exit $status)" >&2
+    failed=1
+  fi
+done
+exit "$failed"
+'
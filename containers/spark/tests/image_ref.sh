@@ -0,0 +1,28 @@
+# shellcheck shell=bash
+# Sourced by the Spark test and benchmark scripts. Sets metadata_path to this
+# package's container.yaml and image_ref to publish.image:version.current,
+# unless IMAGE_REF is already set.
+
+# shellcheck disable=SC2034  # both are read by the scripts that source this file
+metadata_path="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/container.yaml"
+image_ref="${IMAGE_REF:-$(
+  METADATA_PATH="$metadata_path" python3 - <<'PY'
+import os
+import re
+from pathlib import Path
+
+text = Path(os.environ["METADATA_PATH"]).read_text()
+image = None
+version = None
+for line in text.splitlines():
+    if image is None and re.match(r"^\s*image:\s*", line):
+        image = re.sub(r"^\s*image:\s*", "", line).strip().strip('"').strip("'")
+    if version is None and re.match(r"^\s*current:\s*", line):
+        version = re.sub(r"^\s*current:\s*", "", line).strip().strip('"').strip("'")
+
+if not image or not version:
+    raise SystemExit("unable to resolve publish.image or version.current from container.yaml")
+
+print(f"{image}:{version}")
+PY
+)}"
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+ENTRYPOINT = ROOT / "files" / "entrypoint.sh"
+
+# Trimmed IOStatisticsSnapshot JSON as S3AFileSystem serializes it.
+SNAPSHOT = {
+    "counters": {
+        "action_http_get_request": 12,
+        "action_http_get_request.failures": 1,
+        "action_http_head_request": 4,
+        "object_list_request": 3,
+        "object_put_request": 0,
+        "store_io_retry": 2,
+        "store_io_throttled": 1,
+        "stream_read_bytes": 4096,
+        "stream_write_bytes": 1024,
+        "committer_commits_completed": 5,
+    },
+    "gauges": {},
+    "minimums": {"action_http_get_request.min": 3},
+    "maximums": {"action_http_get_request.max": 40},
+    "meanstatistics": {
+        "action_http_get_request.mean": {"samples": 12, "sum": 120},
+        "object_put_request.mean": {"samples": 0, "sum": 0},
+    },
+}
+
+
+def _assert_equal(actual, expected, label):
+    if actual != expected:
+        raise SystemExit(f"{label} mismatch: {actual!r} != {expected!r}")
+
+
+def _load_hook():
+    spec = importlib.util.spec_from_file_location("iostats_hook", ROOT / "files" / "iostats_hook.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _print_tuning(tmp: Path, *args: str, env: dict | None = None) -> tuple[dict, str]:
+    full_env = {
+        "PATH": os.environ["PATH"],
+        "SPARK_HOME": str(tmp),
+        "SPARK_LIB_DIR": str(ROOT / "files"),
+        "SPARK_AUTOTUNE": "off",
+        **(env or {}),
+    }
+    result = subprocess.run(
+        ["bash", str(ENTRYPOINT), "--print-tuning", *args], env=full_env, capture_output=True, text=True, check=True
+    )
+    lines = result.stdout.strip().splitlines()
+    return dict(line.split("=", 1) for line in lines[:-1]), lines[-1]
+
+
+def test_entrypoint_wraps_python_apps(tmp: Path) -> None:
+    hook = ROOT / "files" / "iostats_hook.py"
+    env = {"SPARK_IOSTATS": "s3a://bucket/iostats"}
+    report, command = _print_tuning(tmp, "--master", "local[2]", "--conf", "a=b", "app.py", "--day", "1", env=env)
+    _assert_equal(report["iostats.hook"], "app.py", "python app is wrapped")
+    _assert_equal(
+        command,
+        "spark-submit --conf spark.hadoop.fs.iostatistics.logging.level=warn --name app.py "
+        f"--master local\\[2\\] --conf a=b {hook} app.py --day 1",
+        "hook replaces the primary resource",
+    )
+    report, command = _print_tuning(tmp, "--deploy-mode", "cluster", "app.py", env=env)
+    _assert_equal(report["iostats.hook"], "skipped (app.py)", "cluster mode is not wrapped")
+    _assert_equal(
+        command,
+        "spark-submit --conf spark.hadoop.fs.iostatistics.logging.level=warn --deploy-mode cluster app.py",
+        "cluster command",
+    )
+    _, command = _print_tuning(tmp, "--name", "job", "--class", "Main", "app.jar", env=env)
+    _assert_equal(
+        command,
+        "spark-submit --conf spark.hadoop.fs.iostatistics.logging.level=warn --name job --class Main app.jar",
+        "JVM apps only get the logging level",
+    )
+    report, command = _print_tuning(tmp, "app.py")
+    _assert_equal((report, command), ({"autotune": "off"}, "spark-submit app.py"), "SPARK_IOSTATS unset")
+
+
+def test_summarize() -> None:
+    hook = _load_hook()
+    summary = hook.summarize(SNAPSHOT)
+    _assert_equal(
+        summary["requests"],
+        {"action_http_get_request": 12, "action_http_head_request": 4, "object_list_request": 3},
+        "request counters",
+    )
+    _assert_equal(summary["failures"], {"action_http_get_request.failures": 1}, "failures")
+    _assert_equal((summary["retries"], summary["throttles"]), (2, 1), "retries and throttles")
+    _assert_equal((summary["bytes_read"], summary["bytes_written"]), (4096, 1024), "bytes")
+    _assert_equal(summary["committer"], {"committer_commits_completed": 5}, "committer counters")
+    _assert_equal(
+        summary["latency"],
+        {"action_http_get_request": {"count": 12, "mean_ms": 10.0, "min_ms": 3, "max_ms": 40}},
+        "latency",
+    )
+    totals = hook.totals({"s3a://a": {"summary": summary}, "s3a://b": {"summary": summary}})
+    _assert_equal(totals["requests"], 38, "requests summed across filesystems")
+    _assert_equal(totals["bytes_read"], 8192, "bytes summed across filesystems")
+
+
+def _run_hook(tmp: Path, source: str, *args: str) -> tuple[list, type]:
+    """Run ``source`` through the hook against a fake pyspark; returns the collected contexts and SparkContext."""
+    hook = _load_hook()
+
+    class SparkContext:
+        _active_spark_context = None
+        started = 0
+
+        def __init__(self):
+            SparkContext.started += 1
+            SparkContext._active_spark_context = self
+            self.applicationId = f"local-{SparkContext.started}"
+
+        def stop(self):
+            SparkContext._active_spark_context = None
+
+    original_stop = SparkContext.stop
+    sys.modules["pyspark"] = types.SimpleNamespace(SparkContext=SparkContext)
+    collected = []
+    hook.collect = lambda sc: collected.append(sc.applicationId) or {"app_id": sc.applicationId, "totals": {}}
+    app = tmp / "app.py"
+    app.write_text("from pyspark import SparkContext\n" + source)
+    os.environ["SPARK_IOSTATS"] = str(tmp / "out")
+    argv = sys.argv
+    try:
+        sys.argv = ["iostats_hook.py", str(app), *args]
+        hook.main()
+    finally:
+        sys.argv = argv
+        del sys.modules["pyspark"]
+        del os.environ["SPARK_IOSTATS"]
+        _assert_equal(SparkContext.stop, original_stop, "SparkContext.stop restored")
+    return collected, SparkContext
+
+
+def test_hook_dumps_once_per_context(tmp: Path) -> None:
+    collected, _ = _run_hook(
+        tmp,
+        "import sys\n"
+        "assert sys.argv[1:] == ['--day', '1'], sys.argv\n"
+        "sc = SparkContext()\n"
+        "sc.stop()\n"
+        "sc.stop()\n"
+        "SparkContext().stop()\n"
+        "SparkContext()\n",
+        "--day",
+        "1",
+    )
+    _assert_equal(collected, ["local-1", "local-2", "local-3"], "one report per context, unstopped one at exit")
+    for app_id in collected:
+        report = json.loads((tmp / "out" / f"iostats-{app_id}.json").read_text())
+        _assert_equal(report["app_id"], app_id, "report written to the local directory")
+
+
+def test_hook_keeps_the_exit_status(tmp: Path) -> None:
+    try:
+        _run_hook(tmp, "import sys\nSparkContext()\nsys.exit(3)\n")
+    except SystemExit as exc:
+        _assert_equal(exc.code, 3, "app exit status")
+    else:
+        raise SystemExit("the app's SystemExit was swallowed")
+    report = json.loads((tmp / "out" / "iostats-local-1.json").read_text())
+    _assert_equal(report["app_id"], "local-1", "report written before exiting")
+
+
+def main():
+    for test in (test_entrypoint_wraps_python_apps, test_hook_dumps_once_per_context, test_hook_keeps_the_exit_status):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    test_summarize()
+    print(json.dumps({"status": "ok"}))
+
+
+if __name__ == "__main__":
+    main()
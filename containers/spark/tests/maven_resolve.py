@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import zipfile
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "files"))
+
+import maven_resolve  # noqa: E402
+
+VERSION = "2.0.0"
+POM = """<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <properties>{props}</properties>
+  <dependencyManagement><dependencies>{managed}</dependencies></dependencyManagement>
+  <dependencies>{deps}</dependencies>
+</project>
+"""
+
+
+def _dep(group, artifact, version="", scope="", optional=""):
+    parts = [f"<groupId>{group}</groupId>", f"<artifactId>{artifact}</artifactId>"]
+    if version:
+        parts.append(f"<version>{version}</version>")
+    if scope:
+        parts.append(f"<scope>{scope}</scope>")
+    if optional:
+        parts.append(f"<optional>{optional}</optional>")
+    return "<dependency>" + "".join(parts) + "</dependency>"
+
+
+def _assert_equal(actual, expected, label):
+    if actual != expected:
+        raise SystemExit(f"{label} mismatch: {actual!r} != {expected!r}")
+
+
+class FakeRepo:
+    """A Maven layout on disk served over keep-alive HTTP, counting requests and connections."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.requests = []
+        self.peers = set()
+
+    def publish(self, group, artifact, version, extension, data, sha1=None):
+        path = self.root / maven_resolve.Repository.path((group, artifact, version), extension)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        digest = sha1 or hashlib.sha1(data).hexdigest()
+        path.with_name(path.name + ".sha1").write_text(f"{digest}  {path.name}\n")
+
+    def serve(self):
+        repo = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                repo.requests.append(self.path)
+                repo.peers.add(self.client_address)
+                super().do_GET()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=str(self.root)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _build_repo(root: Path) -> FakeRepo:
+    repo = FakeRepo(root)
+    aws = maven_resolve.AWS_GROUP
+    pom = lambda props="", managed="", deps="": POM.format(props=props, managed=managed, deps=deps).encode()
+    repo.publish(aws, "aws-sdk-java-pom", VERSION, "pom", pom(props="<netty.version>4.1.0</netty.version>"))
+    repo.publish(
+        aws,
+        "bom-internal",
+        VERSION,
+        "pom",
+        pom(managed=_dep("io.netty", "netty-codec", "${netty.version}") + _dep(aws, "utils", "${awsjavasdk.version}")),
+    )
+    repo.publish(aws, "s3", VERSION, "pom", pom(deps=_dep(aws, "sdk-core", VERSION) + _dep(aws, "utils")))
+    repo.publish(
+        aws,
+        "sdk-core",
+        VERSION,
+        "pom",
+        pom(
+            deps=_dep(aws, "utils", "${project.version}")
+            + _dep("io.netty", "netty-codec")
+            + _dep("org.slf4j", "slf4j-api", "1.7.36")
+            + _dep("junit", "junit", "4.13", scope="test")
+            + _dep("com.example", "optional-lib", "1.0", optional="true")
+            + _dep(aws, "thirdparty-jackson-core", VERSION)
+        ),
+    )
+    repo.publish(aws, "utils", VERSION, "pom", pom())
+    repo.publish("io.netty", "netty-codec", "4.1.0", "pom", pom())
+    for group, artifact, version in (
+        (aws, "s3", VERSION),
+        (aws, "sdk-core", VERSION),
+        (aws, "utils", VERSION),
+        ("io.netty", "netty-codec", "4.1.0"),
+        ("org.slf4j", "slf4j-api", "2.0.16"),
+    ):
+        repo.publish(group, artifact, version, "jar", f"{artifact}-jar".encode())
+
+    bundle = io.BytesIO()
+    with zipfile.ZipFile(bundle, "w") as zf:
+        zf.writestr("software/amazon/awssdk/thirdparty/jackson/core/JsonParser.class", b"jackson")
+        zf.writestr("software/amazon/awssdk/services/s3/S3Client.class", b"s3")
+        zf.writestr("META-INF/services/software.amazon.awssdk.thirdparty.jackson.core.JsonFactory", b"jackson.core.X")
+        zf.writestr("META-INF/services/other", b"unrelated")
+    repo.publish(aws, "bundle", VERSION, "jar", bundle.getvalue())
+    return repo
+
+
+def _run(repo_url: str, local: Path, *command: str, **inputs: str) -> None:
+    for key in maven_resolve.LOCK_INPUTS + ("SCALA_BINARY_VERSION",):
+        os.environ.pop(key, None)
+    os.environ.update({"AWS_SDK_BUNDLE_VERSION": VERSION, "AWS_SDK_MODULES": "s3", "SLF4J_API_VERSION": "2.0.16"})
+    os.environ.update(inputs)
+    maven_resolve.main(["--repo", repo_url, "--local-repo", str(local), "--jobs", "4", *command])
+
+
+def test_resolve_install_and_cache(tmp: Path) -> None:
+    repo = _build_repo(tmp / "remote")
+    server = repo.serve()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        _run(url, tmp / "m2", "install", "--dest", str(tmp / "jars"))
+        jars = sorted(path.name for path in (tmp / "jars").iterdir())
+        _assert_equal(
+            jars,
+            [
+                "netty-codec-4.1.0.jar",
+                "s3-2.0.0.jar",
+                "sdk-core-2.0.0.jar",
+                "slf4j-api-2.0.16.jar",
+                "thirdparty-jackson-core-2.0.0.jar",
+                "utils-2.0.0.jar",
+            ],
+            "installed jars",
+        )
+        with zipfile.ZipFile(tmp / "jars" / "thirdparty-jackson-core-2.0.0.jar") as zf:
+            _assert_equal(
+                sorted(zf.namelist()),
+                [
+                    "META-INF/services/software.amazon.awssdk.thirdparty.jackson.core.JsonFactory",
+                    "software/amazon/awssdk/thirdparty/jackson/core/JsonParser.class",
+                ],
+                "bundle fallback entries",
+            )
+        if len(repo.peers) >= len(repo.requests):
+            raise SystemExit(f"expected keep-alive reuse: {len(repo.requests)} requests over {len(repo.peers)} connections")
+
+        # A second build against the same local repository only re-requests absent POMs.
+        repo.requests.clear()
+        _run(url, tmp / "m2", "install", "--dest", str(tmp / "jars-again"))
+        fetched = [path for path in repo.requests if not path.endswith("thirdparty-jackson-core-2.0.0.pom")]
+        _assert_equal(fetched, [], "requests with a warm local repository")
+        _assert_equal(len(list((tmp / "jars-again").iterdir())), 6, "jars from cache")
+    finally:
+        server.shutdown()
+
+
+def test_live_install_covers_pinned_jars(tmp: Path) -> None:
+    # Without a lockfile the build relies on this path for every jar the old per-jar curl steps fetched.
+    repo = _build_repo(tmp / "remote")
+    pom = POM.format(props="<log4j.version>2.24.3</log4j.version>", managed="", deps="").encode()
+    repo.publish("org.apache.spark", "spark-parent_2.12", "4.0.1", "pom", pom)
+    pinned = (
+        ("org.apache.iceberg", "iceberg-spark-runtime-4.0_2.13", "1.10.0"),
+        ("org.apache.hadoop", "hadoop-client-api", "3.4.1"),
+        ("org.apache.hadoop", "hadoop-client-runtime", "3.4.1"),
+        ("org.apache.hadoop", "hadoop-aws", "3.4.1"),
+        ("org.apache.spark", "spark-hadoop-cloud_2.12", "4.0.1"),
+        ("org.apache.logging.log4j", "log4j-slf4j-impl", "2.24.3"),
+        ("javax.xml.bind", "jaxb-api", "2.3.1"),
+        ("com.sun.xml.bind", "jaxb-impl", "2.3.9"),
+        ("com.sun.xml.bind", "jaxb-core", "2.3.0.1"),
+        ("javax.activation", "javax.activation-api", "1.2.0"),
+    )
+    for group, artifact, version in pinned:
+        repo.publish(group, artifact, version, "jar", f"{artifact}-jar".encode())
+    server = repo.serve()
+    try:
+        _run(
+            f"http://127.0.0.1:{server.server_address[1]}",
+            tmp / "m2",
+            "install",
+            "--dest",
+            str(tmp / "jars"),
+            SPARK_VERSION="4.0.1",
+            HADOOP_VERSION="3.4.1",
+            HADOOP_AWS_VERSION="3.4.1",
+            ICEBERG_VERSION="1.10.0",
+            ICEBERG_RUNTIME_FLAVOR="4.0_2.13",
+            JAXB_API_VERSION="2.3.1",
+            JAXB_IMPL_VERSION="2.3.9",
+            JAXB_CORE_VERSION="2.3.0.1",
+            ACTIVATION_VERSION="1.2.0",
+            # The Dockerfile passes the Scala suffix of the distribution's spark-core jar.
+            SCALA_BINARY_VERSION="2.12",
+        )
+    finally:
+        server.shutdown()
+    installed = {path.name for path in (tmp / "jars").iterdir()}
+    missing = sorted({f"{artifact}-{version}.jar" for _, artifact, version in pinned} - installed)
+    _assert_equal(missing, [], "pinned jars missing from a live install")
+
+
+def test_checksum_mismatch(tmp: Path) -> None:
+    repo = _build_repo(tmp / "remote")
+    repo.publish("io.netty", "netty-codec", "4.1.0", "jar", b"tampered", sha1="0" * 40)
+    server = repo.serve()
+    try:
+        _run(f"http://127.0.0.1:{server.server_address[1]}", tmp / "m2", "install", "--dest", str(tmp / "jars"))
+    except maven_resolve.ChecksumError as exc:
+        if "netty-codec-4.1.0.jar" not in str(exc):
+            raise SystemExit(f"unexpected checksum error: {exc}")
+    else:
+        raise SystemExit("sha1 mismatch was not detected")
+    finally:
+        server.shutdown()
+    if (tmp / "m2" / maven_resolve.Repository.path(("io.netty", "netty-codec", "4.1.0"), "jar")).exists():
+        raise SystemExit("a jar that failed verification was left in the local repository")
+
+
+def test_lockfile(tmp: Path) -> None:
+    repo = _build_repo(tmp / "remote")
+    server = repo.serve()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    lockfile = tmp / "jars.lock.json"
+    try:
+        # A --lock that does not exist fails instead of quietly resolving live.
+        try:
+            _run(url, tmp / "m2", "install", "--lock", str(lockfile), "--dest", str(tmp / "jars-unlocked"))
+        except SystemExit as exc:
+            if "not found" not in str(exc):
+                raise
+        else:
+            raise SystemExit("a missing lockfile was ignored")
+
+        _run(url, tmp / "m2", "lock", "--output", str(lockfile))
+        lock = json.loads(lockfile.read_text())
+        _assert_equal(lock["inputs"]["AWS_SDK_MODULES"], "s3", "locked inputs")
+        _assert_equal(
+            [entry["coordinate"] for entry in lock["jars"]],
+            [
+                "io.netty:netty-codec:4.1.0",
+                "org.slf4j:slf4j-api:2.0.16",
+                "software.amazon.awssdk:s3:2.0.0",
+                "software.amazon.awssdk:sdk-core:2.0.0",
+                "software.amazon.awssdk:utils:2.0.0",
+            ],
+            "locked coordinates",
+        )
+        _assert_equal(lock["jars"][0]["sha256"], hashlib.sha256(b"netty-codec-jar").hexdigest(), "locked sha256")
+        _assert_equal(lock["bundle"]["split"], ["thirdparty-jackson-core"], "locked bundle split")
+
+        # Installing from the lockfile never reads a POM.
+        repo.requests.clear()
+        _run(url, tmp / "m2-fresh", "install", "--lock", str(lockfile), "--dest", str(tmp / "jars"))
+        poms = [path for path in repo.requests if path.endswith(".pom")]
+        _assert_equal(poms, [], "POM requests when installing from a lockfile")
+        _assert_equal(len(list((tmp / "jars").iterdir())), 6, "jars installed from the lockfile")
+
+        # An upstream artifact that changes after locking fails the sha256 pin even with a valid .sha1.
+        repo.publish("io.netty", "netty-codec", "4.1.0", "jar", b"republished")
+        try:
+            _run(url, tmp / "m2-other", "install", "--lock", str(lockfile), "--dest", str(tmp / "jars-other"))
+        except maven_resolve.ChecksumError:
+            pass
+        else:
+            raise SystemExit("a jar that no longer matches the lockfile was installed")
+
+        os.environ["AWS_SDK_MODULES"] = "s3,sts"
+        try:
+            maven_resolve.main(["--repo", url, "--local-repo", str(tmp / "m2"), "install", "--lock", str(lockfile), "--dest", str(tmp / "x")])
+        except SystemExit as exc:
+            if "stale" not in str(exc):
+                raise
+        else:
+            raise SystemExit("a stale lockfile was accepted")
+    finally:
+        server.shutdown()
+
+
+def test_split_bundle_single_pass(tmp: Path) -> None:
+    payload = bytes(range(256)) * 64
+    bundle = tmp / "bundle.jar"
+    with zipfile.ZipFile(bundle, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("software/amazon/awssdk/transfer/s3/S3TransferManager.class", payload)
+        zf.writestr("software/amazon/awssdk/thirdparty/org/slf4j/Logger.class", b"logger")
+        zf.writestr("software/amazon/awssdk/services/s3/S3Client.class", payload)
+        zf.writestr("META-INF/services/shared", b"software.amazon.awssdk.transfer.X\norg.slf4j.Y\n")
+        zf.writestr("META-INF/services/other", b"unrelated")
+
+    chunk_size = maven_resolve.CHUNK_SIZE
+    maven_resolve.CHUNK_SIZE = 7  # force the raw copy through many small reads
+    try:
+        stats = maven_resolve.split_bundle(bundle, ["thirdparty-slf4j-api", "s3-transfer-manager"], VERSION, tmp)
+    finally:
+        maven_resolve.CHUNK_SIZE = chunk_size
+    _assert_equal(stats["modules"], ["s3-transfer-manager", "thirdparty-slf4j-api"], "split modules")
+    _assert_equal(stats["entries"], 4, "routed entries")
+    if not stats["seconds"] >= 0 or "peak_rss_mib" not in stats:
+        raise SystemExit(f"split stats incomplete: {stats}")
+
+    with zipfile.ZipFile(bundle) as src, zipfile.ZipFile(tmp / f"s3-transfer-manager-{VERSION}.jar") as dst:
+        _assert_equal(dst.testzip(), None, "corrupt entry in split jar")
+        _assert_equal(
+            sorted(dst.namelist()),
+            ["META-INF/services/shared", "software/amazon/awssdk/transfer/s3/S3TransferManager.class"],
+            "transfer-manager entries",
+        )
+        name = "software/amazon/awssdk/transfer/s3/S3TransferManager.class"
+        copied, original = dst.getinfo(name), src.getinfo(name)
+        _assert_equal(
+            (copied.compress_type, copied.compress_size, copied.CRC),
+            (original.compress_type, original.compress_size, original.CRC),
+            "compressed entry copied without recompression",
+        )
+        _assert_equal(dst.read(name), payload, "copied entry contents")
+    with zipfile.ZipFile(tmp / f"thirdparty-slf4j-api-{VERSION}.jar") as dst:
+        _assert_equal(dst.testzip(), None, "corrupt entry in split jar")
+        _assert_equal(dst.read("software/amazon/awssdk/thirdparty/org/slf4j/Logger.class"), b"logger", "slf4j entry")
+        _assert_equal(len(dst.namelist()), 2, "slf4j entries")
+
+
+def main():
+    for test in (
+        test_resolve_install_and_cache,
+        test_live_install_covers_pinned_jars,
+        test_checksum_mismatch,
+        test_lockfile,
+        test_split_bundle_single_pass,
+    ):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print(json.dumps({"status": "ok"}))
+
+
+if __name__ == "__main__":
+    main()
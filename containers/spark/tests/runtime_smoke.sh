@@ -1,29 +1,8 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-metadata_path="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/container.yaml"
-
-image_ref="$(
-  METADATA_PATH="$metadata_path" python3 - <<'PY'
-import re
-import os
-from pathlib import Path
-
-text = Path(os.environ["METADATA_PATH"]).read_text()
-image = None
-version = None
-for line in text.splitlines():
-    if image is None and re.match(r"^\s*image:\s*", line):
-        image = re.sub(r"^\s*image:\s*", "", line).strip().strip('"').strip("'")
-    if version is None and re.match(r"^\s*current:\s*", line):
-        version = re.sub(r"^\s*current:\s*", "", line).strip().strip('"').strip("'")
-
-if not image or not version:
-    raise SystemExit("unable to resolve publish.image or version.current from container.yaml")
-
-print(f"{image}:{version}")
-PY
-)"
+# shellcheck source=image_ref.sh
+source "$(dirname "${BASH_SOURCE[0]}")/image_ref.sh"
 
 if ! command -v docker >/dev/null 2>&1; then
   echo "docker not available; cannot run runtime smoke test" >&2
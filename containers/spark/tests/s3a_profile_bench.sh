@@ -0,0 +1,83 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Runs local/s3a_profile_bench.py against the compose MinIO stack once per
+# SPARK_PROFILE and prints the seconds per phase for each profile next to the
+# baseline (no profile). PROFILES (default "none throughput low-latency
+# small-files") and ROUNDS (default 1) control the matrix; BENCH_ROWS,
+# BENCH_FILES and BENCH_SMALL_FILES size the data. Opt-in: runs only with
+# RUN_COMPOSE_BENCH=1, which `make bench PACKAGE=spark` sets.
+
+if [[ "${RUN_COMPOSE_BENCH:-0}" != "1" ]]; then
+  echo "S3A profile benchmark skipped (run 'make bench PACKAGE=spark' or set RUN_COMPOSE_BENCH=1)" >&2
+  exit 0
+fi
+
+if ! command -v docker >/dev/null 2>&1; then
+  echo "docker not available; cannot run S3A profile benchmark" >&2
+  exit 1
+fi
+
+if ! docker compose version >/dev/null 2>&1; then
+  echo "docker compose not available; cannot run S3A profile benchmark" >&2
+  exit 1
+fi
+
+repo_root="$(cd "$(dirname "${BASH_SOURCE[0]}")/../.." && pwd)"
+if git_root="$(git -C "${repo_root}" rev-parse --show-toplevel 2>/dev/null)"; then
+  repo_root="${git_root}"
+fi
+compose_file="${repo_root}/docker-compose.spark.local.yml"
+project_name="spark-s3a-bench-$$"
+profiles="${PROFILES:-none throughput low-latency small-files}"
+rounds="${ROUNDS:-1}"
+
+cleanup() {
+  docker compose -f "${compose_file}" --project-name "${project_name}" down -v --remove-orphans >/dev/null 2>&1 || true
+}
+trap cleanup EXIT
+
+if ! docker image inspect spark-runtime:local >/dev/null 2>&1; then
+  echo "spark-runtime:local image not found; run 'make build PACKAGE=spark' first" >&2
+  exit 1
+fi
+
+results=()
+for ((round = 1; round <= rounds; round++)); do
+  for profile in ${profiles}; do
+    line="$(
+      docker compose -f "${compose_file}" --project-name "${project_name}" --profile bench \
+        run --rm -e SPARK_PROFILE="${profile/#none/}" -e BENCH_SCRIPT=s3a_profile_bench.py \
+        -e BENCH_ROWS -e BENCH_FILES -e BENCH_SMALL_FILES spark-bench 2>/dev/null | tail -n 1
+    )"
+    echo "round ${round} SPARK_PROFILE=${profile}: ${line}"
+    results+=("${line}")
+  done
+done
+
+printf '%s\n' "${results[@]}" | python3 -c '
+import json
+import statistics
+import sys
+
+runs = {}
+for line in sys.stdin:
+    result = json.loads(line)
+    for phase, seconds in result["seconds"].items():
+        runs.setdefault(result["profile"], {}).setdefault(phase, []).append(seconds)
+
+medians = {profile: {phase: statistics.median(v) for phase, v in phases.items()} for profile, phases in runs.items()}
+phases = list(next(iter(medians.values())))
+baseline = medians.get("none")
+width = max([len("profile")] + [len(p) for p in medians])
+print("profile".ljust(width) + "  " + "  ".join(f"{phase:>14}" for phase in phases))
+for profile, values in medians.items():
+    cells = []
+    for phase in phases:
+        cell = f"{values[phase]:.2f}s"
+        if baseline and profile != "none":
+            cell += f" {baseline[phase] / values[phase]:.2f}x"
+        cells.append(f"{cell:>14}")
+    print(f"{profile:<{width}}  " + "  ".join(cells))
+print(json.dumps({"median_seconds": medians}))
+'
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Micro-benchmark the http-directory version scan against a synthetic listing."""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import time
+import tracemalloc
+from typing import Callable, Iterable, List
+
+from package import UPSTREAM_CHUNK_SIZE, scan_latest, version_key
+
+PATTERN = r"spark-([0-9]+\.[0-9]+\.[0-9]+(?:-preview[0-9]+|-rc[0-9]+)?)/"
+
+
+def synthetic_listing(entries: int, mixed: bool) -> bytes:
+    """Build an Apache-style directory index with ``entries`` release folders."""
+    lines = ["<html><head><title>Index of /dist/spark</title></head><body><pre>"]
+    count = 0
+    major = 0
+    while count < entries:
+        major += 1
+        for minor in range(50):
+            for patch in range(20):
+                if count >= entries:
+                    break
+                suffix = ""
+                if mixed and patch % 7 == 0:
+                    suffix = f"-preview{patch % 3 + 1}" if patch % 2 else f"-rc{patch % 4 + 1}"
+                name = f"spark-{major}.{minor}.{patch}{suffix}/"
+                lines.append(f'<a href="{name}">{name}</a>  2024-01-01 00:00    -   ')
+                count += 1
+    lines.append("</pre></body></html>")
+    return "\n".join(lines).encode("utf-8")
+
+
+def legacy_scan(chunks: Iterable[bytes], pattern: str) -> str:
+    """The previous implementation: buffer, decode, findall, then max with a rebuilt key."""
+
+    def legacy_key(value: str):
+        parts = []
+        for token in str(value).replace("-", ".").split("."):
+            parts.append(int(token) if token.isdigit() else token)
+        return tuple(parts)
+
+    payload = b"".join(chunks).decode("utf-8", "ignore")
+    matches = re.findall(pattern, payload, flags=re.IGNORECASE)
+    return max(matches, key=legacy_key)
+
+
+def measure(label: str, func: Callable[[], str], repeat: int) -> dict:
+    timings: List[float] = []
+    result = None
+    error = None
+    for _ in range(repeat):
+        version_key.cache_clear()
+        started = time.perf_counter()
+        try:
+            result = func()
+        except TypeError as exc:
+            error = f"TypeError: {exc}"
+            break
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+    except TypeError:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "scanner": label,
+        "latest": result,
+        "error": error,
+        "best_ms": round(min(timings) * 1000, 2) if timings else None,
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 2) if timings else None,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=50_000, help="Directory entries to generate")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per scanner")
+    parser.add_argument("--chunk-size", type=int, default=UPSTREAM_CHUNK_SIZE, help="Bytes per streamed chunk")
+    parser.add_argument("--mixed", action="store_true", help="Include -preview/-rc releases in the listing")
+    args = parser.parse_args()
+
+    body = synthetic_listing(args.entries, args.mixed)
+
+    def chunks() -> Iterable[bytes]:
+        for offset in range(0, len(body), args.chunk_size):
+            yield body[offset : offset + args.chunk_size]
+
+    print(json.dumps({"entries": args.entries, "bytes": len(body), "chunk_size": args.chunk_size}))
+    print(json.dumps(measure("legacy", lambda: legacy_scan(chunks(), PATTERN), args.repeat)))
+    print(json.dumps(measure("streaming", lambda: scan_latest(chunks(), PATTERN), args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,9 @@ if not PACKAGES:
 
 packages = json.loads(PACKAGES)
 results = []
-for pkg in packages:
-    cmd = ["./scripts/package.py", "check-upstream", pkg]
+if packages:
+    # One in-process, concurrent run instead of a subprocess per package.
+    cmd = ["./scripts/package.py", "check-upstream", *packages]
     completed = subprocess.run(cmd, capture_output=True, text=True, cwd=REPO_ROOT)
     stdout = completed.stdout.strip()
     if stdout:
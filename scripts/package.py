@@ -2,16 +2,47 @@
 """Helper CLI for building, testing, and publishing upstream container packages."""
 from __future__ import annotations
 
-import argparse
-import json
+import functools
 import os
-import subprocess
+import re
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import argparse
+    from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+_STARTED = time.perf_counter()
+_PHASES: List[Tuple[str, float]] = []
 
 ROOT = Path(__file__).resolve().parents[1]
 CONTAINERS_DIR = ROOT / "containers"
+DEFAULT_BUILD_CPUS = 1.0
+DEFAULT_BUILD_MEMORY = "2g"
+METADATA_INDEX = ROOT / ".cache" / "package" / "metadata-index.json"
+METADATA_INDEX_VERSION = 1
+BUILD_MANIFEST = ROOT / ".cache" / "package" / "build-manifest.json"
+BUILDKIT_CACHE_DIR = ROOT / ".cache" / "buildkit"
+DEFAULT_BUILD_CACHE_MAX = "10g"
+BUILD_REPORT_DIR = ROOT / ".cache" / "package" / "build-reports"
+TEST_REPORT_DIR = ROOT / ".cache" / "package" / "test-reports"
+CLASSPATH_REPORT_DIR = ROOT / ".cache" / "package" / "classpath"
+DEFAULT_TEST_TIMEOUT = 1800.0
+# Matches coreutils timeout(1) so callers can tell a timeout from a failure.
+TIMEOUT_EXIT_CODE = 124
+_MANIFEST_LOCK = threading.Lock()
+HTTP_CACHE_DIR = ROOT / ".cache" / "package" / "http"
+UPSTREAM_CHUNK_SIZE = 64 * 1024
+UPSTREAM_PER_HOST_LIMIT = int(os.environ.get("UPSTREAM_PER_HOST_LIMIT", "4"))
+_HOST_SLOTS: Dict[str, threading.Semaphore] = {}
+_HOST_SLOTS_LOCK = threading.Lock()
+# Process groups LogMux.run started in their own session; Ctrl-C does not reach them on its own.
+_LIVE_GROUPS: set = set()
+_INTERRUPTS: List[int] = []
+_INTERRUPTED = threading.Event()
 
 
 def load_metadata(slug: str) -> Tuple[Dict[str, Any], Path]:
@@ -19,7 +50,7 @@ def load_metadata(slug: str) -> Tuple[Dict[str, Any], Path]:
     metadata_path = package_dir / "container.yaml"
     if not metadata_path.exists():
         raise SystemExit(f"container metadata not found: {metadata_path}")
-    metadata = _load_yaml(metadata_path)
+    metadata = _INDEX.get(metadata_path)
     return metadata, package_dir
 
 
@@ -29,7 +60,77 @@ def _load_yaml(path: Path) -> Dict[str, Any]:
     except ModuleNotFoundError:
         raise SystemExit("Install pyyaml (pip install pyyaml) to use this script.")
 
-    return yaml.safe_load(path.read_text())
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(path.read_text(), Loader=loader)
+
+
+class MetadataIndex:
+    """Parsed container.yaml files cached on disk as JSON.
+
+    Entries are reused while the file's size and mtime match; on a mismatch the
+    content hash decides whether the YAML really needs re-parsing. A warm index
+    never imports PyYAML. Freshly parsed YAML goes through the same JSON
+    round-trip as the on-disk index, so dates and non-string mapping keys look
+    the same whether or not the index was warm.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        import json
+
+        if self._entries is None:
+            try:
+                data = json.loads(self.path.read_text())
+            except (OSError, json.JSONDecodeError):
+                data = {}
+            if data.get("version") != METADATA_INDEX_VERSION:
+                data = {"version": METADATA_INDEX_VERSION, "entries": {}}
+            self._entries = data["entries"]
+        return self._entries
+
+    def get(self, metadata_path: Path) -> Dict[str, Any]:
+        import copy
+
+        key = metadata_path.relative_to(ROOT).as_posix()
+        stat = metadata_path.stat()
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if not entry or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                import hashlib
+
+                raw = metadata_path.read_bytes()
+                digest = hashlib.sha256(raw).hexdigest()
+                if not entry or entry["sha256"] != digest:
+                    import json
+
+                    metadata = json.loads(json.dumps(_load_yaml(metadata_path), default=str))
+                    entry = {"sha256": digest, "metadata": metadata}
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                entries[key] = entry
+                self._save()
+            return copy.deepcopy(entry["metadata"])
+
+    def _save(self) -> None:
+        import json
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(
+                json.dumps({"version": METADATA_INDEX_VERSION, "entries": self._entries}, default=str)
+            )
+            tmp.replace(self.path)
+        except OSError:
+            # A read-only checkout still works; it just re-parses YAML every run.
+            pass
+
+
+_INDEX = MetadataIndex(METADATA_INDEX)
 
 
 def resolve_token(metadata: Dict[str, Any], value: Any) -> Any:
@@ -58,6 +159,53 @@ def flatten_build_args(metadata: Dict[str, Any]) -> Dict[str, str]:
     return resolved
 
 
+@functools.lru_cache(maxsize=1)
+def git_head_sha() -> str | None:
+    """Resolve HEAD by reading .git directly; only shells out to git as a last resort."""
+    git_dir = ROOT / ".git"
+    try:
+        if git_dir.is_file():
+            # Worktrees and submodules point at the real git dir.
+            pointer = git_dir.read_text().strip()
+            if pointer.startswith("gitdir:"):
+                git_dir = (ROOT / pointer[len("gitdir:"):].strip()).resolve()
+        common_dir = git_dir
+        if (git_dir / "commondir").is_file():
+            common_dir = (git_dir / (git_dir / "commondir").read_text().strip()).resolve()
+        head = (git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref:"):
+            if re.fullmatch(r"[0-9a-f]{40}(?:[0-9a-f]{24})?", head):
+                return head
+        else:
+            ref = head[len("ref:"):].strip()
+            for base in (git_dir, common_dir):
+                if (base / ref).is_file():
+                    return (base / ref).read_text().strip()
+            packed = common_dir / "packed-refs"
+            if packed.is_file():
+                for line in packed.read_text().splitlines():
+                    if line and line[0] not in "#^":
+                        value, _, name = line.partition(" ")
+                        if name.strip() == ref:
+                            return value
+    except OSError:
+        pass
+
+    import subprocess
+
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+        )
+        return completed.stdout.strip() or None
+    except Exception:
+        return None
+
+
 def compute_resolved_tags(metadata: Dict[str, Any]) -> List[str]:
     publish = metadata.get("publish", {})
     image = publish.get("image")
@@ -92,16 +240,8 @@ def compute_resolved_tags(metadata: Dict[str, Any]) -> List[str]:
     if env_sha:
         sha = env_sha[:12]
     else:
-        try:
-            completed = subprocess.run(
-                ["git", "rev-parse", "--short=12", "HEAD"],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-            sha = completed.stdout.strip()
-        except Exception:
-            sha = None
+        head = git_head_sha()
+        sha = head[:12] if head else None
     if sha:
         sha_tag = f"sha-{sha}"
         if sha_tag not in resolved:
@@ -127,7 +267,7 @@ def compute_local_tag(metadata: Dict[str, Any]) -> str:
     return f"{base}:local"
 
 
-def docker_build(package_dir: Path, metadata: Dict[str, Any], args: argparse.Namespace) -> None:
+def build_command(package_dir: Path, metadata: Dict[str, Any], args: argparse.Namespace) -> List[str]:
     dockerfile = metadata.get("build", {}).get("dockerfile", "Dockerfile")
     context = metadata.get("build", {}).get("context", ".")
     context_dir = package_dir / context
@@ -139,10 +279,14 @@ def docker_build(package_dir: Path, metadata: Dict[str, Any], args: argparse.Nam
     build_args = flatten_build_args(metadata)
 
     platforms = args.platform or os.environ.get("PACKAGE_PLATFORMS")
-    use_buildx = bool(platforms)
+    cache = cache_flags(metadata)
+    # Cache export needs buildx (and a docker-container builder); plain builds stay on `docker build`.
+    use_buildx = bool(platforms) or bool(cache)
 
     if use_buildx:
         cmd = ["docker", "buildx", "build"]
+        if os.environ.get("PACKAGE_BUILDX_BUILDER"):
+            cmd.extend(["--builder", os.environ["PACKAGE_BUILDX_BUILDER"]])
     else:
         cmd = ["docker", "build"]
 
@@ -160,6 +304,8 @@ def docker_build(package_dir: Path, metadata: Dict[str, Any], args: argparse.Nam
         else:
             raise SystemExit("Multi-architecture builds require PACKAGE_PUSH=1 to push the image")
 
+    cmd.extend(cache)
+
     for tag in tags:
         cmd.extend(["-t", tag])
     if local_tag not in tags:
@@ -169,17 +315,938 @@ def docker_build(package_dir: Path, metadata: Dict[str, Any], args: argparse.Nam
         cmd.extend(["--build-arg", f"{key}={value}"])
 
     cmd.append(str(context_dir))
+    return cmd
 
-    print("→", " ".join(cmd))
-    subprocess.run(cmd, check=True, cwd=package_dir)
 
+def _parse_cache_override(spec: str) -> List[Dict[str, Any]]:
+    """Parse ``PACKAGE_BUILD_CACHE`` (``type=local,path=...;type=registry,ref=...``) into backends."""
+    backends: List[Dict[str, Any]] = []
+    for entry in spec.split(";"):
+        entry = entry.strip()
+        if not entry:
+            continue
+        backend: Dict[str, Any] = {}
+        for field in entry.split(","):
+            key, sep, value = field.partition("=")
+            if not sep:
+                raise SystemExit(f"invalid PACKAGE_BUILD_CACHE entry: {entry!r}")
+            backend[key.strip()] = value.strip()
+        if "export" in backend:
+            backend["export"] = backend["export"].lower() in ("1", "true", "yes")
+        backends.append(backend)
+    return backends
+
+
+def build_cache_backends(metadata: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], str]:
+    """Return the cache backends and default mode, honouring the PACKAGE_BUILD_CACHE override."""
+    slug = metadata.get("slug", "")
+    cache = metadata.get("build", {}).get("cache") or {}
+    mode = os.environ.get("PACKAGE_BUILD_CACHE_MODE") or cache.get("mode", "min")
+    override = os.environ.get("PACKAGE_BUILD_CACHE")
+    if override is None:
+        backends = [dict(backend) for backend in cache.get("backends") or []]
+    elif override.strip().lower() in ("", "off", "none"):
+        return [], mode
+    else:
+        backends = _parse_cache_override(override)
+    for backend in backends:
+        for key, value in backend.items():
+            if isinstance(value, str):
+                backend[key] = value.replace("{slug}", slug)
+    return backends, mode
+
+
+@functools.lru_cache(maxsize=None)
+def _buildx_driver(builder: str | None) -> str | None:
+    import subprocess
+
+    cmd = ["docker", "buildx", "inspect"] + ([builder] if builder else [])
+    completed = subprocess.run(cmd, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return None
+    for line in completed.stdout.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip() == "Driver":
+            return value.strip()
+    return None
+
+
+def cache_flags(metadata: Dict[str, Any]) -> List[str]:
+    """Translate ``build.cache`` into ``--cache-from``/``--cache-to`` flags for buildx.
+
+    Local caches are imported only once they exist and always exported. Registry
+    caches are imported always and exported only when pushing (PACKAGE_PUSH), since
+    writing them needs registry credentials; ``export`` overrides either default.
+    """
+    backends, default_mode = build_cache_backends(metadata)
+    if backends and _buildx_driver(os.environ.get("PACKAGE_BUILDX_BUILDER")) == "docker":
+        # The default docker driver can import registry caches but cannot export any.
+        print(
+            "→ buildx builder uses the docker driver; skipping cache export "
+            "(create one with `docker buildx create --use --driver docker-container`)",
+            file=sys.stderr,
+        )
+        backends = [dict(backend, export=False) for backend in backends if backend.get("type") == "registry"]
+    flags: List[str] = []
+    for backend in backends:
+        kind = backend.get("type")
+        if not kind:
+            raise SystemExit("build.cache backends need a type")
+        mode = backend.get("mode") or default_mode
+        export = backend.get("export")
+        options = {key: value for key, value in backend.items() if key not in ("type", "mode", "export", "path")}
+
+        def spec(**extra: Any) -> str:
+            return ",".join(f"{key}={value}" for key, value in {"type": kind, **options, **extra}.items())
+
+        if kind == "local":
+            path = Path(backend.get("path") or BUILDKIT_CACHE_DIR / metadata.get("slug", ""))
+            path = path if path.is_absolute() else ROOT / path
+            if (path / "index.json").is_file():
+                flags += ["--cache-from", spec(src=path)]
+            if export is not False:
+                flags += ["--cache-to", spec(dest=path, mode=mode)]
+            continue
+        flags += ["--cache-from", spec()]
+        if export or (export is None and (kind != "registry" or os.environ.get("PACKAGE_PUSH"))):
+            flags += ["--cache-to", spec(mode=mode)]
+    return flags
 
-def run_tests(package_dir: Path, metadata: Dict[str, Any], args: argparse.Namespace) -> None:
-    tests = metadata.get("tests", [])
-    if not tests:
-        print("no tests defined; skipping")
+
+def _oci_live_blobs(cache_dir: Path) -> set:
+    """Digests reachable from a local cache's ``index.json``; everything else is stale."""
+    import json
+
+    live: set = set()
+    try:
+        stack = list(json.loads((cache_dir / "index.json").read_text()).get("manifests", []))
+    except (OSError, ValueError):
+        return live
+    while stack:
+        descriptor = stack.pop()
+        digest = descriptor.get("digest", "")
+        if digest in live:
+            continue
+        live.add(digest)
+        if "json" not in descriptor.get("mediaType", "json"):
+            continue
+        blob = cache_dir / "blobs" / digest.replace(":", "/", 1)
+        try:
+            document = json.loads(blob.read_bytes())
+        except (OSError, ValueError):
+            continue
+        if isinstance(document, dict):
+            stack.extend(document.get("manifests") or [])
+            stack.extend(document.get("layers") or [])
+            if document.get("config"):
+                stack.append(document["config"])
+    return live
+
+
+def prune_build_cache(root: Path, max_bytes: int, dry_run: bool = False) -> None:
+    """Bound the local BuildKit cache under ``root`` to ``max_bytes``, least recently used first.
+
+    Blobs no longer referenced by their cache's ``index.json`` go first; if that is
+    not enough, whole per-package caches are evicted oldest export first.
+    """
+    import shutil
+
+    if not root.is_dir():
+        print(f"no build cache at {root}")
+        return
+    caches = sorted(path for path in root.iterdir() if path.is_dir())
+    stale: List[Tuple[float, int, Path]] = []
+    sizes: Dict[Path, int] = {}
+    for cache_dir in caches:
+        live = _oci_live_blobs(cache_dir)
+        sizes[cache_dir] = 0
+        for path in cache_dir.rglob("*"):
+            if not path.is_file():
+                continue
+            info = path.stat()
+            sizes[cache_dir] += info.st_size
+            if path.parent.parent.name == "blobs" and f"{path.parent.name}:{path.name}" not in live:
+                stale.append((max(info.st_atime, info.st_mtime), info.st_size, path))
+
+    total = sum(sizes.values())
+    print(f"build cache {root}: {_format_bytes(total)} in {len(caches)} cache(s), limit {_format_bytes(max_bytes)}")
+    freed = 0
+    for _, size, path in sorted(stale):
+        if total - freed <= max_bytes:
+            break
+        if not dry_run:
+            path.unlink()
+        sizes[path.parents[2]] -= size
+        freed += size
+    if stale:
+        print(f"  stale blobs: {_format_bytes(freed)} {'would be ' if dry_run else ''}removed")
+
+    def last_used(cache_dir: Path) -> float:
+        index = cache_dir / "index.json"
+        return index.stat().st_mtime if index.is_file() else 0.0
+
+    for cache_dir in sorted(caches, key=last_used):
+        if total - freed <= max_bytes:
+            break
+        print(f"  evict {cache_dir.name}: {_format_bytes(sizes[cache_dir])}")
+        if not dry_run:
+            shutil.rmtree(cache_dir)
+        freed += sizes[cache_dir]
+    print(f"{'would free' if dry_run else 'freed'} {_format_bytes(freed)}; {_format_bytes(total - freed)} remain")
+
+
+def _dockerignore_patterns(context_dir: Path) -> List[str]:
+    ignore_file = context_dir / ".dockerignore"
+    if not ignore_file.exists():
+        return []
+    patterns = []
+    for line in ignore_file.read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            patterns.append(line.rstrip("/"))
+    return patterns
+
+
+def _is_ignored(relpath: str, patterns: List[str]) -> bool:
+    import fnmatch
+
+    ignored = False
+    parts = relpath.split("/")
+    prefixes = ["/".join(parts[: i + 1]) for i in range(len(parts))]
+    for pattern in patterns:
+        negate = pattern.startswith("!")
+        pattern = pattern[1:] if negate else pattern
+        pattern = pattern.lstrip("/")
+        if any(fnmatch.fnmatchcase(prefix, pattern) for prefix in prefixes):
+            ignored = not negate
+    return ignored
+
+
+def _hash_file(path: Path) -> str:
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_context(context_dir: Path, previous: Dict[str, Any] | None = None) -> Dict[str, Dict[str, Any]]:
+    """Hash every file docker would send as build context.
+
+    ``previous`` is the file map from the last manifest entry; files whose size and
+    mtime are unchanged reuse the recorded digest instead of being re-read.
+    """
+    previous = previous or {}
+    patterns = _dockerignore_patterns(context_dir)
+    files: Dict[str, Dict[str, Any]] = {}
+    for dirpath, dirnames, filenames in os.walk(context_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            relpath = path.relative_to(context_dir).as_posix()
+            if _is_ignored(relpath, patterns):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            executable = bool(stat.st_mode & 0o111)
+            cached = previous.get(relpath)
+            if cached and cached.get("size") == stat.st_size and cached.get("mtime_ns") == stat.st_mtime_ns:
+                sha = cached["sha256"]
+            else:
+                sha = _hash_file(path)
+            files[relpath] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": sha,
+                "exec": executable,
+            }
+    return files
+
+
+def _digest(value: Any) -> str:
+    import hashlib
+    import json
+
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def resolve_base_images(dockerfile_path: Path, build_args: Dict[str, str]) -> List[str]:
+    """Resolve FROM references to registry digests so an upstream tag move invalidates the cache.
+
+    Digests come from the registry, not the local daemon: a docker-container
+    builder pulls bases without ever loading them there. A reference that cannot
+    be resolved is returned as ``<ref>@unresolved``; explain_cache counts it as a miss.
+    """
+    defaults: Dict[str, str] = {}
+    stages = set()
+    refs: List[str] = []
+    for raw in dockerfile_path.read_text().splitlines():
+        line = raw.strip()
+        upper = line.upper()
+        if upper.startswith("ARG "):
+            name, _, default = line[4:].strip().partition("=")
+            defaults.setdefault(name.strip(), default.strip().strip('"'))
+        elif upper.startswith("FROM "):
+            tokens = [t for t in line.split()[1:] if not t.startswith("--")]
+            if not tokens:
+                continue
+            ref = tokens[0]
+            for name in set(defaults) | set(build_args):
+                value = build_args.get(name, defaults.get(name, ""))
+                ref = ref.replace(f"${{{name}}}", value).replace(f"${name}", value)
+            if len(tokens) >= 3 and tokens[1].lower() == "as":
+                stages.add(tokens[2])
+            if ref in stages or ref == "scratch":
+                continue
+            refs.append(ref)
+
+    resolved = []
+    for ref in dict.fromkeys(refs):
+        if "@sha256:" in ref:
+            resolved.append(ref)
+            continue
+        try:
+            digest = _registry_digest(ref)
+        except OSError:
+            digest = None
+        resolved.append(f"{ref}@{digest or 'unresolved'}")
+    return resolved
+
+
+def build_fingerprint(
+    package_dir: Path,
+    metadata: Dict[str, Any],
+    args: argparse.Namespace,
+    previous: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    build = metadata.get("build", {})
+    context_dir = package_dir / build.get("context", ".")
+    dockerfile_path = package_dir / build.get("dockerfile", "Dockerfile")
+    build_args = flatten_build_args(metadata)
+    files = hash_context(context_dir, (previous or {}).get("files"))
+    base_images = resolve_base_images(dockerfile_path, build_args)
+    inputs = {
+        "dockerfile": _hash_file(dockerfile_path),
+        "context": _digest({path: [info["sha256"], info["exec"]] for path, info in files.items()}),
+        "build_args": _digest(build_args),
+        "base_images": _digest(base_images),
+        "platform": args.platform or os.environ.get("PACKAGE_PLATFORMS") or "",
+    }
+    unresolved = [ref.rsplit("@", 1)[0] for ref in base_images if ref.endswith("@unresolved")]
+    return {"fingerprint": _digest(inputs), "inputs": inputs, "files": files, "unresolved": unresolved}
+
+
+def load_build_manifest() -> Dict[str, Any]:
+    import json
+
+    if not BUILD_MANIFEST.exists():
+        return {}
+    try:
+        return json.loads(BUILD_MANIFEST.read_text())
+    except json.JSONDecodeError:
+        return {}
+
+
+def record_build(slug: str, fingerprint: Dict[str, Any], local_tag: str) -> None:
+    import json
+    import subprocess
+
+    try:
+        completed = subprocess.run(
+            ["docker", "image", "inspect", "--format", "{{.Id}}", local_tag],
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return
+    if completed.returncode != 0:
         return
+    with _MANIFEST_LOCK:
+        manifest = load_build_manifest()
+        manifest[slug] = {**fingerprint, "image_id": completed.stdout.strip(), "built_at": int(time.time())}
+        BUILD_MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+        tmp = BUILD_MANIFEST.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        tmp.replace(BUILD_MANIFEST)
+
+
+def explain_cache(entry: Dict[str, Any] | None, fingerprint: Dict[str, Any]) -> List[str]:
+    """Describe which inputs differ from the recorded build; empty when the cache is valid."""
+    if not entry:
+        return ["no previous build recorded"]
+    reasons = []
+    old_inputs = entry.get("inputs", {})
+    for name, value in fingerprint["inputs"].items():
+        if old_inputs.get(name) == value:
+            continue
+        if name != "context":
+            reasons.append(f"{name} changed")
+            continue
+        old_files = entry.get("files", {})
+        new_files = fingerprint["files"]
+        changed = sorted(
+            path
+            for path in set(old_files) | set(new_files)
+            if (old_files.get(path) or {}).get("sha256") != (new_files.get(path) or {}).get("sha256")
+            or (old_files.get(path) or {}).get("exec") != (new_files.get(path) or {}).get("exec")
+        )
+        shown = ", ".join(changed[:10]) + (f" (+{len(changed) - 10} more)" if len(changed) > 10 else "")
+        reasons.append(f"context changed: {shown}" if changed else "context changed")
+    # Without a digest an upstream tag move would go unnoticed, so never trust the entry.
+    for ref in fingerprint.get("unresolved") or []:
+        reasons.append(f"base image {ref} could not be resolved in its registry")
+    return reasons
+
+
+def cached_image(slug: str, fingerprint: Dict[str, Any]) -> Tuple[str | None, List[str]]:
+    import subprocess
+
+    entry = load_build_manifest().get(slug)
+    reasons = explain_cache(entry, fingerprint)
+    if reasons:
+        return None, reasons
+    image_id = entry["image_id"]
+    try:
+        completed = subprocess.run(
+            ["docker", "image", "inspect", "--format", "{{.Id}}", image_id],
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None, ["docker unavailable"]
+    if completed.returncode != 0:
+        return None, [f"image {image_id[:19]} no longer present locally"]
+    return image_id, []
+
+
+def cache_enabled(args: argparse.Namespace) -> bool:
+    # Pushed (buildx --push) results never land in the local daemon, so there is nothing to reuse.
+    return not getattr(args, "force", False) and not os.environ.get("PACKAGE_PUSH")
+
+
+def reuse_cached_image(image_id: str, metadata: Dict[str, Any]) -> List[List[str]]:
+    tags = compute_tags(metadata)
+    local_tag = compute_local_tag(metadata)
+    if local_tag not in tags:
+        tags.append(local_tag)
+    return [["docker", "tag", image_id, tag] for tag in tags]
+
+
+def docker_build(package_dir: Path, metadata: Dict[str, Any], args: argparse.Namespace) -> None:
+    import subprocess
+
+    slug = metadata.get("slug") or package_dir.name
+    cmd = build_command(package_dir, metadata, args)
+    fingerprint = None
+    if cache_enabled(args) or getattr(args, "explain", False):
+        fingerprint = build_fingerprint(package_dir, metadata, args, load_build_manifest().get(slug))
+        image_id, reasons = cached_image(slug, fingerprint)
+        if getattr(args, "explain", False):
+            print(f"fingerprint {fingerprint['fingerprint'][:16]}")
+            for name, value in fingerprint["inputs"].items():
+                print(f"  {name:<12} {value[:16] if value else '-'}")
+            print("cache hit" if image_id else "cache miss: " + "; ".join(reasons))
+        if image_id and cache_enabled(args):
+            print(f"→ build inputs unchanged; reusing {image_id[:19]}")
+            for retag in reuse_cached_image(image_id, metadata):
+                subprocess.run(retag, check=True)
+            return
+        if cache_enabled(args):
+            print("→ cache miss: " + "; ".join(reasons))
+    if build_reporting(args):
+        report_dir = Path(args.report_dir) if getattr(args, "report_dir", None) else None
+        code = instrumented_build(cmd, package_dir, metadata, report_dir, print)
+        if code != 0:
+            raise SystemExit(f"build failed for {slug} ({code})")
+    else:
+        print("→", " ".join(cmd))
+        subprocess.run(cmd, check=True, cwd=package_dir)
+    if fingerprint is not None and not os.environ.get("PACKAGE_PUSH"):
+        record_build(slug, fingerprint, compute_local_tag(metadata))
+
+
+def _parse_timestamp(value: str | None) -> float | None:
+    """Parse BuildKit's RFC 3339 timestamps (nanosecond precision) to epoch seconds."""
+    from datetime import datetime
+
+    if not value:
+        return None
+    match = re.match(r"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d+))?(Z|[+-]\d\d:\d\d)?$", value)
+    if not match:
+        return None
+    stamp, fraction, zone = match.groups()
+    parsed = datetime.fromisoformat(stamp + ("+00:00" if zone in (None, "Z") else zone))
+    return parsed.timestamp() + float(f"0.{fraction or 0}")
+
+
+class BuildProgress:
+    """Fold ``--progress=rawjson`` events into readable lines and a per-step timing report."""
+
+    def __init__(self, emit: Any) -> None:
+        self.emit = emit
+        self.vertexes: Dict[str, Dict[str, Any]] = {}
+        self.downloads: Dict[str, int] = {}
+        self._numbers: Dict[str, int] = {}
+
+    def _number(self, digest: str) -> int:
+        return self._numbers.setdefault(digest, len(self._numbers) + 1)
+
+    def feed(self, line: str) -> None:
+        import base64
+        import json
+
+        try:
+            event = json.loads(line) if line.startswith("{") else None
+        except ValueError:
+            event = None
+        if not isinstance(event, dict):
+            self.emit(line)
+            return
+
+        for vertex in event.get("vertexes") or []:
+            digest = vertex.get("digest")
+            if not digest:
+                continue
+            state = self.vertexes.setdefault(digest, {"name": vertex.get("name", digest)})
+            if vertex.get("started") and "started" not in state:
+                state["started"] = _parse_timestamp(vertex["started"])
+                self.emit(f"#{self._number(digest)} {state['name']}")
+            if vertex.get("cached"):
+                state["cached"] = True
+            if vertex.get("error"):
+                state["error"] = vertex["error"]
+            if vertex.get("completed") and "completed" not in state:
+                state["completed"] = _parse_timestamp(vertex["completed"])
+                if state.get("cached"):
+                    self.emit(f"#{self._number(digest)} CACHED")
+                elif state.get("error"):
+                    self.emit(f"#{self._number(digest)} ERROR: {state['error']}")
+                else:
+                    seconds = (state["completed"] or 0) - (state.get("started") or state["completed"] or 0)
+                    self.emit(f"#{self._number(digest)} DONE {seconds:.1f}s")
+
+        for status in event.get("statuses") or []:
+            # Layer pulls report progress against their blob digest.
+            if str(status.get("id", "")).startswith("sha256:") and status.get("total"):
+                self.downloads[status["id"]] = max(self.downloads.get(status["id"], 0), int(status["total"]))
+
+        for log in event.get("logs") or []:
+            data = base64.b64decode(log.get("data") or b"").decode("utf-8", "replace")
+            prefix = f"#{self._number(log.get('vertex', ''))} "
+            for text in data.splitlines():
+                self.emit(prefix + text)
+
+    def steps(self) -> List[Dict[str, Any]]:
+        steps = []
+        for digest, state in self.vertexes.items():
+            started, completed = state.get("started"), state.get("completed")
+            steps.append(
+                {
+                    "name": state["name"],
+                    "seconds": round(completed - started, 3) if started and completed else None,
+                    "cached": bool(state.get("cached")),
+                    "error": state.get("error"),
+                }
+            )
+        return steps
+
+
+def image_layers(ref: str) -> List[Dict[str, Any]]:
+    import json
+    import subprocess
+
+    completed = subprocess.run(
+        ["docker", "image", "history", "--no-trunc", "--human=false", "--format", "{{json .}}", ref],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        return []
+    layers = []
+    for line in completed.stdout.splitlines():
+        try:
+            entry = json.loads(line)
+            layers.append({"created_by": entry.get("CreatedBy", ""), "size": int(entry.get("Size") or 0)})
+        except ValueError:
+            continue
+    return layers
+
+
+def build_reporting(args: argparse.Namespace) -> bool:
+    return bool(getattr(args, "report", False) or getattr(args, "report_dir", None) or os.environ.get("PACKAGE_BUILD_REPORT"))
+
+
+def instrumented_build(
+    cmd: List[str],
+    package_dir: Path,
+    metadata: Dict[str, Any],
+    report_dir: Path | None,
+    emit: Any,
+) -> int:
+    """Run ``cmd`` with rawjson progress and write a build report for ``build-report``.
+
+    The report lands in BUILD_REPORT_DIR as ``<slug>.json`` (the latest build) and,
+    when ``report_dir`` is given, also as a timestamped copy there next to the logs.
+    """
+    import json
+    import shutil
+    import subprocess
+    import tempfile
+
+    slug = metadata.get("slug") or package_dir.name
+    with tempfile.TemporaryDirectory() as tmp:
+        metadata_file = Path(tmp) / "metadata.json"
+        cmd = cmd[:-1] + ["--progress=rawjson", "--metadata-file", str(metadata_file), cmd[-1]]
+        emit("→ " + " ".join(cmd))
+        progress = BuildProgress(emit)
+        started = time.monotonic()
+        proc = subprocess.Popen(
+            cmd,
+            cwd=package_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1,
+        )
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            progress.feed(line.rstrip("\n"))
+        code = proc.wait()
+        wall = time.monotonic() - started
+        build_metadata = json.loads(metadata_file.read_text()) if metadata_file.is_file() else {}
+
+    steps = progress.steps()
+    hits = sum(1 for step in steps if step["cached"])
+    layers = [] if os.environ.get("PACKAGE_PUSH") else image_layers(compute_local_tag(metadata))
+    report = {
+        "package": slug,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "exit_code": code,
+        "wall_seconds": round(wall, 3),
+        "cache": {"hits": hits, "misses": len(steps) - hits, "hit_ratio": round(hits / len(steps), 3) if steps else None},
+        "downloaded_bytes": sum(progress.downloads.values()),
+        "image_bytes": sum(layer["size"] for layer in layers),
+        "steps": steps,
+        "layers": layers,
+        "metadata": build_metadata,
+    }
+    BUILD_REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    latest = BUILD_REPORT_DIR / f"{slug}.json"
+    latest.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    emit(f"→ build report: {latest}")
+    if report_dir:
+        report_dir.mkdir(parents=True, exist_ok=True)
+        copy = report_dir / f"build-{slug}-{time.strftime('%Y%m%d%H%M%S')}.json"
+        shutil.copyfile(latest, copy)
+        emit(f"→ build report: {copy}")
+    return code
+
+
+def compare_build_reports(
+    latest: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float,
+    min_seconds: float,
+) -> Tuple[List[Tuple[str, str, str, str]], List[str]]:
+    """Return printable rows for every step plus the names of the steps that regressed."""
+    before = {step["name"]: step for step in baseline.get("steps", [])}
+    rows: List[Tuple[str, str, str, str]] = []
+    regressed: List[str] = []
+
+    def fmt(step: Dict[str, Any] | None) -> str:
+        if not step:
+            return "-"
+        if step.get("cached"):
+            return "cached"
+        return f"{step['seconds']:.1f}s" if step.get("seconds") is not None else "?"
+
+    for step in latest.get("steps", []):
+        old = before.get(step["name"])
+        note = ""
+        if old and old.get("cached") and not step.get("cached"):
+            note = "cache miss"
+        elif old and not step.get("cached") and old.get("seconds") is not None and step.get("seconds") is not None:
+            baseline_seconds = 0.0 if old.get("cached") else old["seconds"]
+            if step["seconds"] - baseline_seconds >= min_seconds and step["seconds"] > baseline_seconds * threshold:
+                note = f"+{step['seconds'] - baseline_seconds:.1f}s"
+        elif not old:
+            note = "new"
+        if note and note != "new":
+            regressed.append(step["name"])
+        rows.append((step["name"], fmt(old), fmt(step), note))
+    return rows, regressed
+
+
+def build_report(slug: str, args: argparse.Namespace) -> int:
+    import json
+    import shutil
+
+    latest_path = BUILD_REPORT_DIR / f"{slug}.json"
+    if not latest_path.is_file():
+        raise SystemExit(f"no build report for {slug}; run './scripts/package.py build {slug} --report' first")
+    baseline_path = Path(args.baseline) if args.baseline else BUILD_REPORT_DIR / f"{slug}.baseline.json"
+    if args.save_baseline:
+        shutil.copyfile(latest_path, baseline_path)
+        print(f"saved {latest_path} as baseline {baseline_path}")
+        return 0
+
+    latest = json.loads(latest_path.read_text())
+    cache = latest.get("cache", {})
+    print(
+        f"{slug}: {latest['wall_seconds']:.1f}s, {cache.get('hits', 0)} cached / {cache.get('misses', 0)} run, "
+        f"{_format_bytes(latest.get('downloaded_bytes'))} pulled, image {_format_bytes(latest.get('image_bytes'))}"
+    )
+    if not baseline_path.is_file():
+        steps = sorted(
+            (step for step in latest.get("steps", []) if step.get("seconds") and not step.get("cached")),
+            key=lambda step: -step["seconds"],
+        )
+        for step in steps[:10]:
+            print(f"  {step['seconds']:8.1f}s  {step['name']}")
+        print(f"no baseline at {baseline_path}; record one with --save-baseline")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())
+    rows, regressed = compare_build_reports(latest, baseline, args.threshold, args.min_seconds)
+    print(f"baseline {baseline.get('created', '?')}: {baseline.get('wall_seconds', 0):.1f}s")
+    width = min(max([len("step")] + [len(row[0]) for row in rows]), 80)
+    print(f"{'step':<{width}}  {'baseline':>9}  {'latest':>9}  note")
+    for name, before, after, note in rows:
+        print(f"{name[:width]:<{width}}  {before:>9}  {after:>9}  {note}")
+    if regressed:
+        print(f"{len(regressed)} step(s) regressed against the baseline")
+        return 1
+    return 0
+
+
+_JAR_VERSION = re.compile(r"^(?P<artifact>.+?)-(?P<version>\d[\w.+-]*?)\.jar$")
+# Unified JVM logging (-Xlog:class+load / -verbose:class on JDK 9+) and the JDK 8 form.
+_CLASS_LOAD = re.compile(r"\[class,load\]\s+(?P<name>\S+)\s+source:\s*(?P<source>.+?)\s*$")
+_CLASS_LOAD_LEGACY = re.compile(r"^\[Loaded (?P<name>\S+) from (?P<source>.+?)\]\s*$")
+
+
+def index_jars(jars_dir: Path) -> Dict[str, Any]:
+    """Map every class in ``jars_dir``'s jars to the jars (and CRCs) that provide it."""
+    import zipfile
+
+    jars: Dict[str, Dict[str, Any]] = {}
+    classes: Dict[str, List[Tuple[str, int]]] = {}
+    for path in sorted(jars_dir.glob("*.jar")):
+        entry = {"size": path.stat().st_size, "classes": 0}
+        try:
+            with zipfile.ZipFile(path) as zf:
+                for info in zf.infolist():
+                    name = info.filename
+                    # Multi-release overlays and module descriptors are not separate classes.
+                    if not name.endswith(".class") or name.startswith("META-INF/") or name.endswith("module-info.class"):
+                        continue
+                    classes.setdefault(name[:-6].replace("/", "."), []).append((path.name, info.CRC))
+                    entry["classes"] += 1
+        except zipfile.BadZipFile as exc:
+            entry["error"] = str(exc)
+        jars[path.name] = entry
+    return {"jars": jars, "classes": classes}
+
+
+def duplicate_classes(classes: Dict[str, List[Tuple[str, int]]]) -> List[Dict[str, Any]]:
+    """Group classes present in more than one jar by the set of jars that share them."""
+    groups: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+    for name, providers in classes.items():
+        owners = tuple(sorted({jar for jar, _ in providers}))
+        if len(owners) < 2:
+            continue
+        group = groups.setdefault(owners, {"jars": list(owners), "classes": 0, "conflicting": 0, "examples": []})
+        group["classes"] += 1
+        # Same bytes in two jars only wastes space; different bytes means load order decides behaviour.
+        if len({crc for _, crc in providers}) > 1:
+            group["conflicting"] += 1
+            if len(group["examples"]) < 3:
+                group["examples"].append(name)
+    return sorted(groups.values(), key=lambda group: (-group["conflicting"], -group["classes"]))
+
+
+def version_conflicts(jar_names: Iterable[str]) -> Dict[str, List[str]]:
+    versions: Dict[str, List[str]] = {}
+    for name in jar_names:
+        match = _JAR_VERSION.match(name)
+        if match:
+            versions.setdefault(match.group("artifact"), []).append(match.group("version"))
+    return {artifact: sorted(found) for artifact, found in sorted(versions.items()) if len(found) > 1}
+
+
+def parse_class_trace(paths: Iterable[Path]) -> Dict[str, set]:
+    """Classes loaded per jar file name from JVM class-load logs."""
+    loaded: Dict[str, set] = {}
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            for line in fh:
+                match = _CLASS_LOAD.search(line) or _CLASS_LOAD_LEGACY.match(line)
+                if not match:
+                    continue
+                source = match.group("source")
+                if ".jar" not in source:
+                    continue
+                jar = source.split(".jar", 1)[0].rsplit("/", 1)[-1] + ".jar"
+                loaded.setdefault(jar, set()).add(match.group("name"))
+    return loaded
+
+
+def _trace_files(specs: Iterable[str]) -> List[Path]:
+    files: List[Path] = []
+    for spec in specs:
+        path = Path(spec)
+        files.extend(sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path])
+    return files
 
+
+def extract_image_dir(image: str, path: str, dest: Path) -> None:
+    import subprocess
+
+    created = subprocess.run(["docker", "create", image], capture_output=True, text=True)
+    if created.returncode != 0:
+        raise SystemExit(f"docker create {image} failed: {created.stderr.strip()}")
+    container = created.stdout.strip()
+    try:
+        cmd = ["docker", "cp", f"{container}:{path.rstrip('/')}/.", str(dest)]
+        print("→", " ".join(cmd))
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+    finally:
+        subprocess.run(["docker", "rm", container], capture_output=True)
+
+
+def collect_class_trace(package_dir: Path, metadata: Dict[str, Any], trace_dir: Path) -> None:
+    """Run ``classpath.trace_command`` with CLASS_TRACE_DIR set so the JVMs log class loading there."""
+    import subprocess
+
+    command = (metadata.get("classpath") or {}).get("trace_command")
+    if not command:
+        raise SystemExit(f"{metadata['slug']} has no classpath.trace_command configured")
+    trace_dir.mkdir(parents=True, exist_ok=True)
+    env = test_env()
+    env["CLASS_TRACE_DIR"] = str(trace_dir)
+    print("→", command)
+    result = subprocess.run(["bash", "-c", command], cwd=package_dir, env=env)
+    if result.returncode != 0:
+        raise SystemExit(f"class trace command failed with exit code {result.returncode}")
+
+
+def analyze_classpath(package_dir: Path, metadata: Dict[str, Any], args: argparse.Namespace) -> None:
+    import json
+    import shutil
+    import tempfile
+
+    slug = metadata["slug"]
+    workdir = Path(tempfile.mkdtemp(prefix=f"classpath-{slug}-"))
+    try:
+        if args.jars_dir:
+            jars_dir = Path(args.jars_dir)
+        else:
+            path = args.path or (metadata.get("classpath") or {}).get("path")
+            if not path:
+                raise SystemExit(f"{slug} has no classpath.path configured; pass --path or --jars-dir")
+            jars_dir = workdir / "jars"
+            jars_dir.mkdir()
+            extract_image_dir(args.image or compute_local_tag(metadata), path, jars_dir)
+        traces = _trace_files(args.trace or [])
+        if args.collect:
+            collect_class_trace(package_dir, metadata, workdir / "trace")
+            traces.extend(_trace_files([str(workdir / "trace")]))
+        index = index_jars(jars_dir)
+        loaded = parse_class_trace(traces) if traces else {}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    jars = index["jars"]
+    duplicates = duplicate_classes(index["classes"])
+    versions = version_conflicts(jars)
+    rows = []
+    for name, entry in jars.items():
+        used = len(loaded.get(name, ())) if traces else None
+        unused_bytes = entry["size"] if not used else round(entry["size"] * (1 - used / max(entry["classes"], 1)))
+        rows.append({"jar": name, **entry, "loaded": used, "unused_bytes": unused_bytes})
+    rows.sort(key=lambda row: (-row["unused_bytes"] if traces else -row["size"], row["jar"]))
+
+    report = {
+        "slug": slug,
+        "jars": rows,
+        "total_bytes": sum(entry["size"] for entry in jars.values()),
+        "classes": len(index["classes"]),
+        "duplicate_classes": sum(group["classes"] for group in duplicates),
+        "duplicates": duplicates,
+        "version_conflicts": versions,
+        "traces": [str(path) for path in traces],
+    }
+    report_dir = Path(args.report_dir) if args.report_dir else CLASSPATH_REPORT_DIR
+    report_dir.mkdir(parents=True, exist_ok=True)
+    report_path = report_dir / f"{slug}.json"
+    report_path.write_text(json.dumps(report, indent=2) + "\n")
+
+    print(
+        f"{len(jars)} jars, {_format_bytes(report['total_bytes'])}, {report['classes']} classes, "
+        f"{report['duplicate_classes']} duplicated"
+    )
+    for artifact, found in versions.items():
+        print(f"version conflict: {artifact} {', '.join(found)}")
+    if duplicates:
+        print("duplicate classes:")
+        for group in duplicates[: args.top]:
+            note = f"{group['conflicting']} differ, e.g. {group['examples'][0]}" if group["conflicting"] else "identical"
+            print(f"  {group['classes']:>6}  {' + '.join(group['jars'])}  ({note})")
+    shown = rows[: args.top]
+    width = max([len("jar")] + [len(row["jar"]) for row in shown])
+    print(f"{'jar':<{width}}  {'size':>9}  {'classes':>7}  {'loaded':>7}")
+    for row in shown:
+        loaded_col = "-" if row["loaded"] is None else str(row["loaded"])
+        print(f"{row['jar']:<{width}}  {_format_bytes(row['size']):>9}  {row['classes']:>7}  {loaded_col:>7}")
+    if traces:
+        dead = [row for row in rows if row["loaded"] == 0]
+        print(f"{len(dead)} jar(s), {_format_bytes(sum(row['size'] for row in dead))}, loaded no classes in the trace")
+    print(f"Report written to {report_path}")
+
+
+def lock_inputs_drift(package_dir: Path, metadata: Dict[str, Any]) -> List[str]:
+    """Build args whose value differs from the one recorded in ``build.lock.file``."""
+    import json
+
+    lock_cfg = metadata.get("build", {}).get("lock") or {}
+    path = package_dir / lock_cfg.get("file", "")
+    if not lock_cfg.get("file") or not path.is_file():
+        return []
+    try:
+        recorded = json.loads(path.read_text()).get("inputs") or {}
+    except ValueError as exc:
+        return [f"unreadable lockfile: {exc}"]
+    build_args = flatten_build_args(metadata)
+    return [
+        f"{key} locked {value!r}, build uses {build_args[key]!r}"
+        for key, value in recorded.items()
+        if key in build_args and build_args[key] != value
+    ]
+
+
+def lock_package(package_dir: Path, metadata: Dict[str, Any]) -> None:
+    """Run ``build.lock.command`` with the build args in the environment to refresh the lockfile."""
+    import subprocess
+
+    lock_cfg = metadata.get("build", {}).get("lock")
+    if not lock_cfg:
+        raise SystemExit(f"{metadata['slug']} has no build.lock configured")
+    env = os.environ.copy()
+    env.update(flatten_build_args(metadata))
+    command = lock_cfg["command"]
+    print("→", command)
+    result = subprocess.run(["bash", "-c", command], cwd=package_dir, env=env)
+    if result.returncode != 0:
+        raise SystemExit(result.returncode)
+    print(f"Wrote {package_dir / lock_cfg['file']}")
+
+
+def test_env() -> Dict[str, str]:
     env = os.environ.copy()
     venv_bin = ROOT / ".venv" / "bin"
     if venv_bin.is_dir():
@@ -189,25 +1256,498 @@ def run_tests(package_dir: Path, metadata: Dict[str, Any], args: argparse.Namesp
         if venv_str not in path_entries:
             env["PATH"] = os.pathsep.join([venv_str, *path_entries]) if path_entries else venv_str
         env.setdefault("VIRTUAL_ENV", str(venv_bin.parent))
+    return env
+
+
+def test_plan(metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Normalize ``tests:`` entries; reject duplicate names and unknown or cyclic ``depends_on`` references."""
+    default_timeout = float(os.environ.get("PACKAGE_TEST_TIMEOUT") or DEFAULT_TEST_TIMEOUT)
+    plan: List[Dict[str, Any]] = []
+    for test in metadata.get("tests", []) or []:
+        depends_on = test.get("depends_on") or []
+        plan.append(
+            {
+                "name": test.get("name") or "unnamed",
+                "command": test.get("command"),
+                "depends_on": [depends_on] if isinstance(depends_on, str) else list(depends_on),
+                "parallel": bool(test.get("parallel", False)),
+                "timeout": float(test.get("timeout") or default_timeout),
+            }
+        )
+
+    names: set = set()
+    for test in plan:
+        # Results and depends_on are keyed by name, so a repeat would shadow the first run.
+        if test["name"] in names:
+            raise SystemExit(f"duplicate test name '{test['name']}'")
+        names.add(test["name"])
+    graph = {test["name"]: test["depends_on"] for test in plan}
+    for test in plan:
+        for dep in test["depends_on"]:
+            if dep not in names:
+                raise SystemExit(f"test '{test['name']}' depends on unknown test '{dep}'")
+
+    visiting: set = set()
+    done: set = set()
+
+    def visit(name: str, trail: List[str]) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            cycle = trail[trail.index(name):] + [name]
+            raise SystemExit(f"test dependency cycle: {' -> '.join(cycle)}")
+        visiting.add(name)
+        for dep in graph[name]:
+            visit(dep, trail + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for name in graph:
+        visit(name, [])
+    return plan
+
+
+def run_test_suite(
+    package_dir: Path,
+    metadata: Dict[str, Any],
+    mux: "LogMux",
+    label_prefix: str = "",
+    jobs: int | None = None,
+    extra_env: Dict[str, str] | None = None,
+) -> List[Dict[str, Any]]:
+    """Run a package's tests, overlapping ``parallel: true`` entries whose dependencies passed.
+
+    Tests without ``parallel: true`` run alone, in declaration order. At most ``jobs``
+    (default PACKAGE_TEST_JOBS; 0 means no limit) parallel tests run at once. A test
+    whose dependency failed is skipped; independent tests still run. ``extra_env`` is
+    added to every test's environment without touching this process's own.
+    """
+    plan = test_plan(metadata)
+    env = {**test_env(), **(extra_env or {})}
+    jobs = jobs or int(os.environ.get("PACKAGE_TEST_JOBS") or 0)
+    cond = threading.Condition()
+    results: Dict[str, Dict[str, Any]] = {}
+    running = {"parallel": 0, "serial": 0}
+    suite_started = time.monotonic()
+
+    def worker(test: Dict[str, Any]) -> None:
+        label = label_prefix + test["name"]
+        mux.emit(label, f"→ running test '{test['name']}'")
+        output: List[str] = []
+        started = time.monotonic()
+        code, status = 1, "failed"
+        try:
+            try:
+                code = mux.run(
+                    label,
+                    ["bash", "-c", test["command"]],
+                    cwd=package_dir,
+                    env=env,
+                    capture=output,
+                    timeout=test["timeout"],
+                )
+            except OSError as exc:
+                output.append(str(exc))
+                code = 127
+            if code == 0:
+                status = "passed"
+            elif code == TIMEOUT_EXIT_CODE:
+                status = "timeout"
+                mux.emit(label, f"test '{test['name']}' timed out after {test['timeout']:.0f}s")
+        except Exception as exc:  # pylint: disable=broad-except
+            # Record the crash as a failure; a dead worker must still release its slot.
+            output.append(f"{type(exc).__name__}: {exc}")
+        finally:
+            with cond:
+                results[test["name"]] = {
+                    "status": status,
+                    "ok": status == "passed",
+                    "exit_code": code,
+                    "seconds": time.monotonic() - started,
+                    "started": started - suite_started,
+                    "output": "".join(output),
+                }
+                running["parallel" if test["parallel"] else "serial"] -= 1
+                cond.notify_all()
+
+    graph = {test["name"]: test["depends_on"] for test in plan}
+
+    def requires(name: str) -> set:
+        """``name`` and everything it depends on, directly or not."""
+        closure, stack = set(), [name]
+        while stack:
+            current = stack.pop()
+            if current not in closure:
+                closure.add(current)
+                stack.extend(graph[current])
+        return closure
+
+    threads: List[threading.Thread] = []
+    pending = list(plan)
+    with cond:
+        while pending:
+            progressed = False
+            # Set once a serial test is waiting on a dependency: only that test's own
+            # dependencies may start before it, so later tests cannot overtake it.
+            gate: set | None = None
+            for test in list(pending):
+                if gate is not None and test["name"] not in gate:
+                    continue
+                deps = [results.get(dep) for dep in test["depends_on"]]
+                if any(dep is not None and not dep["ok"] for dep in deps):
+                    pending.remove(test)
+                    results[test["name"]] = {"status": "skipped", "ok": False, "reason": "dependency failed"}
+                    mux.emit(label_prefix + test["name"], "skipping: a dependency failed")
+                    progressed = True
+                    continue
+                if any(dep is None for dep in deps):
+                    if not test["parallel"] and gate is None:
+                        gate = requires(test["name"])
+                    continue
+                if not test["command"]:
+                    pending.remove(test)
+                    results[test["name"]] = {"status": "skipped", "ok": True, "reason": "no command"}
+                    mux.emit(label_prefix + test["name"], f"Skipping test '{test['name']}' with no command")
+                    progressed = True
+                    continue
+                if test["parallel"]:
+                    if running["serial"] or (jobs and running["parallel"] >= jobs):
+                        break
+                elif running["serial"] or running["parallel"]:
+                    # Serial tests keep their place; later tests wait behind them.
+                    break
+                pending.remove(test)
+                running["parallel" if test["parallel"] else "serial"] += 1
+                thread = threading.Thread(target=worker, args=(test,), name=f"test-{test['name']}")
+                threads.append(thread)
+                thread.start()
+                progressed = True
+            if pending and not progressed:
+                cond.wait()
+    for thread in threads:
+        thread.join()
+
+    return [
+        {
+            "name": test["name"],
+            "depends_on": test["depends_on"],
+            "parallel": test["parallel"],
+            "timeout": test["timeout"],
+            **results[test["name"]],
+        }
+        for test in plan
+    ]
+
+
+def write_test_report(slug: str, results: List[Dict[str, Any]], report_dir: Path) -> Tuple[Path, Path]:
+    """Write ``<slug>.json`` and a JUnit ``<slug>.xml`` with per-test durations."""
+    import json
+    import xml.etree.ElementTree as ET
+
+    report_dir.mkdir(parents=True, exist_ok=True)
+    json_path = report_dir / f"{slug}.json"
+    xml_path = report_dir / f"{slug}.xml"
+
+    summary = [{key: value for key, value in result.items() if key != "output"} for result in results]
+    json_path.write_text(json.dumps({"package": slug, "tests": summary}, indent=2) + "\n", encoding="utf-8")
+
+    suite = ET.Element(
+        "testsuite",
+        name=slug,
+        tests=str(len(results)),
+        failures=str(sum(1 for result in results if result["status"] == "failed")),
+        errors=str(sum(1 for result in results if result["status"] == "timeout")),
+        skipped=str(sum(1 for result in results if result["status"] == "skipped")),
+        time=f"{sum(result.get('seconds', 0.0) for result in results):.3f}",
+    )
+    for result in results:
+        case = ET.SubElement(
+            suite, "testcase", classname=slug, name=result["name"], time=f"{result.get('seconds', 0.0):.3f}"
+        )
+        if result["status"] == "failed":
+            ET.SubElement(case, "failure", message=f"exit code {result['exit_code']}")
+        elif result["status"] == "timeout":
+            ET.SubElement(case, "error", message=f"timed out after {result['timeout']:.0f}s")
+        elif result["status"] == "skipped":
+            ET.SubElement(case, "skipped", message=result.get("reason", ""))
+        if result.get("output"):
+            ET.SubElement(case, "system-out").text = result["output"]
+    ET.ElementTree(suite).write(xml_path, encoding="utf-8", xml_declaration=True)
+    return json_path, xml_path
+
+
+def run_tests(
+    package_dir: Path, metadata: Dict[str, Any], args: argparse.Namespace, extra_env: Dict[str, str] | None = None
+) -> None:
+    if not metadata.get("tests"):
+        print("no tests defined; skipping")
+        return
 
-    for test in tests:
-        name = test.get("name") or "unnamed"
-        command = test.get("command")
-        if not command:
-            print(f"Skipping test '{name}' with no command")
-            continue
-        print(f"→ running test '{name}'")
-        subprocess.run(["bash", "-c", command], check=True, cwd=package_dir, env=env)
+    slug = metadata.get("slug") or package_dir.name
+    mux = LogMux(test["name"] for test in test_plan(metadata))
+    started = time.monotonic()
+    results = run_test_suite(package_dir, metadata, mux, jobs=args.jobs, extra_env=extra_env)
+    wall = time.monotonic() - started
+    json_path, xml_path = write_test_report(slug, results, Path(args.report_dir) if args.report_dir else TEST_REPORT_DIR)
+
+    width = max([len("test")] + [len(result["name"]) for result in results])
+    serial = sum(result.get("seconds", 0.0) for result in results)
+    print()
+    print(f"{'test':<{width}}  {'time':>8}  status")
+    for result in results:
+        seconds = result.get("seconds")
+        time_col = f"{seconds:7.1f}s" if seconds is not None else "       -"
+        print(f"{result['name']:<{width}}  {time_col}  {result['status']}")
+    print(f"wall-clock {wall:.1f}s vs serial {serial:.1f}s; report: {json_path} {xml_path}")
+
+    failed = [result["name"] for result in results if not result["ok"]]
+    if failed:
+        raise SystemExit(f"tests failed for {slug}: {', '.join(failed)}")
+
+
+def run_benchmarks(package_dir: Path, metadata: Dict[str, Any], args: argparse.Namespace) -> None:
+    """Run the package's opt-in ``benchmarks:`` (all, or those named) one at a time with the test runner."""
+    import argparse
+
+    slug = metadata.get("slug") or package_dir.name
+    benchmarks = metadata.get("benchmarks") or []
+    if not benchmarks:
+        print("no benchmarks defined; skipping")
+        return
+    known = [bench["name"] for bench in benchmarks]
+    unknown = [name for name in args.names if name not in known]
+    if unknown:
+        raise SystemExit(f"unknown benchmark(s) for {slug}: {', '.join(unknown)} (choose from {', '.join(known)})")
+
+    # Benchmarks time themselves and share compose host ports and MinIO data, so they never overlap.
+    selected = [
+        {"name": bench["name"], "command": bench["command"], "timeout": bench.get("timeout")}
+        for bench in benchmarks
+        if not args.names or bench["name"] in args.names
+    ]
+    bench_args = argparse.Namespace(report_dir=args.report_dir, jobs=1)
+    bench_metadata = {"slug": f"{slug}-bench", "tests": selected}
+    run_tests(package_dir, bench_metadata, bench_args, extra_env={"RUN_COMPOSE_BENCH": "1"})
+
+
+# What `imagetools inspect` reports when the registry answers 404 for a tag or repository.
+_REGISTRY_NOT_FOUND = re.compile(r"not found|manifest unknown|name unknown", re.IGNORECASE)
+
+
+def _registry_digest(ref: str) -> str | None:
+    """Return the manifest digest the registry serves for ``ref``, or None when it has none.
+
+    Only a not-found answer means "none". Auth failures, rate limits and network
+    errors raise OSError, so callers never mistake them for a missing tag.
+    """
+    import json
+    import subprocess
+
+    completed = subprocess.run(
+        ["docker", "buildx", "imagetools", "inspect", ref, "--format", "{{json .Manifest}}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        if _REGISTRY_NOT_FOUND.search(completed.stderr):
+            return None
+        lines = completed.stderr.strip().splitlines() or [f"exit status {completed.returncode}"]
+        raise OSError(f"imagetools inspect {ref} failed: {lines[-1]}")
+    try:
+        return json.loads(completed.stdout).get("digest")
+    except ValueError:
+        raise OSError(f"imagetools inspect {ref} returned unparsable output")
+
+
+def _local_image(ref: str) -> Dict[str, Any]:
+    import json
+    import subprocess
+
+    completed = subprocess.run(
+        ["docker", "image", "inspect", ref, "--format", "{{json .}}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"local image {ref} not found; build it before publishing")
+    return json.loads(completed.stdout)
+
+
+def _uploaded_bytes(repo: str, digest: str, image: Dict[str, Any], pushed: set) -> int | None:
+    """Sum compressed sizes of the layers ``docker push`` reported as Pushed.
+
+    Push progress is keyed by the short diff ID, and manifest layers are in the
+    same order as ``RootFS.Layers``, so the two line up by index.
+    """
+    import json
+    import subprocess
+
+    def raw(ref: str) -> Dict[str, Any] | None:
+        completed = subprocess.run(
+            ["docker", "buildx", "imagetools", "inspect", "--raw", ref], capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            return None
+        try:
+            return json.loads(completed.stdout)
+        except ValueError:
+            return None
+
+    manifest = raw(f"{repo}@{digest}")
+    if manifest and "manifests" in manifest:
+        # containerd image store pushes an index; pick the entry for the local platform.
+        wanted = (image.get("Os"), image.get("Architecture"))
+        entry = next(
+            (
+                item
+                for item in manifest["manifests"]
+                if (item.get("platform", {}).get("os"), item.get("platform", {}).get("architecture")) == wanted
+            ),
+            None,
+        )
+        manifest = raw(f"{repo}@{entry['digest']}") if entry else None
+    diff_ids = (image.get("RootFS") or {}).get("Layers") or []
+    if not manifest or len(manifest.get("layers", [])) != len(diff_ids):
+        return None
+    return sum(
+        layer.get("size", 0)
+        for diff_id, layer in zip(diff_ids, manifest["layers"])
+        if diff_id.split(":", 1)[-1][:12] in pushed
+    )
+
+
+def _format_bytes(value: int | None) -> str:
+    if value is None:
+        return "?"
+    size = float(value)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{value} B"
 
 
-def docker_push(metadata: Dict[str, Any]) -> None:
+def docker_push(
+    metadata: Dict[str, Any],
+    mux: "LogMux",
+    namespace: str | None = None,
+) -> List[Dict[str, Any]]:
+    """Push the image content once and attach every other tag by manifest reference.
+
+    Tags the registry already serves at the local digest are left alone, and the
+    upload is skipped entirely when any of them matches. Returns one report row
+    per tag with its outcome, uploaded bytes and elapsed seconds.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    slug = metadata["slug"]
     tags = compute_tags(metadata)
-    for tag in tags:
-        print(f"→ docker push {tag}")
-        subprocess.run(["docker", "push", tag], check=True)
+    if namespace:
+        # Publish the locally built image under another registry, e.g. a local registry:2.
+        source = tags[0]
+        image_name = source.rsplit(":", 1)[0].rsplit("/", 1)[-1]
+        tags = [f"{namespace.rstrip('/')}/{image_name}:{tag}" for tag in compute_resolved_tags(metadata)]
+        if mux.run(slug, ["docker", "tag", source, tags[0]], cwd=ROOT) != 0:
+            raise SystemExit(f"local image {source} not found; build it before publishing")
+
+    primary = tags[0]
+    repo = primary.rsplit(":", 1)[0]
+    image = _local_image(primary)
+    known = {ref.split("@", 1)[1] for ref in image.get("RepoDigests") or [] if ref.split("@", 1)[0] == repo}
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=min(len(tags), 8)) as pool:
+        remote = dict(zip(tags, pool.map(_registry_digest, tags)))
+    mux.emit(slug, f"→ checked {len(tags)} tag(s) in the registry in {time.monotonic() - started:.1f}s")
+
+    rows: List[Dict[str, Any]] = []
+    digest = next((remote[tag] for tag in tags if remote[tag] in known), None)
+    if digest:
+        mux.emit(slug, f"→ registry already has {digest[:19]}; skipping upload")
+    else:
+        started = time.monotonic()
+        output: List[str] = []
+        if mux.run(slug, ["docker", "push", primary], cwd=ROOT, capture=output) != 0:
+            raise SystemExit(f"docker push {primary} failed")
+        pushed = set()
+        for line in output:
+            layer, _, status = line.strip().partition(": ")
+            if status == "Pushed":
+                pushed.add(layer)
+            match = re.search(r"digest: (sha256:[0-9a-f]{64})", line)
+            if match:
+                digest = match.group(1)
+        if not digest:
+            digest = _registry_digest(primary)
+        if not digest:
+            raise SystemExit(f"unable to determine the pushed digest for {primary}")
+        rows.append(
+            {
+                "package": slug,
+                "tag": primary,
+                "status": "pushed",
+                "bytes": _uploaded_bytes(repo, digest, image, pushed) if pushed else 0,
+                "seconds": time.monotonic() - started,
+            }
+        )
+        remote[primary] = digest
+
+    def attach(tag: str) -> Dict[str, Any]:
+        row = {"package": slug, "tag": tag, "status": "present", "bytes": 0, "seconds": 0.0}
+        if remote[tag] == digest:
+            return row
+        started = time.monotonic()
+        cmd = ["docker", "buildx", "imagetools", "create", "--tag", tag, f"{repo}@{digest}"]
+        row["status"] = "tagged" if mux.run(slug, cmd, cwd=ROOT) == 0 else "failed"
+        row["seconds"] = time.monotonic() - started
+        return row
+
+    remaining = tags[1:] if rows else tags
+    with ThreadPoolExecutor(max_workers=min(len(remaining), 8) or 1) as pool:
+        rows.extend(pool.map(attach, remaining))
+    failed = [row["tag"] for row in rows if row["status"] == "failed"]
+    if failed:
+        raise SystemExit(f"failed to tag {', '.join(failed)}")
+    return rows
+
+
+def publish_packages(slugs: List[str], jobs: int | None = None, namespace: str | None = None) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    mux = LogMux(slugs)
+    failures: Dict[str, str] = {}
+
+    def publish(slug: str) -> List[Dict[str, Any]]:
+        try:
+            metadata, _ = load_metadata(slug)
+            return docker_push(metadata, mux, namespace)
+        except (SystemExit, OSError, ValueError) as exc:
+            mux.emit(slug, str(exc))
+            failures[slug] = str(exc)
+            return []
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs or 4, len(slugs)))) as pool:
+        rows = [row for result in pool.map(publish, slugs) for row in result]
+    wall = time.monotonic() - started
+
+    if rows:
+        width = max(len(row["tag"]) for row in rows)
+        print()
+        print(f"{'tag':<{width}}  {'status':<8}  {'uploaded':>10}  {'time':>7}")
+        for row in rows:
+            print(
+                f"{row['tag']:<{width}}  {row['status']:<8}  {_format_bytes(row['bytes']):>10}  {row['seconds']:6.1f}s"
+            )
+    total = sum(row["bytes"] or 0 for row in rows)
+    print(f"published {len(slugs) - len(failures)}/{len(slugs)} package(s), {_format_bytes(total)} uploaded in {wall:.1f}s")
+    if failures:
+        raise SystemExit(f"publish failed for: {', '.join(sorted(failures))}")
 
 
 def show_info(metadata: Dict[str, Any]) -> None:
+    import json
+
     print(json.dumps(metadata, indent=2))
 
 
@@ -216,28 +1756,86 @@ def docker_retag(
     source_image: str,
     dry_run: bool,
     skip_missing: bool,
-) -> None:
+    mux: "LogMux",
+) -> Dict[str, Any]:
+    """Copy every resolved tag from ``source_image`` with one imagetools call per source digest.
+
+    Source digests are resolved before anything is written, so a missing tag either
+    aborts the package untouched or, with ``skip_missing``, is dropped up front. Any
+    other registry error aborts the package even with ``skip_missing``.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    slug = metadata["slug"]
     publish = metadata.get("publish", {})
     dest_image = publish.get("image")
     if not dest_image:
         raise SystemExit("publish.image must be set in container.yaml")
 
     tags = compute_resolved_tags(metadata)
+    with ThreadPoolExecutor(max_workers=min(len(tags), 8)) as pool:
+        digests = dict(zip(tags, pool.map(_registry_digest, [f"{source_image}:{tag}" for tag in tags])))
+
+    missing = [tag for tag in tags if not digests[tag]]
+    if missing and not skip_missing:
+        raise SystemExit(f"source tag(s) not found: {', '.join(f'{source_image}:{tag}' for tag in missing)}")
+    for tag in missing:
+        mux.emit(slug, f"→ skipping missing source tag: {source_image}:{tag}")
+
+    groups: Dict[str, List[str]] = {}
     for tag in tags:
-        source = f"{source_image}:{tag}"
-        dest = f"{dest_image}:{tag}"
-        cmd = ["docker", "buildx", "imagetools", "create", "--tag", dest, source]
-        print("→", " ".join(cmd))
-        if not dry_run:
-            completed = subprocess.run(cmd, capture_output=True, text=True)
-            if completed.returncode != 0:
-                stderr = completed.stderr.strip()
-                stdout = completed.stdout.strip()
-                combined = "\n".join([line for line in (stderr, stdout) if line])
-                if skip_missing and "not found" in combined.lower():
-                    print(f"→ skipping missing source tag: {source}")
-                    continue
-                raise SystemExit(combined or f"retag failed for {source}")
+        if digests[tag]:
+            groups.setdefault(digests[tag], []).append(tag)
+
+    for digest, group in groups.items():
+        cmd = ["docker", "buildx", "imagetools", "create"]
+        for tag in group:
+            cmd += ["--tag", f"{dest_image}:{tag}"]
+        cmd.append(f"{source_image}@{digest}")
+        if dry_run:
+            mux.emit(slug, "→ " + " ".join(cmd))
+        elif mux.run(slug, cmd, cwd=ROOT) != 0:
+            raise SystemExit(f"retag failed for {source_image}@{digest}")
+    return {"tags": len(tags) - len(missing), "calls": len(groups), "skipped": len(missing)}
+
+
+def retag_packages(slugs: List[str], args: argparse.Namespace) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    mux = LogMux(slugs)
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def retag(slug: str) -> None:
+        started = time.monotonic()
+        try:
+            metadata, _ = load_metadata(slug)
+            source_image = resolve_source_image(metadata, args.source_image, args.source_namespace)
+            result = docker_retag(metadata, source_image, args.dry_run, args.skip_missing, mux)
+            result["status"] = "planned" if args.dry_run else "retagged"
+        except (SystemExit, OSError) as exc:
+            mux.emit(slug, str(exc))
+            result = {"status": "failed"}
+        result["seconds"] = time.monotonic() - started
+        results[slug] = result
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, min(args.jobs or 4, len(slugs)))) as pool:
+        list(pool.map(retag, slugs))
+    wall = time.monotonic() - started
+
+    width = max([len("package")] + [len(slug) for slug in slugs])
+    print()
+    print(f"{'package':<{width}}  {'tags':>4}  {'calls':>5}  {'skipped':>7}  {'time':>7}  status")
+    for slug in slugs:
+        result = results[slug]
+        counts = [str(result[key]) if key in result else "-" for key in ("tags", "calls", "skipped")]
+        print(
+            f"{slug:<{width}}  {counts[0]:>4}  {counts[1]:>5}  {counts[2]:>7}  {result['seconds']:6.1f}s  {result['status']}"
+        )
+    print(f"retagged {len(slugs)} package(s) in {wall:.1f}s")
+    failed = sorted(slug for slug, result in results.items() if result["status"] == "failed")
+    if failed:
+        raise SystemExit(f"retag failed for: {', '.join(failed)}")
 
 
 def resolve_source_image(metadata: Dict[str, Any], source_image: str | None, source_namespace: str | None) -> str:
@@ -257,15 +1855,345 @@ def resolve_source_image(metadata: Dict[str, Any], source_image: str | None, sou
 
 
 
-def check_upstream(metadata, package_dir):
-    def version_key(value: str):
-        parts = []
-        for token in str(value).replace('-', '.').split('.'):
-            if token.isdigit():
-                parts.append(int(token))
-            else:
-                parts.append(token)
-        return tuple(parts)
+def _host_slot(url: str) -> threading.Semaphore:
+    from urllib.parse import urlsplit
+
+    host = urlsplit(url).netloc.lower()
+    with _HOST_SLOTS_LOCK:
+        slot = _HOST_SLOTS.get(host)
+        if slot is None:
+            slot = threading.Semaphore(UPSTREAM_PER_HOST_LIMIT)
+            _HOST_SLOTS[host] = slot
+    return slot
+
+
+class HttpCache:
+    """On-disk cache for upstream probes using ETag/Last-Modified revalidation.
+
+    Entries younger than ``ttl`` seconds are served without touching the network;
+    older ones are revalidated with a conditional request and a 304 is served from
+    disk. ``offline`` never touches the network and fails on a cold cache.
+    """
+
+    def __init__(self, root: Path, ttl: float = 0, offline: bool = False, enabled: bool = True) -> None:
+        self.root = root
+        self.ttl = ttl
+        self.offline = offline
+        self.enabled = enabled or offline
+
+    @classmethod
+    def from_env(cls) -> "HttpCache":
+        return cls(
+            Path(os.environ.get("UPSTREAM_CACHE_DIR") or HTTP_CACHE_DIR),
+            ttl=float(os.environ.get("UPSTREAM_CACHE_TTL", "0")),
+            offline=bool(os.environ.get("UPSTREAM_OFFLINE")),
+            enabled=not os.environ.get("UPSTREAM_NO_CACHE"),
+        )
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        import hashlib
+
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / f"{key}.json", self.root / f"{key}.body"
+
+    def _load_meta(self, url: str) -> Dict[str, Any] | None:
+        import json
+
+        meta_path, body_path = self._paths(url)
+        if not body_path.exists():
+            return None
+        try:
+            return json.loads(meta_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write_meta(self, url: str, meta: Dict[str, Any]) -> None:
+        import json
+
+        meta_path, _ = self._paths(url)
+        tmp = meta_path.with_name(f"{meta_path.name}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(meta))
+        tmp.replace(meta_path)
+
+    @staticmethod
+    def _read_file(path: Path, chunk_size: int) -> Iterator[bytes]:
+        with open(path, "rb") as fh:
+            while True:
+                chunk = fh.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def iter_chunks(
+        self,
+        url: str,
+        timeout: float,
+        stats: Dict[str, int],
+        chunk_size: int = UPSTREAM_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """Yield the response body in chunks, teeing network responses into the cache."""
+        from urllib.error import HTTPError
+        from urllib.request import Request, urlopen
+
+        if not self.enabled:
+            stats["miss"] = stats.get("miss", 0) + 1
+            with urlopen(url, timeout=timeout) as response:
+                while True:
+                    chunk = response.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        _, body_path = self._paths(url)
+        meta = self._load_meta(url)
+        if meta is not None:
+            fresh = time.time() - float(meta.get("fetched_at", 0)) < self.ttl
+            if fresh or self.offline:
+                stats["hit"] = stats.get("hit", 0) + 1
+                yield from self._read_file(body_path, chunk_size)
+                return
+        if self.offline:
+            raise RuntimeError(f"offline mode: no cached response for {url}")
+
+        request = Request(url)
+        if meta is not None:
+            if meta.get("etag"):
+                request.add_header("If-None-Match", meta["etag"])
+            if meta.get("last_modified"):
+                request.add_header("If-Modified-Since", meta["last_modified"])
+        try:
+            response = urlopen(request, timeout=timeout)
+        except HTTPError as exc:
+            if exc.code == 304 and meta is not None:
+                stats["revalidated"] = stats.get("revalidated", 0) + 1
+                stats["hit"] = stats.get("hit", 0) + 1
+                meta["fetched_at"] = time.time()
+                self._write_meta(url, meta)
+                yield from self._read_file(body_path, chunk_size)
+                return
+            raise
+        stats["miss"] = stats.get("miss", 0) + 1
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = body_path.with_name(f"{body_path.name}.{threading.get_ident()}.tmp")
+        try:
+            with response, open(tmp, "wb") as fh:
+                while True:
+                    chunk = response.read(chunk_size)
+                    if not chunk:
+                        break
+                    fh.write(chunk)
+                    yield chunk
+                headers = response.headers
+            tmp.replace(body_path)
+        finally:
+            # A consumer that stops early (or a failed read) leaves a partial body; drop it.
+            tmp.unlink(missing_ok=True)
+        self._write_meta(
+            url,
+            {
+                "url": url,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+            },
+        )
+
+    def fetch(self, url: str, timeout: float, stats: Dict[str, int]) -> bytes:
+        return b"".join(self.iter_chunks(url, timeout, stats))
+
+
+_VERSION_RE = re.compile(
+    r"""^v?(?P<release>\d+(?:[._]\d+)*)
+    (?:[-._]?(?P<phase>snapshot|dev|alpha|a|beta|b|preview|pre|milestone|m|rc|cr|c)[-._]?(?P<phase_num>\d*))?
+    (?:[-._]?(?:post|p)[-._]?(?P<post>\d+))?
+    (?P<rest>.*)$""",
+    re.IGNORECASE | re.VERBOSE,
+)
+_PHASE_RANK = {
+    "snapshot": 0,
+    "dev": 0,
+    "alpha": 1,
+    "a": 1,
+    "beta": 2,
+    "b": 2,
+    "preview": 3,
+    "pre": 3,
+    "milestone": 3,
+    "m": 3,
+    "rc": 4,
+    "cr": 4,
+    "c": 4,
+}
+_FINAL_RANK = 5
+_NUMERIC_VERSION_RE = re.compile(r"\d+(?:\.\d+)*\Z")
+_TOKEN_RE = re.compile(r"\d+|[a-z]+", re.IGNORECASE)
+
+
+def _parse_version(value: str) -> Tuple[Any, ...]:
+    """Total-order sort key for upstream version strings.
+
+    ``4.0.0-SNAPSHOT < 4.0.0-preview2 < 4.0.0rc1 < 4.0.0 == 4.0 < 4.0.0.post1 < 4.0.1``. Every key has
+    the same shape and any free-form remainder is encoded as ``(kind, int, str)``
+    triples, so comparing two keys never raises ``TypeError``. Strings without a
+    leading release number sort below every real version.
+    """
+    text = str(value).strip()
+    if _NUMERIC_VERSION_RE.match(text):
+        release = tuple(map(int, text.split(".")))
+        while len(release) > 1 and release[-1] == 0:
+            release = release[:-1]
+        return (release, _FINAL_RANK, 0, 0, ())
+    match = _VERSION_RE.match(text)
+    if not match:
+        release: Tuple[int, ...] = ()
+        phase, phase_num, post, rest = _FINAL_RANK, 0, 0, text
+    else:
+        release = tuple(int(p) for p in re.split(r"[._]", match.group("release")))
+        while len(release) > 1 and release[-1] == 0:
+            release = release[:-1]
+        phase_name = (match.group("phase") or "").lower()
+        phase = _PHASE_RANK.get(phase_name, _FINAL_RANK)
+        phase_num = int(match.group("phase_num") or 0)
+        post = int(match.group("post") or 0)
+        rest = match.group("rest")
+    rest_key = tuple(
+        (0, int(token), "") if token.isdigit() else (1, 0, token.lower())
+        for token in _TOKEN_RE.findall(rest)
+    )
+    return (release, phase, phase_num, post, rest_key)
+
+
+version_key = functools.lru_cache(maxsize=4096)(_parse_version)
+
+
+_RELEASE_PREFIX_RE = re.compile(r"\s*v?(\d+(?:[._]\d+)*)", re.IGNORECASE)
+
+
+def _release_tuple(value: str) -> Tuple[int, ...]:
+    return tuple(map(int, value.split(".")))
+
+
+_DIGIT_SHAPE = str.maketrans("123456789", "000000000")
+
+
+def _numeric_max(values: List[str]) -> str:
+    """Highest plain dotted number in ``values``.
+
+    Numbers of the same shape (length and dot positions) already compare
+    correctly as strings, so only the largest of each shape is converted to ints.
+    """
+    import itertools
+
+    ordered = sorted(values)
+    # Later entries overwrite earlier ones, leaving the string maximum of each shape.
+    per_shape = dict(zip(map(str.translate, ordered, itertools.repeat(_DIGIT_SHAPE)), ordered))
+    return max(per_shape.values(), key=_release_tuple)
+
+
+def _release_prefix(value: str) -> Tuple[int, ...]:
+    """Leading release numbers of ``value``; never sorts below ``version_key(value)[0]``."""
+    match = _RELEASE_PREFIX_RE.match(value)
+    if not match:
+        return ()
+    return _release_tuple(match.group(1).replace("_", "."))
+
+
+def _window_max(values: List[str], floor: Tuple[int, ...]) -> str | None:
+    """Highest of ``values`` by ``version_key``, ignoring any whose release is below ``floor``.
+
+    Plain dotted numbers, the bulk of any listing, are ordered by their integer
+    release tuple (it only refines the trailing-zero equality), so only their
+    maximum gets the full parse. Values with a suffix are dropped on their release
+    prefix alone when it is already below the best release seen.
+    """
+    # One pass over the joined window usually proves every value is a plain number.
+    joined = f".{'.'.join(values)}."
+    if joined.isascii() and joined.replace(".", "").isdigit() and ".." not in joined:
+        numeric, others = values, []
+    else:
+        numeric = list(filter(_NUMERIC_VERSION_RE.match, values))
+        plain = set(numeric)
+        others = [value for value in values if value not in plain]
+    candidates: List[str] = []
+    if numeric:
+        top = _numeric_max(numeric)
+        candidates.append(top)
+        floor = max(floor, version_key(top)[0])
+    candidates.extend(value for value in others if _release_prefix(value) >= floor)
+    return max(candidates, key=version_key) if candidates else None
+
+
+def scan_latest(chunks: Iterable[bytes], pattern: str, overlap: int = 4096) -> str | None:
+    """Return the highest version matched by ``pattern`` across a chunked body.
+
+    The body is decoded incrementally and never held in full. The last ``overlap``
+    characters of each window are carried into the next one, so matches shorter
+    than that which straddle a chunk boundary are still found exactly once. Only
+    the running maximum is kept, and values that cannot beat it are skipped
+    before the full ``version_key`` parse.
+    """
+    import codecs
+
+    regex = _compile_pattern(pattern)
+    group = 1 if regex.groups else 0
+    decoder = codecs.getincrementaldecoder("utf-8")("ignore")
+    best: str | None = None
+    best_key: Tuple[Any, ...] | None = None
+    buffer = ""
+
+    def consume(text: str, final: bool) -> int:
+        nonlocal best, best_key
+        limit = len(text) if final else len(text) - overlap
+        cut = 0
+        values: Dict[str, None] = {}
+        for match in regex.finditer(text):
+            end = match.end()
+            if end > limit:
+                cut = match.start()
+                break
+            values[match.group(group)] = None
+            cut = end
+        else:
+            cut = max(cut, limit)
+        values.pop(best, None)
+        candidate = _window_max(list(values), best_key[0] if best_key else ())
+        if candidate is not None:
+            key = version_key(candidate)
+            if best_key is None or key > best_key:
+                best, best_key = candidate, key
+        return cut
+
+    for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        if len(buffer) > overlap:
+            buffer = buffer[consume(buffer, final=False):]
+    buffer += decoder.decode(b"", final=True)
+    consume(buffer, final=True)
+    return best
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_pattern(pattern: str) -> "re.Pattern[str]":
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _fetch_upstream(url: str, timeout: float, http: HttpCache, stats: Dict[str, int]) -> bytes:
+    with _host_slot(url):
+        return http.fetch(url, timeout, stats)
+
+
+def upstream_result(metadata, package_dir, http=None):
+    import json
+
+    def compare(result, latest, source=None):
+        result['latest'] = latest
+        if source:
+            result['source'] = source
+        if version_key(latest) > version_key(str(current)):
+            result['status'] = 'update_available'
+        else:
+            result['status'] = 'up_to_date'
+        return result
 
     slug = metadata.get('slug') or package_dir.name
     version_cfg = metadata.get('version', {})
@@ -273,6 +2201,8 @@ def check_upstream(metadata, package_dir):
     current = version_cfg.get('current')
     if not current:
         raise SystemExit('version.current must be set for upstream checks')
+    http = http or HttpCache.from_env()
+    stats: Dict[str, int] = {'hit': 0, 'miss': 0, 'revalidated': 0}
 
     result = {
         'package': slug,
@@ -280,6 +2210,8 @@ def check_upstream(metadata, package_dir):
         'current': current,
         'status': 'skipped',
     }
+    if strategy in ('pypi', 'http-directory'):
+        result['cache'] = stats
 
     if strategy == 'pypi':
         package_name = str(version_cfg.get('component') or slug).strip()
@@ -287,36 +2219,22 @@ def check_upstream(metadata, package_dir):
         if not package_name:
             result['status'] = 'error'
             result['error'] = 'missing PyPI package name'
-            print(json.dumps(result))
-            return 0
-        url = f'https://pypi.org/pypi/{package_name}/json'
-        from urllib.request import urlopen
+            return result
+        url = f"{os.environ.get('PYPI_URL', 'https://pypi.org/pypi').rstrip('/')}/{package_name}/json"
         try:
-            with urlopen(url, timeout=timeout) as response:
-                payload = json.loads(response.read().decode('utf-8', 'ignore'))
+            payload = json.loads(_fetch_upstream(url, timeout, http, stats).decode('utf-8', 'ignore'))
         except Exception as exc:  # pylint: disable=broad-except
             result['status'] = 'error'
             result['error'] = str(exc)
             result['source'] = url
-            print(json.dumps(result))
-            return 0
+            return result
         latest = payload.get('info', {}).get('version')
         if not latest:
             result['status'] = 'error'
             result['error'] = 'unable to determine latest PyPI version'
             result['source'] = url
-            print(json.dumps(result))
-            return 0
-        result['latest'] = latest
-        result['source'] = url
-        if version_key(latest) > version_key(str(current)):
-            result['status'] = 'update_available'
-            print(json.dumps(result))
-            return 2
-
-        result['status'] = 'up_to_date'
-        print(json.dumps(result))
-        return 0
+            return result
+        return compare(result, latest, url)
 
     if strategy == 'http-directory':
         source = version_cfg.get('source', {}) or {}
@@ -326,40 +2244,22 @@ def check_upstream(metadata, package_dir):
         if not url or not pattern:
             result['status'] = 'error'
             result['error'] = 'missing http-directory configuration'
-            print(json.dumps(result))
-            return 0
-        from urllib.request import urlopen
-        import re
+            return result
         try:
-            with urlopen(url, timeout=timeout) as response:
-                payload = response.read().decode('utf-8', 'ignore')
+            with _host_slot(url):
+                latest = scan_latest(http.iter_chunks(url, timeout, stats), pattern)
         except Exception as exc:  # pylint: disable=broad-except
             result['status'] = 'error'
             result['error'] = str(exc)
             result['source'] = url
-            print(json.dumps(result))
-            return 0
+            return result
 
-        matches = re.findall(pattern, payload, flags=re.IGNORECASE)
-        if not matches:
+        if latest is None:
             result['status'] = 'error'
             result['error'] = 'no matches from http-directory source'
             result['source'] = url
-            print(json.dumps(result))
-            return 0
-        if isinstance(matches[0], tuple):
-            matches = [m[0] for m in matches]
-        latest = max(matches, key=version_key)
-        result['latest'] = latest
-        result['source'] = url
-        if version_key(latest) > version_key(str(current)):
-            result['status'] = 'update_available'
-            print(json.dumps(result))
-            return 2
-
-        result['status'] = 'up_to_date'
-        print(json.dumps(result))
-        return 0
+            return result
+        return compare(result, latest, url)
 
     component = version_cfg.get('component')
     candidates = []
@@ -386,18 +2286,49 @@ def check_upstream(metadata, package_dir):
                 break
 
     if latest is None:
-        print(json.dumps(result))
-        return 0
+        return result
+    return compare(result, latest)
+
+
+def _upstream_exit_code(result: Dict[str, Any]) -> int:
+    return 2 if result.get('status') == 'update_available' else 0
 
-    result['latest'] = latest
-    if version_key(latest) > version_key(str(current)):
-        result['status'] = 'update_available'
-        print(json.dumps(result))
-        return 2
 
-    result['status'] = 'up_to_date'
+def check_upstream(metadata, package_dir, http=None):
+    import json
+
+    result = upstream_result(metadata, package_dir, http)
     print(json.dumps(result))
-    return 0
+    return _upstream_exit_code(result)
+
+
+def check_upstream_many(slugs: List[str], jobs: int | None = None, http: HttpCache | None = None) -> int:
+    """Check several packages concurrently in this process.
+
+    Requests share a per-host concurrency limit, so total time approaches the slowest
+    single mirror rather than the sum. Results print in the order requested.
+    """
+    import json
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    def check(slug: str) -> Dict[str, Any]:
+        try:
+            metadata, package_dir = load_metadata(slug)
+            return upstream_result(metadata, package_dir, http)
+        except SystemExit as exc:
+            return {'package': slug, 'status': 'error', 'error': str(exc)}
+
+    workers = max(1, jobs or len(slugs))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(check, slugs))
+
+    code = 0
+    for result in results:
+        print(json.dumps(result), flush=True)
+        code = max(code, _upstream_exit_code(result))
+    return code
+
 
 def detect_version(metadata: Dict[str, Any]) -> None:
     version = metadata.get("version", {})
@@ -422,26 +2353,775 @@ def list_packages() -> Iterable[str]:
             yield path.name
 
 
-def parse_args() -> argparse.Namespace:
+def parse_memory(value: Any) -> int:
+    """Convert docker-style memory sizes (e.g. ``512m``, ``4g``) to bytes."""
+    text = str(value).strip().lower()
+    if not text:
+        return 0
+    units = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+    suffix = text[-1]
+    if text.endswith("b"):
+        text = text[:-1]
+        suffix = text[-1] if text else ""
+    try:
+        if suffix in units:
+            return int(float(text[:-1]) * units[suffix])
+        return int(float(text))
+    except ValueError:
+        raise SystemExit(f"invalid memory size: {value}")
+
+
+def host_memory() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def build_resources(metadata: Dict[str, Any]) -> Tuple[float, int]:
+    resources = metadata.get("build", {}).get("resources", {}) or {}
+    cpus = float(resources.get("cpus", DEFAULT_BUILD_CPUS))
+    memory = parse_memory(resources.get("memory", DEFAULT_BUILD_MEMORY))
+    return cpus, memory
+
+
+def build_dependencies(metadata: Dict[str, Any]) -> List[str]:
+    depends_on = metadata.get("build", {}).get("depends_on", []) or []
+    if isinstance(depends_on, str):
+        depends_on = [depends_on]
+    return [str(dep) for dep in depends_on]
+
+
+def build_graph(slugs: Iterable[str]) -> Dict[str, List[str]]:
+    """Return ``{slug: [dependencies]}`` after checking the DAG is closed and acyclic."""
+    graph: Dict[str, List[str]] = {}
+    for slug in slugs:
+        metadata, _ = load_metadata(slug)
+        graph[slug] = build_dependencies(metadata)
+
+    for slug, deps in graph.items():
+        for dep in deps:
+            if dep not in graph:
+                raise SystemExit(f"{slug}: build.depends_on references unknown package '{dep}'")
+
+    state: Dict[str, int] = {}
+
+    def visit(slug: str, trail: List[str]) -> None:
+        if state.get(slug) == 2:
+            return
+        if state.get(slug) == 1:
+            cycle = " -> ".join(trail[trail.index(slug):] + [slug])
+            raise SystemExit(f"build.depends_on cycle detected: {cycle}")
+        state[slug] = 1
+        for dep in graph[slug]:
+            visit(dep, trail + [slug])
+        state[slug] = 2
+
+    for slug in graph:
+        visit(slug, [])
+    return graph
+
+
+class LogMux:
+    """Interleave line-buffered output from concurrent jobs with a per-package prefix."""
+
+    def __init__(self, labels: Iterable[str], log_dir: Path | None = None) -> None:
+        self._lock = threading.Lock()
+        self._width = max((len(label) for label in labels), default=0)
+        self._log_dir = log_dir
+        if log_dir:
+            log_dir.mkdir(parents=True, exist_ok=True)
+
+    def emit(self, label: str, line: str) -> None:
+        line = line.rstrip("\n")
+        with self._lock:
+            print(f"[{label:<{self._width}}] {line}", flush=True)
+            if self._log_dir:
+                # "<slug>:<test>" labels share their package's log file.
+                with open(self._log_dir / f"{label.split(':', 1)[0]}.log", "a", encoding="utf-8") as fh:
+                    fh.write(line + "\n")
+
+    def run(
+        self,
+        label: str,
+        cmd: List[str],
+        cwd: Path,
+        env: Dict[str, str] | None = None,
+        capture: List[str] | None = None,
+        timeout: float | None = None,
+    ) -> int:
+        """Stream ``cmd``'s output; past ``timeout`` its process group is killed and TIMEOUT_EXIT_CODE returned."""
+        import signal
+        import subprocess
+
+        if _INTERRUPTED.is_set():
+            return 128 + signal.SIGINT
+        self.emit(label, "→ " + " ".join(cmd))
+        proc = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1,
+            start_new_session=timeout is not None,
+        )
+        expired = threading.Event()
+
+        def kill() -> None:
+            expired.set()
+            for sig, grace in ((signal.SIGTERM, 10), (signal.SIGKILL, 0)):
+                try:
+                    os.killpg(proc.pid, sig)
+                except ProcessLookupError:
+                    return
+                try:
+                    proc.wait(grace)
+                    return
+                except subprocess.TimeoutExpired:
+                    continue
+
+        if timeout is not None:
+            _LIVE_GROUPS.add(proc.pid)
+            if _INTERRUPTED.is_set():
+                os.killpg(proc.pid, signal.SIGINT)
+        timer = threading.Timer(timeout, kill) if timeout else None
+        if timer:
+            timer.daemon = True
+            timer.start()
+        try:
+            assert proc.stdout is not None
+            for line in proc.stdout:
+                self.emit(label, line)
+                if capture is not None:
+                    capture.append(line)
+            proc.stdout.close()
+            code = proc.wait()
+        finally:
+            _LIVE_GROUPS.discard(proc.pid)
+        if timer:
+            timer.cancel()
+        return TIMEOUT_EXIT_CODE if expired.is_set() else code
+
+
+def _forward_signal(signum: int, frame: Any) -> None:
+    """Pass SIGINT/SIGTERM on to every live process group, then stop this process.
+
+    Tests run in their own sessions so timeouts can kill whole groups, which also
+    keeps the terminal's Ctrl-C away from them. Forwarding it lets their EXIT traps
+    tear down compose stacks and volumes. Each repeat escalates: SIGINT, SIGTERM,
+    then SIGKILL.
+    """
+    import signal
+
+    escalation = (signum, signal.SIGTERM, signal.SIGKILL)
+    sig = escalation[min(len(_INTERRUPTS), len(escalation) - 1)]
+    _INTERRUPTS.append(signum)
+    _INTERRUPTED.set()
+    for pid in tuple(_LIVE_GROUPS):
+        try:
+            os.killpg(pid, sig)
+        except ProcessLookupError:
+            pass
+    # Only the first signal unwinds; later ones just escalate while the runners wait for their children.
+    if len(_INTERRUPTS) == 1:
+        if signum == signal.SIGINT:
+            raise KeyboardInterrupt
+        raise SystemExit(128 + signum)
+
+
+def build_all(args: argparse.Namespace) -> None:
+    graph = build_graph(list_packages())
+    packages: Dict[str, Tuple[Dict[str, Any], Path]] = {slug: load_metadata(slug) for slug in graph}
+
+    cpu_budget = float(args.cpus or os.environ.get("PACKAGE_BUILD_CPUS") or os.cpu_count() or 1)
+    memory_budget = parse_memory(args.memory or os.environ.get("PACKAGE_BUILD_MEMORY") or host_memory())
+    jobs = max(1, args.jobs or os.cpu_count() or 1)
+    log_dir = Path(args.log_dir) if args.log_dir else None
+    mux = LogMux(graph, log_dir)
+
+    requests: Dict[str, Tuple[float, int]] = {}
+    for slug, (metadata, _) in packages.items():
+        cpus, memory = build_resources(metadata)
+        # A package larger than the whole budget still runs, just on its own.
+        requests[slug] = (min(cpus, cpu_budget), min(memory, memory_budget) if memory_budget else 0)
+
+    dependents: Dict[str, List[str]] = {slug: [] for slug in graph}
+    for slug, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(slug)
+
+    def weight(slug: str) -> int:
+        seen = set()
+        stack = list(dependents[slug])
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(dependents[node])
+        return len(seen)
+
+    # Critical-path first: packages that unblock the most others start earliest.
+    order = sorted(graph, key=lambda slug: (-weight(slug), slug))
+
+    cond = threading.Condition()
+    pending = list(order)
+    built: set = set()
+    failed: set = set()
+    results: Dict[str, Dict[str, Any]] = {}
+    state = {"cpus": 0.0, "memory": 0, "builds": 0}
+    workers: List[threading.Thread] = []
+
+    def worker(slug: str) -> None:
+        metadata, package_dir = packages[slug]
+        result = results[slug]
+        started = time.monotonic()
+        try:
+            cmd = build_command(package_dir, metadata, args)
+            fingerprint = None
+            image_id = None
+            if cache_enabled(args):
+                fingerprint = build_fingerprint(package_dir, metadata, args, load_build_manifest().get(slug))
+                image_id, reasons = cached_image(slug, fingerprint)
+                if not image_id:
+                    mux.emit(slug, "→ cache miss: " + "; ".join(reasons))
+            if image_id:
+                mux.emit(slug, f"→ build inputs unchanged; reusing {image_id[:19]}")
+                code = 0
+                for retag in reuse_cached_image(image_id, metadata):
+                    code = code or mux.run(slug, retag, cwd=package_dir)
+            else:
+                if build_reporting(args):
+                    report_dir = Path(args.report_dir) if args.report_dir else log_dir
+                    code = instrumented_build(cmd, package_dir, metadata, report_dir, lambda line: mux.emit(slug, line))
+                else:
+                    code = mux.run(slug, cmd, cwd=package_dir)
+                if code == 0 and fingerprint is not None:
+                    record_build(slug, fingerprint, compute_local_tag(metadata))
+        except (SystemExit, OSError) as exc:
+            mux.emit(slug, str(exc))
+            code = 1
+        result["build_seconds"] = time.monotonic() - started
+        with cond:
+            state["cpus"] -= requests[slug][0]
+            state["memory"] -= requests[slug][1]
+            state["builds"] -= 1
+            if code == 0:
+                built.add(slug)
+                result["status"] = "built"
+            else:
+                failed.add(slug)
+                result["status"] = f"build failed ({code})"
+            cond.notify_all()
+        if code != 0 or not args.test:
+            return
+
+        # Tests run outside the build budget so the next builds can start immediately.
+        started = time.monotonic()
+        try:
+            tests = run_test_suite(package_dir, metadata, mux, label_prefix=f"{slug}:")
+            write_test_report(slug, tests, TEST_REPORT_DIR)
+            broken = [test["name"] for test in tests if not test["ok"]]
+            status = f"tests failed: {', '.join(broken)}" if broken else "passed"
+        except SystemExit as exc:
+            mux.emit(slug, str(exc))
+            status = "tests failed"
+        result["test_seconds"] = time.monotonic() - started
+        with cond:
+            result["status"] = status
+            if status != "passed":
+                failed.add(slug)
+
+    def fits(slug: str) -> bool:
+        cpus, memory = requests[slug]
+        if state["builds"] == 0:
+            return True
+        if state["builds"] >= jobs:
+            return False
+        if state["cpus"] + cpus > cpu_budget:
+            return False
+        if memory_budget and state["memory"] + memory > memory_budget:
+            return False
+        return True
+
+    wall_started = time.monotonic()
+    with cond:
+        while pending:
+            progressed = False
+            for slug in list(pending):
+                deps = graph[slug]
+                if any(dep in failed for dep in deps):
+                    pending.remove(slug)
+                    failed.add(slug)
+                    results[slug] = {"status": "skipped (dependency failed)"}
+                    mux.emit(slug, "skipping: a dependency failed to build")
+                    progressed = True
+                    continue
+                if not all(dep in built for dep in deps) or not fits(slug):
+                    continue
+                pending.remove(slug)
+                state["cpus"] += requests[slug][0]
+                state["memory"] += requests[slug][1]
+                state["builds"] += 1
+                results[slug] = {"status": "building"}
+                thread = threading.Thread(target=worker, args=(slug,), name=f"build-{slug}")
+                workers.append(thread)
+                thread.start()
+                progressed = True
+            if pending and not progressed:
+                cond.wait()
+    for thread in workers:
+        thread.join()
+    wall = time.monotonic() - wall_started
+
+    serial = 0.0
+    print()
+    print(f"{'package':<{max(len(s) for s in order)}}  {'build':>9}  {'tests':>9}  status")
+    for slug in order:
+        result = results.get(slug, {})
+        build_seconds = result.get("build_seconds")
+        test_seconds = result.get("test_seconds")
+        serial += (build_seconds or 0.0) + (test_seconds or 0.0)
+        build_col = f"{build_seconds:8.1f}s" if build_seconds is not None else "        -"
+        test_col = f"{test_seconds:8.1f}s" if test_seconds is not None else "        -"
+        print(f"{slug:<{max(len(s) for s in order)}}  {build_col}  {test_col}  {result.get('status', 'not run')}")
+    speedup = serial / wall if wall > 0 else 1.0
+    print(f"wall-clock {wall:.1f}s vs serial {serial:.1f}s ({speedup:.2f}x)")
+
+    if failed:
+        raise SystemExit(f"build all failed for: {', '.join(sorted(failed))}")
+
+
+_STR = {"type": str}
+_SCALAR = {"type": (str, int, float, bool)}
+_STR_LIST = {"type": list, "items": _STR}
+
+METADATA_SCHEMA: Dict[str, Any] = {
+    "type": dict,
+    "required": ["name", "slug", "summary", "version", "build", "publish"],
+    "properties": {
+        "name": _STR,
+        "slug": _STR,
+        "summary": _STR,
+        "license": _STR,
+        "maintainers": {
+            "type": list,
+            "items": {"type": dict, "required": ["name"], "properties": {"name": _STR, "email": _STR}},
+        },
+        "links": {"type": dict, "values": _STR},
+        "version": {
+            "type": dict,
+            "required": ["strategy", "current"],
+            "properties": {
+                "strategy": {"type": str, "enum": ["manual", "pypi", "http-directory"]},
+                "current": _SCALAR,
+                "component": _STR,
+                "notes": _STR,
+                "timeout": {"type": (int, float)},
+                "source": {
+                    "type": dict,
+                    "properties": {
+                        "url": _STR,
+                        "regex": _STR,
+                        "pattern": _STR,
+                        "timeout": {"type": (int, float)},
+                    },
+                },
+            },
+        },
+        "runtime": {
+            "type": dict,
+            "properties": {
+                "base_image": _STR,
+                "user": _SCALAR,
+                "workdir": _STR,
+                "entrypoint": _STR_LIST,
+                "cmd": _STR_LIST,
+                "env": {
+                    "type": list,
+                    "items": {
+                        "type": dict,
+                        "required": ["name"],
+                        "properties": {"name": _STR, "default": _SCALAR, "description": _STR},
+                    },
+                },
+                "ports": {
+                    "type": list,
+                    "items": {
+                        "type": dict,
+                        "required": ["container_port"],
+                        "properties": {
+                            "name": _STR,
+                            "container_port": {"type": int},
+                            "protocol": {"type": str, "enum": ["tcp", "udp"]},
+                        },
+                    },
+                },
+                "volumes": {
+                    "type": list,
+                    "items": {"type": dict, "required": ["path"], "properties": {"name": _STR, "path": _STR}},
+                },
+            },
+        },
+        "build": {
+            "type": dict,
+            "properties": {
+                "context": _STR,
+                "dockerfile": _STR,
+                "args": {"type": dict, "values": _SCALAR},
+                "depends_on": _STR_LIST,
+                "lock": {
+                    "type": dict,
+                    "required": ["file", "command"],
+                    "properties": {"file": _STR, "command": _STR},
+                },
+                "cache": {
+                    "type": dict,
+                    "properties": {
+                        "mode": {"type": str, "enum": ["min", "max"]},
+                        "backends": {
+                            "type": list,
+                            "items": {
+                                "type": dict,
+                                "required": ["type"],
+                                "properties": {
+                                    "type": {"type": str, "enum": ["local", "registry", "gha", "s3"]},
+                                    "mode": {"type": str, "enum": ["min", "max"]},
+                                    "export": {"type": bool},
+                                },
+                                "values": _SCALAR,
+                            },
+                        },
+                    },
+                },
+                "resources": {
+                    "type": dict,
+                    "properties": {"cpus": {"type": (int, float)}, "memory": {"type": (str, int)}},
+                },
+                "files": {
+                    "type": list,
+                    "items": {
+                        "type": dict,
+                        "required": ["source", "destination"],
+                        "properties": {"source": _STR, "destination": _STR},
+                    },
+                },
+            },
+        },
+        "classpath": {
+            "type": dict,
+            "properties": {"path": _STR, "trace_command": _STR},
+        },
+        "tests": {
+            "type": list,
+            "items": {
+                "type": dict,
+                "required": ["name", "command"],
+                "properties": {
+                    "name": _STR,
+                    "command": _STR,
+                    "depends_on": _STR_LIST,
+                    "parallel": {"type": bool},
+                    "timeout": {"type": (int, float)},
+                },
+            },
+        },
+        "benchmarks": {
+            "type": list,
+            "items": {
+                "type": dict,
+                "required": ["name", "command"],
+                "properties": {"name": _STR, "command": _STR, "timeout": {"type": (int, float)}},
+            },
+        },
+        "publish": {
+            "type": dict,
+            "required": ["image", "tags"],
+            "properties": {
+                "image": _STR,
+                "tags": {"type": list, "items": _SCALAR, "min_items": 1},
+                "labels": {"type": dict, "values": _SCALAR},
+            },
+        },
+    },
+}
+
+
+def _type_name(expected: Any) -> str:
+    if isinstance(expected, tuple):
+        return " or ".join(t.__name__ for t in expected)
+    return expected.__name__
+
+
+def validate_schema(node: Any, schema: Dict[str, Any], path: str, errors: List[str]) -> None:
+    expected = schema.get("type")
+    # bool is an int subclass; only accept it where the schema asks for bool.
+    wrong_bool = isinstance(node, bool) and expected is not None and bool not in (
+        expected if isinstance(expected, tuple) else (expected,)
+    )
+    if expected is not None and (not isinstance(node, expected) or wrong_bool):
+        errors.append(f"{path}: expected {_type_name(expected)}, got {type(node).__name__}")
+        return
+    if "enum" in schema and node not in schema["enum"]:
+        errors.append(f"{path}: {node!r} is not one of {', '.join(schema['enum'])}")
+    if isinstance(node, dict):
+        for key in schema.get("required", []):
+            if key not in node or node[key] in (None, ""):
+                errors.append(f"{path}.{key}: required")
+        properties = schema.get("properties", {})
+        for key, value in node.items():
+            child = properties.get(key) or schema.get("values")
+            if child and value is not None:
+                validate_schema(value, child, f"{path}.{key}", errors)
+    if isinstance(node, list):
+        if len(node) < schema.get("min_items", 0):
+            errors.append(f"{path}: must contain at least {schema['min_items']} entries")
+        if "items" in schema:
+            for idx, item in enumerate(node):
+                validate_schema(item, schema["items"], f"{path}[{idx}]", errors)
+
+
+def validate_metadata(slug: str, metadata: Any, known: Iterable[str]) -> List[str]:
+    """Schema plus cross-field checks for one container.yaml; returns human-readable errors."""
+    errors: List[str] = []
+    validate_schema(metadata, METADATA_SCHEMA, slug, errors)
+    if errors or not isinstance(metadata, dict):
+        return errors
+
+    if metadata["slug"] != slug:
+        errors.append(f"{slug}.slug: {metadata['slug']!r} does not match directory name")
+
+    def check_token(value: Any, where: str) -> None:
+        if isinstance(value, str) and value.startswith("!"):
+            try:
+                resolve_path(metadata, value[1:])
+            except SystemExit as exc:
+                errors.append(f"{where}: {exc}")
+
+    for key, value in (metadata["build"].get("args") or {}).items():
+        check_token(value, f"{slug}.build.args.{key}")
+    for idx, tag in enumerate(metadata["publish"]["tags"]):
+        check_token(tag, f"{slug}.publish.tags[{idx}]")
+    for key, value in (metadata["publish"].get("labels") or {}).items():
+        check_token(value, f"{slug}.publish.labels.{key}")
+
+    version_cfg = metadata["version"]
+    if version_cfg["strategy"] == "http-directory":
+        source = version_cfg.get("source") or {}
+        pattern = source.get("regex") or source.get("pattern")
+        if not source.get("url") or not pattern:
+            errors.append(f"{slug}.version.source: http-directory needs url and regex")
+        else:
+            try:
+                re.compile(pattern)
+            except re.error as exc:
+                errors.append(f"{slug}.version.source.regex: {exc}")
+
+    known = set(known)
+    for dep in build_dependencies(metadata):
+        if dep not in known:
+            errors.append(f"{slug}.build.depends_on: unknown package '{dep}'")
+    try:
+        test_plan(metadata)
+    except SystemExit as exc:
+        errors.append(f"{slug}.tests: {exc}")
+    try:
+        test_plan({"tests": metadata.get("benchmarks")})
+    except SystemExit as exc:
+        errors.append(f"{slug}.benchmarks: {exc}")
+    memory = (metadata["build"].get("resources") or {}).get("memory")
+    if memory is not None:
+        try:
+            parse_memory(memory)
+        except SystemExit as exc:
+            errors.append(f"{slug}.build.resources.memory: {exc}")
+
+    build = metadata["build"]
+    package_dir = CONTAINERS_DIR / slug
+    if not (package_dir / build.get("context", ".")).is_dir():
+        errors.append(f"{slug}.build.context: {build.get('context', '.')} not found")
+    if not (package_dir / build.get("dockerfile", "Dockerfile")).is_file():
+        errors.append(f"{slug}.build.dockerfile: {build.get('dockerfile', 'Dockerfile')} not found")
+    lock_cfg = build.get("lock")
+    if lock_cfg:
+        for drift in lock_inputs_drift(package_dir, metadata):
+            errors.append(f"{slug}.build.lock: {lock_cfg['file']} is stale ({drift}); run ./scripts/package.py lock {slug}")
+    return errors
+
+
+def metadata_warnings(slug: str, metadata: Dict[str, Any]) -> List[str]:
+    """Findings that ``check`` reports without failing, such as a lockfile that has not been generated yet."""
+    warnings: List[str] = []
+    lock_cfg = metadata["build"].get("lock")
+    if lock_cfg and not (CONTAINERS_DIR / slug / lock_cfg["file"]).is_file():
+        warnings.append(
+            f"{slug}.build.lock: {lock_cfg['file']} not found, so builds resolve the set live;"
+            f" run ./scripts/package.py lock {slug} and commit it"
+        )
+    return warnings
+
+
+def check_packages(slugs: List[str]) -> int:
+    known = list(list_packages())
+    failures = 0
+    for slug in slugs:
+        warnings: List[str] = []
+        try:
+            metadata, _ = load_metadata(slug)
+            errors = validate_metadata(slug, metadata, known)
+            if not errors:
+                warnings = metadata_warnings(slug, metadata)
+        except SystemExit as exc:
+            errors = [f"{slug}: {exc}"]
+        except Exception as exc:  # pylint: disable=broad-except
+            errors = [f"{slug}: unable to parse container.yaml: {exc}"]
+        if errors:
+            failures += 1
+            print(f"✗ {slug}")
+            for error in errors:
+                print(f"  - {error}")
+        else:
+            print(f"✓ {slug}")
+            for warning in warnings:
+                print(f"  ! {warning}")
+    if failures == 0 and len(slugs) > 1:
+        try:
+            build_graph(slugs)
+        except SystemExit as exc:
+            print(f"✗ {exc}")
+            failures += 1
+    return 1 if failures else 0
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    import argparse
+
     parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print import and phase timings to stderr",
+    )
     subparsers = parser.add_subparsers(dest="command")
 
+    subparsers.add_parser("list", help="List available packages")
 
     build_parser = subparsers.add_parser("build", help="Build the container image")
-    build_parser.add_argument("package", help="Package slug")
+    build_parser.add_argument("package", help="Package slug or 'all'")
     build_parser.add_argument("--platform", help="Target platform for buildx (e.g. linux/amd64)")
+    build_parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Maximum concurrent builds for 'all' (default: CPU count)",
+    )
+    build_parser.add_argument("--cpus", help="CPU budget shared by concurrent builds (default: host CPUs)")
+    build_parser.add_argument("--memory", help="Memory budget shared by concurrent builds (e.g. 16g)")
+    build_parser.add_argument(
+        "--test",
+        action="store_true",
+        help="With 'all', run each package's tests as soon as its build finishes",
+    )
+    build_parser.add_argument("--log-dir", help="With 'all', also write per-package logs to this directory")
+    build_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild even when the build fingerprint matches the last recorded build",
+    )
+    build_parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Print the build fingerprint inputs and which of them invalidated the cache",
+    )
+    build_parser.add_argument(
+        "--report",
+        action="store_true",
+        help="Capture BuildKit rawjson progress into a per-step build report (env: PACKAGE_BUILD_REPORT)",
+    )
+    build_parser.add_argument("--report-dir", help="Also copy the build report into this directory (implies --report)")
+
+    prune_parser = subparsers.add_parser("cache-prune", help="Bound the local BuildKit cache directory by size")
+    prune_parser.add_argument(
+        "--max-size",
+        help=f"Size limit such as 20g (env: PACKAGE_BUILD_CACHE_MAX, default: {DEFAULT_BUILD_CACHE_MAX})",
+    )
+    prune_parser.add_argument("--dir", help="Cache root (default: .cache/buildkit)")
+    prune_parser.add_argument("--dry-run", action="store_true", help="Report what would be removed")
+
+    report_parser = subparsers.add_parser("build-report", help="Compare the latest build report against a baseline")
+    report_parser.add_argument("package", help="Package slug")
+    report_parser.add_argument("--baseline", help="Baseline report (default: .cache/package/build-reports/<slug>.baseline.json)")
+    report_parser.add_argument("--save-baseline", action="store_true", help="Store the latest report as the baseline")
+    report_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Flag steps slower than this multiple of the baseline (default: 1.25)",
+    )
+    report_parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=5.0,
+        help="Ignore slowdowns smaller than this many seconds (default: 5)",
+    )
+
+    classpath_parser = subparsers.add_parser(
+        "analyze-classpath", help="Report duplicate classes, version conflicts and unused jars in an image"
+    )
+    classpath_parser.add_argument("package", help="Package slug")
+    classpath_parser.add_argument("--image", help="Image to inspect (default: the package's :local tag)")
+    classpath_parser.add_argument("--path", help="Jar directory inside the image (default: classpath.path)")
+    classpath_parser.add_argument("--jars-dir", help="Analyze a local jar directory instead of an image")
+    classpath_parser.add_argument(
+        "--trace",
+        action="append",
+        help="JVM class-load log (-verbose:class / -Xlog:class+load) file or directory; repeatable",
+    )
+    classpath_parser.add_argument(
+        "--collect",
+        action="store_true",
+        help="Run classpath.trace_command (the smoke jobs) with class-load logging and use its trace",
+    )
+    classpath_parser.add_argument("--top", type=int, default=25, help="Rows to print per section (default: 25)")
+    classpath_parser.add_argument("--report-dir", help="Directory for the JSON report (default: .cache/package/classpath)")
+
+    lock_parser = subparsers.add_parser("lock", help="Regenerate the package's pinned dependency lockfile")
+    lock_parser.add_argument("package", help="Package slug")
 
     test_parser = subparsers.add_parser("test", help="Run package tests")
     test_parser.add_argument("package", help="Package slug")
+    test_parser.add_argument(
+        "--report-dir",
+        help="Directory for the JSON and JUnit test reports (default: .cache/package/test-reports)",
+    )
+    test_parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Maximum parallel tests running at once (default: PACKAGE_TEST_JOBS, or no limit)",
+    )
+
+    bench_parser = subparsers.add_parser("bench", help="Run opt-in package benchmarks one at a time")
+    bench_parser.add_argument("package", help="Package slug")
+    bench_parser.add_argument("names", nargs="*", help="Benchmark names (default: all)")
+    bench_parser.add_argument(
+        "--report-dir",
+        help="Directory for the JSON and JUnit reports (default: .cache/package/test-reports)",
+    )
 
     push_parser = subparsers.add_parser("publish", help="Push image tags to a registry")
-    push_parser.add_argument("package", help="Package slug")
+    push_parser.add_argument("package", nargs="+", help="Package slug(s) or 'all'")
+    push_parser.add_argument("--jobs", type=int, help="Maximum packages published concurrently (default: 4)")
+    push_parser.add_argument(
+        "--namespace",
+        help="Publish under this registry namespace instead of publish.image's (e.g. localhost:5000/dpc)",
+    )
 
     retag_parser = subparsers.add_parser(
         "retag",
         help="Retag an existing image from another namespace without rebuilding",
     )
-    retag_parser.add_argument("package", help="Package slug or 'all'")
+    retag_parser.add_argument("package", nargs="+", help="Package slug(s) or 'all'")
     retag_parser.add_argument("--source-image", help="Fully-qualified source image name")
     retag_parser.add_argument(
         "--source-namespace",
@@ -453,6 +3133,10 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Skip tags that do not exist in the source registry",
     )
+    retag_parser.add_argument("--jobs", type=int, help="Maximum packages retagged concurrently (default: 4)")
+
+    validate_parser = subparsers.add_parser("check", help="Validate container.yaml against the metadata schema")
+    validate_parser.add_argument("package", nargs="+", help="Package slug(s) or 'all'")
 
     show_parser = subparsers.add_parser("show", help="Pretty-print package metadata")
     show_parser.add_argument("package", help="Package slug")
@@ -461,46 +3145,172 @@ def parse_args() -> argparse.Namespace:
     detect_parser.add_argument("package", help="Package slug")
 
     check_parser = subparsers.add_parser("check-upstream", help="Check upstream for new versions")
-    check_parser.add_argument("package", help="Package slug")
+    check_parser.add_argument("package", nargs="+", help="Package slug(s) or 'all'")
+    check_parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Maximum concurrent checks (default: one per package; hosts are limited by UPSTREAM_PER_HOST_LIMIT)",
+    )
+    check_parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        help="Serve cached responses younger than this many seconds without revalidating (env: UPSTREAM_CACHE_TTL)",
+    )
+    check_parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Answer from the on-disk response cache only (env: UPSTREAM_OFFLINE)",
+    )
+    check_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk response cache (env: UPSTREAM_NO_CACHE)",
+    )
+
+    return parser.parse_args(argv)
+
+
+def _phase(label: str) -> None:
+    now = time.perf_counter()
+    last = _STARTED + sum(seconds for _, seconds in _PHASES)
+    _PHASES.append((label, now - last))
+
+
+def profile_startup(argv: List[str]) -> int:
+    """Re-run the CLI under ``-X importtime`` and summarize where startup time goes."""
+    import subprocess
 
-    return parser.parse_args()
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", __file__, "--profile-startup", *argv],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    total = time.perf_counter() - started
+
+    imports: List[Tuple[int, str]] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            print(line, file=sys.stderr)
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        # Only top-level imports; nested ones are already in their parent's cumulative time.
+        if name.startswith(" ") and not name.startswith("  "):
+            imports.append((int(fields[1]), name.strip()))
+
+    imports.sort(reverse=True)
+    print(f"startup imports {sum(us for us, _ in imports) / 1000:8.1f} ms", file=sys.stderr)
+    for micros, name in imports[:10]:
+        print(f"  {name:<28} {micros / 1000:8.1f} ms", file=sys.stderr)
+    print(f"startup total   {total * 1000:8.1f} ms (including interpreter)", file=sys.stderr)
+    return completed.returncode
 
 
 def main() -> None:
-    args = parse_args()
+    argv = sys.argv[1:]
+    profiling = "--profile-startup" in argv
+    if profiling:
+        argv = [arg for arg in argv if arg != "--profile-startup"]
+        if "importtime" not in sys._xoptions:
+            sys.exit(profile_startup(argv))
+    _phase("module body")
+    import signal
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, _forward_signal)
+    try:
+        run(argv)
+    except KeyboardInterrupt:
+        print("interrupted", file=sys.stderr)
+        sys.exit(128 + signal.SIGINT)
+    finally:
+        if profiling:
+            for label, seconds in _PHASES:
+                print(f"startup phase   {label:<12} {seconds * 1000:6.1f} ms", file=sys.stderr)
+
+
+def run(argv: List[str]) -> None:
+    # `list` is the hot path for Make and CI; skip argparse entirely.
+    if not argv or argv == ["list"]:
+        print("Available packages:")
+        for slug in list_packages():
+            print(f"- {slug}")
+        _phase("command")
+        return
+
+    args = parse_args(argv)
+    _phase("parse args")
 
-    if not args.command:
+    if args.command in (None, "list"):
         print("Available packages:")
         for slug in list_packages():
             print(f"- {slug}")
         return
 
-    if args.command == "retag" and getattr(args, "package") == "all":
-        packages = list(list_packages())
+    if args.command == "check":
+        slugs = list(list_packages()) if args.package == ["all"] else args.package
+        sys.exit(check_packages(slugs))
+
+    if args.command == "check-upstream":
+        slugs = list(list_packages()) if args.package == ["all"] else args.package
+        http = HttpCache.from_env()
+        if args.cache_ttl is not None:
+            http.ttl = args.cache_ttl
+        if args.offline:
+            http.offline = http.enabled = True
+        elif args.no_cache:
+            http.enabled = False
+        if len(slugs) == 1:
+            metadata, package_dir = load_metadata(slugs[0])
+            sys.exit(check_upstream(metadata, package_dir, http))
+        sys.exit(check_upstream_many(slugs, args.jobs, http))
+
+    if args.command == "publish":
+        slugs = list(list_packages()) if args.package == ["all"] else args.package
+        publish_packages(slugs, args.jobs, args.namespace)
+        _phase("command")
+        return
+
+    if args.command == "cache-prune":
+        max_size = args.max_size or os.environ.get("PACKAGE_BUILD_CACHE_MAX") or DEFAULT_BUILD_CACHE_MAX
+        prune_build_cache(Path(args.dir) if args.dir else BUILDKIT_CACHE_DIR, parse_memory(max_size), args.dry_run)
+        _phase("command")
+        return
+
+    if args.command == "build" and args.package == "all":
+        build_all(args)
+        return
+
+    if args.command == "retag":
+        slugs = list(list_packages()) if args.package == ["all"] else args.package
+        retag_packages(slugs, args)
+        _phase("command")
+        return
+
+    package = args.package
+    metadata, package_dir = load_metadata(package)
+    if args.command == "build":
+        docker_build(package_dir, metadata, args)
+    elif args.command == "test":
+        run_tests(package_dir, metadata, args)
+    elif args.command == "bench":
+        run_benchmarks(package_dir, metadata, args)
+    elif args.command == "build-report":
+        sys.exit(build_report(package, args))
+    elif args.command == "lock":
+        lock_package(package_dir, metadata)
+    elif args.command == "analyze-classpath":
+        analyze_classpath(package_dir, metadata, args)
+    elif args.command == "show":
+        show_info(metadata)
+    elif args.command == "detect-version":
+        detect_version(metadata)
     else:
-        packages = [getattr(args, "package")]
-
-    for package in packages:
-        metadata, package_dir = load_metadata(package)
-        if args.command == "build":
-            docker_build(package_dir, metadata, args)
-        elif args.command == "test":
-            run_tests(package_dir, metadata, args)
-        elif args.command == "publish":
-            docker_push(metadata)
-        elif args.command == "retag":
-            source_image = resolve_source_image(
-                metadata, args.source_image, args.source_namespace
-            )
-            docker_retag(metadata, source_image, args.dry_run, args.skip_missing)
-        elif args.command == "show":
-            show_info(metadata)
-        elif args.command == "check-upstream":
-            sys.exit(check_upstream(metadata, package_dir))
-        elif args.command == "detect-version":
-            detect_version(metadata)
-        else:
-            raise SystemExit(f"unknown command: {args.command}")
+        raise SystemExit(f"unknown command: {args.command}")
+    _phase("command")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+"""prune_build_cache: stale blobs first (oldest first), then whole caches by last export."""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import package  # noqa: E402
+
+JSON = "application/vnd.oci.image.manifest.v1+json"
+LAYER = "application/vnd.oci.image.layer.v1.tar+gzip"
+
+
+def _blob(cache: Path, data: bytes, when: float) -> str:
+    digest = "sha256:" + hashlib.sha256(data).hexdigest()
+    path = cache / "blobs" / "sha256" / digest.split(":", 1)[1]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    os.utime(path, (when, when))
+    return digest
+
+
+def _cache(root: Path, name: str, exported: float, layers: int = 1, stale=()) -> Path:
+    """An OCI layout whose index -> manifest -> layers chain is live; ``stale`` are (size, time) orphans."""
+    cache = root / name
+    live = [
+        {"mediaType": LAYER, "digest": _blob(cache, f"{name}-layer-{i}".encode() * 100, exported), "size": 0}
+        for i in range(layers)
+    ]
+    manifest = _blob(cache, json.dumps({"layers": live}).encode(), exported)
+    for index, (size, when) in enumerate(stale):
+        _blob(cache, bytes([index]) * size, when)
+    index_path = cache / "index.json"
+    index_path.write_text(json.dumps({"manifests": [{"mediaType": JSON, "digest": manifest}]}))
+    os.utime(index_path, (exported, exported))
+    return cache
+
+
+def _size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _blobs(cache: Path) -> set:
+    return {p.name for p in (cache / "blobs" / "sha256").iterdir()}
+
+
+def _prune(root: Path, max_bytes: int, dry_run: bool = False) -> str:
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        package.prune_build_cache(root, max_bytes, dry_run)
+    return out.getvalue()
+
+
+class PruneBuildCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+
+    def test_live_blobs_follow_the_index(self):
+        cache = _cache(self.root, "spark", 1000, layers=2, stale=[(10, 1000)])
+        live = {digest.split(":", 1)[1] for digest in package._oci_live_blobs(cache)}
+        self.assertEqual(len(live), 3)
+        self.assertEqual(len(_blobs(cache) - live), 1)
+
+    def test_stale_blobs_go_least_recently_used_first(self):
+        cache = _cache(self.root, "spark", 5000, stale=[(1000, 300), (1000, 100), (1000, 200)])
+        before = _blobs(cache)
+        oldest, middle = (hashlib.sha256(bytes([i]) * 1000).hexdigest() for i in (1, 2))
+        _prune(self.root, _size(self.root) - 1500)
+        self.assertEqual(before - _blobs(cache), {oldest, middle})
+        self.assertTrue((cache / "index.json").exists())
+
+    def test_evicts_whole_caches_oldest_export_first(self):
+        old = _cache(self.root, "airflow", 100)
+        new = _cache(self.root, "spark", 300)
+        middle = _cache(self.root, "gx-core", 200)
+        output = _prune(self.root, _size(new) + _size(middle))
+        self.assertFalse(old.exists())
+        self.assertTrue(new.exists() and middle.exists())
+        self.assertIn("evict airflow", output)
+
+    def test_stale_blobs_are_removed_before_evicting(self):
+        old = _cache(self.root, "airflow", 100)
+        new = _cache(self.root, "spark", 300, stale=[(4000, 50)])
+        _prune(self.root, _size(self.root) - 4000)
+        self.assertTrue(old.exists())
+        self.assertEqual(len(_blobs(new)), 2)
+
+    def test_dry_run_removes_nothing(self):
+        _cache(self.root, "airflow", 100, stale=[(1000, 10)])
+        _cache(self.root, "spark", 300)
+        before = _size(self.root)
+        output = _prune(self.root, 0, dry_run=True)
+        self.assertEqual(_size(self.root), before)
+        self.assertIn("would free", output)
+
+    def test_under_the_limit_is_untouched(self):
+        cache = _cache(self.root, "spark", 100, stale=[(1000, 10)])
+        _prune(self.root, _size(self.root))
+        self.assertEqual(len(_blobs(cache)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
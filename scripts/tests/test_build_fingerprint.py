@@ -0,0 +1,129 @@
+"""build_fingerprint / explain_cache: what invalidates a cached build and how it is reported."""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import package  # noqa: E402
+
+DOCKERFILE = """\
+ARG BASE_IMAGE=python:3.12-slim
+ARG TOOLS=busybox:1.36
+FROM ${TOOLS} AS tools
+FROM $BASE_IMAGE
+FROM tools
+FROM --platform=linux/amd64 scratch
+COPY app.py /app.py
+"""
+
+
+def _registry(digests):
+    return mock.patch.object(package, "_registry_digest", lambda ref: digests.get(ref))
+
+
+class ResolveBaseImagesTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dockerfile = Path(tmp.name) / "Dockerfile"
+        self.dockerfile.write_text(DOCKERFILE)
+
+    def test_resolves_each_external_ref_from_the_registry(self):
+        digests = {"python:3.12-slim": "sha256:aaa", "busybox:1.36": "sha256:bbb"}
+        with _registry(digests):
+            refs = package.resolve_base_images(self.dockerfile, {})
+        self.assertEqual(refs, ["busybox:1.36@sha256:bbb", "python:3.12-slim@sha256:aaa"])
+
+    def test_build_args_override_defaults_and_pins_are_kept(self):
+        pinned = "python:3.12-slim@sha256:" + "0" * 64
+        with _registry({"busybox:1.36": "sha256:bbb"}):
+            refs = package.resolve_base_images(self.dockerfile, {"BASE_IMAGE": pinned})
+        self.assertEqual(refs, ["busybox:1.36@sha256:bbb", pinned])
+
+    def test_unreachable_registry_is_marked_unresolved(self):
+        def offline(ref):
+            raise FileNotFoundError("docker")
+
+        with mock.patch.object(package, "_registry_digest", offline):
+            refs = package.resolve_base_images(self.dockerfile, {})
+        self.assertEqual(refs, ["busybox:1.36@unresolved", "python:3.12-slim@unresolved"])
+
+
+class ExplainCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.package_dir = Path(tmp.name)
+        (self.package_dir / "Dockerfile").write_text("ARG BASE_IMAGE\nFROM ${BASE_IMAGE}\nCOPY . /src\n")
+        (self.package_dir / ".dockerignore").write_text("local/\n")
+        (self.package_dir / "app.py").write_text("print('hi')\n")
+        (self.package_dir / "local").mkdir()
+        (self.package_dir / "local" / "scratch.txt").write_text("ignored\n")
+        self.metadata = {"slug": "demo", "version": {"current": "1.0"}, "build": {"args": {"BASE_IMAGE": "python:3.12"}}}
+        self.args = argparse.Namespace(platform=None)
+        self.digests = {"python:3.12": "sha256:aaa"}
+        patcher = _registry(self.digests)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fingerprint(self, previous=None):
+        return package.build_fingerprint(self.package_dir, self.metadata, self.args, previous)
+
+    def test_no_entry_and_unchanged_inputs(self):
+        first = self.fingerprint()
+        self.assertEqual(package.explain_cache(None, first), ["no previous build recorded"])
+        self.assertEqual(sorted(first["files"]), [".dockerignore", "Dockerfile", "app.py"])
+        second = self.fingerprint(first)
+        self.assertEqual(second["fingerprint"], first["fingerprint"])
+        self.assertEqual(package.explain_cache(first, second), [])
+
+    def test_names_changed_context_files(self):
+        first = self.fingerprint()
+        (self.package_dir / "app.py").write_text("print('bye')\n")
+        (self.package_dir / "extra.py").write_text("")
+        (self.package_dir / "local" / "scratch.txt").write_text("still ignored\n")
+        self.assertEqual(
+            package.explain_cache(first, self.fingerprint(first)), ["context changed: app.py, extra.py"]
+        )
+
+    def test_executable_bit_counts_as_a_change(self):
+        first = self.fingerprint()
+        (self.package_dir / "app.py").chmod(0o755)
+        self.assertEqual(package.explain_cache(first, self.fingerprint(first)), ["context changed: app.py"])
+
+    def test_truncates_long_file_lists(self):
+        first = self.fingerprint()
+        for index in range(12):
+            (self.package_dir / f"new{index:02d}.py").write_text("")
+        reasons = package.explain_cache(first, self.fingerprint(first))
+        self.assertEqual(len(reasons), 1)
+        self.assertTrue(reasons[0].endswith("new09.py (+2 more)"), reasons[0])
+
+    def test_build_args_platform_and_base_digest(self):
+        first = self.fingerprint()
+        self.metadata["build"]["args"]["EXTRA"] = "1"
+        self.args.platform = "linux/arm64"
+        self.digests["python:3.12"] = "sha256:bbb"
+        self.assertEqual(
+            package.explain_cache(first, self.fingerprint(first)),
+            ["build_args changed", "base_images changed", "platform changed"],
+        )
+
+    def test_unresolved_base_is_always_a_miss(self):
+        self.digests.clear()
+        first = self.fingerprint()
+        second = self.fingerprint(first)
+        self.assertEqual(second["fingerprint"], first["fingerprint"])
+        self.assertEqual(
+            package.explain_cache(first, second), ["base image python:3.12 could not be resolved in its registry"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""build_graph: dependency closure and cycle detection for ``build all``."""
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import package  # noqa: E402
+
+
+def _fake_packages(deps):
+    def load_metadata(slug):
+        return {"slug": slug, "build": {"depends_on": deps[slug]}}, Path("/nonexistent") / slug
+
+    return mock.patch.object(package, "load_metadata", load_metadata)
+
+
+class BuildGraphTest(unittest.TestCase):
+    def test_returns_dependencies(self):
+        deps = {"base": [], "spark": "base", "airflow": ["base", "spark"]}
+        with _fake_packages(deps):
+            graph = package.build_graph(deps)
+        self.assertEqual(graph, {"base": [], "spark": ["base"], "airflow": ["base", "spark"]})
+
+    def test_rejects_unknown_dependency(self):
+        with _fake_packages({"spark": ["missing"]}):
+            with self.assertRaisesRegex(SystemExit, "unknown package 'missing'"):
+                package.build_graph(["spark"])
+
+    def test_reports_cycle_path(self):
+        deps = {"a": ["b"], "b": ["c"], "c": ["a"], "d": []}
+        with _fake_packages(deps):
+            with self.assertRaisesRegex(SystemExit, "cycle detected: a -> b -> c -> a"):
+                package.build_graph(deps)
+
+    def test_rejects_self_dependency(self):
+        with _fake_packages({"a": ["a"]}):
+            with self.assertRaisesRegex(SystemExit, "cycle detected: a -> a"):
+                package.build_graph(["a"])
+
+    def test_diamond_is_not_a_cycle(self):
+        deps = {"top": ["left", "right"], "left": ["base"], "right": ["base"], "base": []}
+        with _fake_packages(deps):
+            self.assertEqual(package.build_graph(deps)["top"], ["left", "right"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""check: a committed build.lock file must match the build args; a missing one only warns."""
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import package  # noqa: E402
+
+
+class BuildLockCheckTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        containers = Path(tmp.name)
+        patcher = mock.patch.object(package, "CONTAINERS_DIR", containers)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.package_dir = containers / "demo"
+        self.package_dir.mkdir()
+        (self.package_dir / "Dockerfile").write_text("FROM scratch\n")
+        self.metadata = {
+            "slug": "demo",
+            "build": {
+                "args": {"LIB_VERSION": "1.2.0"},
+                "lock": {"file": "deps.lock.json", "command": "true"},
+            },
+            "publish": {"tags": []},
+            "version": {"strategy": "manual"},
+        }
+
+    def _errors(self):
+        with mock.patch.object(package, "validate_schema"):
+            return package.validate_metadata("demo", self.metadata, ["demo"])
+
+    def test_missing_lockfile_warns(self):
+        self.assertEqual(self._errors(), [])
+        warnings = package.metadata_warnings("demo", self.metadata)
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("demo.build.lock: deps.lock.json not found", warnings[0])
+
+    def test_stale_lockfile_fails(self):
+        (self.package_dir / "deps.lock.json").write_text(json.dumps({"inputs": {"LIB_VERSION": "1.1.0"}}))
+        self.assertEqual(len(self._errors()), 1)
+        self.assertIn("is stale (LIB_VERSION locked '1.1.0', build uses '1.2.0')", self._errors()[0])
+
+    def test_current_lockfile_passes(self):
+        (self.package_dir / "deps.lock.json").write_text(json.dumps({"inputs": {"LIB_VERSION": "1.2.0"}}))
+        self.assertEqual(self._errors(), [])
+        self.assertEqual(package.metadata_warnings("demo", self.metadata), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
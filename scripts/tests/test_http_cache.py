@@ -0,0 +1,178 @@
+"""HttpCache and upstream checks against a local http.server standing in for PyPI and Apache mirrors."""
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import package  # noqa: E402
+
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+class Upstream(BaseHTTPRequestHandler):
+    """Serves ``routes`` and answers conditional requests the way PyPI and Apache mirrors do."""
+
+    routes: dict = {}
+    requests: list = []
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        route = self.routes.get(self.path)
+        type(self).requests.append((self.path, self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")))
+        if route is None:
+            self.send_error(404)
+            return
+        etag = route.get("etag")
+        if (etag and self.headers.get("If-None-Match") == etag) or (
+            not etag and self.headers.get("If-Modified-Since") == LAST_MODIFIED
+        ):
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if etag:
+            self.send_header("ETag", etag)
+        else:
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(route["body"])))
+        self.end_headers()
+        self.wfile.write(route["body"])
+
+    def log_message(self, *args):
+        pass
+
+
+def _listing(*versions):
+    rows = "".join(f'<a href="spark-{v}/">spark-{v}/</a>\n' for v in versions)
+    return f"<html><body><pre>\n{rows}</pre></body></html>".encode()
+
+
+class HttpCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name) / "http"
+        Upstream.requests = []
+        Upstream.routes = {
+            "/pypi/gx-core/json": {"etag": '"v1"', "body": json.dumps({"info": {"version": "1.2.0"}}).encode()},
+            "/dist/spark/": {"body": _listing("3.5.1", "4.0.0-preview2", "4.0.1", "4.0.0")},
+        }
+        patcher = mock.patch.dict("os.environ", {"PYPI_URL": f"{self.base}/pypi"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def cache(self, **kwargs):
+        return package.HttpCache(self.root, **kwargs)
+
+    def check(self, metadata, http):
+        return package.upstream_result(metadata, Path("/nonexistent"), http)
+
+    def pypi(self):
+        return {"slug": "gx-core", "version": {"strategy": "pypi", "current": "1.1.0"}}
+
+    def apache(self):
+        return {
+            "slug": "spark",
+            "version": {
+                "strategy": "http-directory",
+                "current": "4.0.1",
+                "source": {"url": f"{self.base}/dist/spark/", "regex": r"spark-([0-9][^/]*)/"},
+            },
+        }
+
+    def test_etag_revalidation_across_runs(self):
+        first = self.check(self.pypi(), self.cache())
+        self.assertEqual((first["status"], first["latest"]), ("update_available", "1.2.0"))
+        self.assertEqual(first["cache"], {"hit": 0, "miss": 1, "revalidated": 0})
+        second = self.check(self.pypi(), self.cache())
+        self.assertEqual(second["latest"], "1.2.0")
+        self.assertEqual(second["cache"], {"hit": 1, "miss": 0, "revalidated": 1})
+        self.assertEqual(Upstream.requests[-1], ("/pypi/gx-core/json", '"v1"', None))
+
+    def test_last_modified_revalidation_across_runs(self):
+        first = self.check(self.apache(), self.cache())
+        self.assertEqual((first["status"], first["latest"]), ("up_to_date", "4.0.1"))
+        self.assertEqual(first["cache"], {"hit": 0, "miss": 1, "revalidated": 0})
+        second = self.check(self.apache(), self.cache())
+        self.assertEqual(second["latest"], "4.0.1")
+        self.assertEqual(second["cache"], {"hit": 1, "miss": 0, "revalidated": 1})
+        self.assertEqual(Upstream.requests[-1], ("/dist/spark/", None, LAST_MODIFIED))
+
+    def test_changed_resource_replaces_the_cached_body(self):
+        self.check(self.pypi(), self.cache())
+        Upstream.routes["/pypi/gx-core/json"] = {"etag": '"v2"', "body": b'{"info": {"version": "1.3.0"}}'}
+        second = self.check(self.pypi(), self.cache())
+        self.assertEqual((second["latest"], second["cache"]["miss"]), ("1.3.0", 1))
+        third = self.check(self.pypi(), self.cache())
+        self.assertEqual((third["latest"], third["cache"]["revalidated"]), ("1.3.0", 1))
+
+    def test_ttl_skips_the_network_until_it_expires(self):
+        url = f"{self.base}/dist/spark/"
+        cache = self.cache(ttl=3600)
+        body = cache.fetch(url, 5, {})
+        stats: dict = {}
+        self.assertEqual(cache.fetch(url, 5, stats), body)
+        self.assertEqual((stats, len(Upstream.requests)), ({"hit": 1}, 1))
+
+        meta_path, _ = cache._paths(url)
+        meta = json.loads(meta_path.read_text())
+        meta["fetched_at"] -= 7200
+        meta_path.write_text(json.dumps(meta))
+        stats = {}
+        self.assertEqual(cache.fetch(url, 5, stats), body)
+        self.assertEqual((stats, len(Upstream.requests)), ({"revalidated": 1, "hit": 1}, 2))
+
+    def test_offline_fails_cold_and_serves_warm(self):
+        url = f"{self.base}/pypi/gx-core/json"
+        with self.assertRaisesRegex(RuntimeError, "offline mode: no cached response"):
+            self.cache(offline=True).fetch(url, 5, {})
+        cold = self.check(self.pypi(), self.cache(offline=True))
+        self.assertEqual(cold["status"], "error")
+        self.assertEqual(Upstream.requests, [])
+
+        self.cache().fetch(url, 5, {})
+        warm = self.check(self.pypi(), self.cache(offline=True))
+        self.assertEqual((warm["latest"], warm["cache"]["hit"]), ("1.2.0", 1))
+        self.assertEqual(len(Upstream.requests), 1)
+
+    def test_no_cache_always_fetches(self):
+        url = f"{self.base}/pypi/gx-core/json"
+        stats: dict = {}
+        cache = self.cache(enabled=False)
+        cache.fetch(url, 5, stats)
+        cache.fetch(url, 5, stats)
+        self.assertEqual((stats, len(Upstream.requests)), ({"miss": 2}, 2))
+        self.assertFalse(self.root.exists())
+
+    def test_early_exit_discards_the_partial_body(self):
+        url = f"{self.base}/dist/spark/"
+        chunks = self.cache().iter_chunks(url, 5, {}, chunk_size=8)
+        next(chunks)
+        chunks.close()
+        self.assertEqual(list(self.root.iterdir()), [])
+        stats: dict = {}
+        self.cache().fetch(url, 5, stats)
+        self.assertEqual(stats, {"miss": 1})
+        self.assertEqual(sorted(path.suffix for path in self.root.iterdir()), [".body", ".json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""maven_resolve: raw bundle splitting and lockfile loading for the Spark image."""
+from __future__ import annotations
+
+import io
+import json
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "containers" / "spark" / "files"))
+
+import maven_resolve  # noqa: E402
+
+VERSION = "2.0.0"
+PAYLOAD = bytes(range(256)) * 64
+SERVICE = "META-INF/services/software.amazon.awssdk.http.SdkHttpService"
+
+
+class _Unseekable(io.RawIOBase):
+    """A write-only stream without seek, so zipfile writes data descriptors as streaming tools do."""
+
+    def __init__(self) -> None:
+        self.buffer = io.BytesIO()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return self.buffer.write(data)
+
+
+def _bundle(path: Path) -> None:
+    stream = _Unseekable()
+    with zipfile.ZipFile(stream, "w") as zf:
+        zf.writestr(
+            zipfile.ZipInfo("software/amazon/awssdk/transfer/s3/S3TransferManager.class"),
+            PAYLOAD,
+            compress_type=zipfile.ZIP_DEFLATED,
+        )
+        zf.writestr("software/amazon/awssdk/transfer/s3/Stored.class", b"stored", compress_type=zipfile.ZIP_STORED)
+        zf.writestr("software/amazon/awssdk/thirdparty/org/slf4j/Logger.class", b"logger")
+        zf.writestr("software/amazon/awssdk/services/s3/S3Client.class", PAYLOAD)
+        zf.writestr(SERVICE, b"software.amazon.awssdk.transfer.X\norg.slf4j.Y\n", compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr("META-INF/services/other", b"unrelated")
+    path.write_bytes(stream.buffer.getvalue())
+
+
+class SplitBundleTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.bundle = self.tmp / "bundle.jar"
+        _bundle(self.bundle)
+        with zipfile.ZipFile(self.bundle) as zf:
+            # The fixture must exercise the data-descriptor path that _copy_raw rewrites.
+            self.assertTrue(all(info.flag_bits & 0x08 for info in zf.infolist()))
+
+    def split(self, modules):
+        stats = maven_resolve.split_bundle(self.bundle, modules, VERSION, self.tmp)
+        return stats, {module: self.tmp / f"{module}-{VERSION}.jar" for module in modules}
+
+    def test_split_jars_are_valid_and_keep_their_entries(self):
+        stats, jars = self.split(["s3-transfer-manager", "thirdparty-slf4j-api"])
+        self.assertEqual(stats["entries"], 5)
+        with zipfile.ZipFile(self.bundle) as src, zipfile.ZipFile(jars["s3-transfer-manager"]) as dst:
+            self.assertIsNone(dst.testzip())
+            self.assertEqual(
+                sorted(dst.namelist()),
+                [
+                    SERVICE,
+                    "software/amazon/awssdk/transfer/s3/S3TransferManager.class",
+                    "software/amazon/awssdk/transfer/s3/Stored.class",
+                ],
+            )
+            name = "software/amazon/awssdk/transfer/s3/S3TransferManager.class"
+            copied, original = dst.getinfo(name), src.getinfo(name)
+            self.assertEqual(
+                (copied.compress_type, copied.compress_size, copied.CRC),
+                (original.compress_type, original.compress_size, original.CRC),
+            )
+            self.assertEqual(dst.read(name), PAYLOAD)
+            # No data descriptor follows the copied bytes, so the local header must carry the sizes
+            # for stream readers such as java.util.jar.JarInputStream.
+            with open(jars["s3-transfer-manager"], "rb") as raw:
+                raw.seek(copied.header_offset)
+                header = raw.read(30)
+            self.assertEqual(int.from_bytes(header[6:8], "little") & 0x08, 0)
+            self.assertEqual(
+                [int.from_bytes(header[i : i + 4], "little") for i in (14, 18, 22)],
+                [original.CRC, original.compress_size, original.file_size],
+            )
+            self.assertEqual(dst.read("software/amazon/awssdk/transfer/s3/Stored.class"), b"stored")
+            self.assertEqual(dst.read(SERVICE), src.read(SERVICE))
+        with zipfile.ZipFile(jars["thirdparty-slf4j-api"]) as dst:
+            self.assertIsNone(dst.testzip())
+            self.assertEqual(
+                sorted(dst.namelist()), [SERVICE, "software/amazon/awssdk/thirdparty/org/slf4j/Logger.class"]
+            )
+
+    def test_small_chunks_copy_the_same_bytes(self):
+        chunk_size = maven_resolve.CHUNK_SIZE
+        maven_resolve.CHUNK_SIZE = 7
+        self.addCleanup(setattr, maven_resolve, "CHUNK_SIZE", chunk_size)
+        _, jars = self.split(["s3-transfer-manager"])
+        with zipfile.ZipFile(jars["s3-transfer-manager"]) as dst:
+            self.assertIsNone(dst.testzip())
+            self.assertEqual(dst.read("software/amazon/awssdk/transfer/s3/S3TransferManager.class"), PAYLOAD)
+
+    def test_unmatched_services_are_left_out(self):
+        _, jars = self.split(["thirdparty-jackson-core"])
+        with zipfile.ZipFile(jars["thirdparty-jackson-core"]) as dst:
+            self.assertIsNone(dst.testzip())
+            self.assertEqual(dst.namelist(), [])
+
+
+class LoadLockTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "jars.lock.json"
+        self.path.write_text(json.dumps({"inputs": {"SPARK_VERSION": "4.0.1"}, "jars": []}))
+
+    def test_matching_inputs_load(self):
+        self.assertEqual(maven_resolve.load_lock(self.path, {"SPARK_VERSION": "4.0.1"})["jars"], [])
+
+    def test_stale_inputs_are_refused(self):
+        with self.assertRaisesRegex(SystemExit, "SPARK_VERSION locked '4.0.1' but building '4.0.2'"):
+            maven_resolve.load_lock(self.path, {"SPARK_VERSION": "4.0.2"})
+
+
+if __name__ == "__main__":
+    unittest.main()
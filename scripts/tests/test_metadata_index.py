@@ -0,0 +1,45 @@
+"""MetadataIndex: cold and warm reads of a container.yaml must agree."""
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import package  # noqa: E402
+
+YAML = """\
+slug: demo
+released: 2024-05-01
+ports:
+  8080: http
+  true: enabled
+"""
+
+
+class MetadataIndexTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        patcher = mock.patch.object(package, "ROOT", self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.metadata_path = self.root / "containers" / "demo" / "container.yaml"
+        self.metadata_path.parent.mkdir(parents=True)
+        self.metadata_path.write_text(YAML)
+        self.index_path = self.root / ".cache" / "metadata-index.json"
+
+    def test_cold_read_matches_warm_read(self):
+        cold = package.MetadataIndex(self.index_path).get(self.metadata_path)
+        warm = package.MetadataIndex(self.index_path).get(self.metadata_path)
+        self.assertEqual(cold, warm)
+        self.assertEqual(cold["released"], "2024-05-01")
+        self.assertEqual(cold["ports"], {"8080": "http", "true": "enabled"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""docker_push against a throwaway local registry:2: content pushed once, tags attached by digest.
+
+Skipped when no Docker daemon is reachable.
+"""
+from __future__ import annotations
+
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import package  # noqa: E402
+
+
+def _docker_available() -> bool:
+    if not shutil.which("docker"):
+        return False
+    return subprocess.run(["docker", "info"], capture_output=True).returncode == 0
+
+
+def _docker(*args: str) -> str:
+    return subprocess.run(["docker", *args], capture_output=True, text=True, check=True).stdout.strip()
+
+
+@unittest.skipUnless(_docker_available(), "docker daemon not available")
+class PublishRegistryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.registry = _docker("run", "-d", "--rm", "-p", "127.0.0.1::5000", "registry:2")
+        port = _docker("port", cls.registry, "5000/tcp").splitlines()[0].rsplit(":", 1)[1]
+        cls.namespace = f"localhost:{port}/dpc-test"
+
+        cls.metadata = {
+            "slug": "publish-fixture",
+            "version": {"current": "1.2.3"},
+            "publish": {"image": "dpc-test/publish-fixture", "tags": ["latest", "!version.current"]},
+        }
+        with tempfile.TemporaryDirectory() as context:
+            (Path(context) / "payload").write_bytes(uuid.uuid4().bytes * 4096)
+            (Path(context) / "Dockerfile").write_text("FROM scratch\nCOPY payload /payload\n")
+            _docker("build", "-q", "-t", package.compute_tags(cls.metadata)[0], context)
+
+    @classmethod
+    def tearDownClass(cls):
+        subprocess.run(["docker", "rm", "-f", cls.registry], capture_output=True)
+        images = _docker("image", "ls", "--format", "{{.Repository}}:{{.Tag}}").splitlines()
+        fixtures = [ref for ref in images if "dpc-test/publish-fixture" in ref]
+        if fixtures:
+            subprocess.run(["docker", "rmi", "-f", *fixtures], capture_output=True)
+
+    def publish(self):
+        mux = package.LogMux([self.metadata["slug"]])
+        return package.docker_push(self.metadata, mux, namespace=self.namespace)
+
+    def test_publish_twice(self):
+        first = self.publish()
+        tags = [f"{self.namespace}/publish-fixture:{tag}" for tag in package.compute_resolved_tags(self.metadata)]
+        self.assertEqual([row["tag"] for row in first], tags)
+        self.assertEqual(first[0]["status"], "pushed")
+        self.assertTrue(first[0]["bytes"], "the first publish uploads the layer")
+        self.assertEqual({row["status"] for row in first[1:]}, {"tagged"})
+
+        digests = {tag: package._registry_digest(tag) for tag in tags}
+        self.assertEqual(len(set(digests.values())), 1, digests)
+        self.assertIsNotNone(digests[tags[0]])
+
+        second = self.publish()
+        self.assertEqual([row["tag"] for row in second], tags)
+        self.assertEqual({row["status"] for row in second}, {"present"})
+        self.assertEqual(sum(row["bytes"] for row in second), 0)
+        self.assertEqual({package._registry_digest(tag) for tag in tags}, set(digests.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""_registry_digest: only a registry not-found means "no digest"; other failures raise."""
+from __future__ import annotations
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import package  # noqa: E402
+
+
+def _inspect(returncode, stdout="", stderr=""):
+    completed = subprocess.CompletedProcess([], returncode, stdout=stdout, stderr=stderr)
+    return mock.patch("subprocess.run", return_value=completed)
+
+
+class RegistryDigestTest(unittest.TestCase):
+    def test_returns_the_manifest_digest(self):
+        with _inspect(0, stdout='{"digest": "sha256:aaa"}'):
+            self.assertEqual(package._registry_digest("ghcr.io/o/spark:1"), "sha256:aaa")
+
+    def test_not_found_is_none(self):
+        for stderr in ("ERROR: ghcr.io/o/spark:1: not found", "manifest unknown: manifest unknown"):
+            with self.subTest(stderr=stderr), _inspect(1, stderr=stderr):
+                self.assertIsNone(package._registry_digest("ghcr.io/o/spark:1"))
+
+    def test_other_failures_raise(self):
+        for stderr in (
+            "ERROR: failed to authorize: 401 Unauthorized",
+            "ERROR: toomanyrequests: rate limit exceeded",
+            "ERROR: dial tcp: lookup ghcr.io: no such host",
+            "",
+        ):
+            with self.subTest(stderr=stderr), _inspect(1, stderr=stderr):
+                with self.assertRaises(OSError):
+                    package._registry_digest("ghcr.io/o/spark:1")
+
+
+class RetagTest(unittest.TestCase):
+    metadata = {
+        "slug": "spark",
+        "version": {"current": "4.0.1"},
+        "publish": {"image": "ghcr.io/new/spark", "tags": ["latest", "!version.current"]},
+    }
+
+    def test_registry_errors_are_not_skipped_as_missing(self):
+        def digest(ref):
+            if ref.endswith(":latest"):
+                raise OSError("imagetools inspect failed: 429 Too Many Requests")
+            return "sha256:aaa"
+
+        mux = package.LogMux(["spark"])
+        with mock.patch.object(package, "_registry_digest", digest), mock.patch.object(mux, "run") as run:
+            with self.assertRaisesRegex(OSError, "Too Many Requests"):
+                package.docker_retag(self.metadata, "ghcr.io/old/spark", False, True, mux)
+        run.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,260 @@
+"""test_plan validation, the run_test_suite scheduler and opt-in benchmarks."""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import package  # noqa: E402
+
+
+def _run(tests, jobs=None):
+    """Run ``tests`` in a scratch package dir; returns results by name and the start/end event log."""
+    metadata = {"slug": "demo", "tests": tests}
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        mux = package.LogMux(test["name"] for test in tests)
+        results = package.run_test_suite(Path(tmp), metadata, mux, jobs=jobs)
+        log = Path(tmp) / "events.log"
+        events = log.read_text().split() if log.exists() else []
+    return {result["name"]: result for result in results}, events
+
+
+def _sleeper(name, seconds, **extra):
+    """A test that logs ``+name`` and ``-name`` around a sleep, so overlap is read from event order."""
+    command = f"echo +{name} >> events.log; sleep {seconds}; echo -{name} >> events.log"
+    return {"name": name, "command": command, **extra}
+
+
+def _max_concurrency(events):
+    running = peak = 0
+    for event in events:
+        running += 1 if event.startswith("+") else -1
+        peak = max(peak, running)
+    return peak
+
+
+class TestPlanTest(unittest.TestCase):
+    def test_normalizes_entries(self):
+        with mock.patch.dict("os.environ", {"PACKAGE_TEST_TIMEOUT": "42"}):
+            tests = [
+                {"name": "a", "command": "true"},
+                {"name": "b", "command": "true", "depends_on": "a", "parallel": True, "timeout": 5},
+            ]
+            plan = package.test_plan({"tests": tests})
+        self.assertEqual(
+            plan,
+            [
+                {"name": "a", "command": "true", "depends_on": [], "parallel": False, "timeout": 42.0},
+                {"name": "b", "command": "true", "depends_on": ["a"], "parallel": True, "timeout": 5.0},
+            ],
+        )
+
+    def test_rejects_duplicate_names(self):
+        tests = [{"name": "smoke", "command": "true"}, {"name": "smoke", "command": "false"}]
+        with self.assertRaisesRegex(SystemExit, "duplicate test name 'smoke'"):
+            package.test_plan({"tests": tests})
+
+    def test_rejects_unknown_dependency(self):
+        with self.assertRaisesRegex(SystemExit, "test 'a' depends on unknown test 'b'"):
+            package.test_plan({"tests": [{"name": "a", "command": "true", "depends_on": ["b"]}]})
+
+    def test_rejects_cycles(self):
+        tests = [
+            {"name": "a", "command": "true", "depends_on": ["c"]},
+            {"name": "b", "command": "true", "depends_on": ["a"]},
+            {"name": "c", "command": "true", "depends_on": ["b"]},
+        ]
+        with self.assertRaisesRegex(SystemExit, "test dependency cycle: a -> c -> b -> a"):
+            package.test_plan({"tests": tests})
+
+    def test_check_reports_plan_errors(self):
+        metadata = {
+            "slug": "spark",
+            "build": {},
+            "publish": {"tags": []},
+            "version": {"strategy": "manual"},
+            "tests": [{"name": "x", "command": "true"}, {"name": "x", "command": "true"}],
+            "benchmarks": [{"name": "y", "command": "true"}, {"name": "y", "command": "true"}],
+        }
+        with mock.patch.object(package, "validate_schema"):
+            errors = package.validate_metadata("spark", metadata, ["spark"])
+        self.assertIn("spark.tests: duplicate test name 'x'", errors)
+        self.assertIn("spark.benchmarks: duplicate test name 'y'", errors)
+
+
+class RunTestSuiteTest(unittest.TestCase):
+    def test_serial_tests_keep_their_place(self):
+        results, events = _run(
+            [
+                _sleeper("first", 0.1),
+                _sleeper("left", 0.4, parallel=True),
+                _sleeper("right", 0.4, parallel=True),
+                _sleeper("last", 0.1),
+            ]
+        )
+        self.assertEqual([r["status"] for r in results.values()], ["passed"] * 4)
+        self.assertEqual(events[:2], ["+first", "-first"])
+        self.assertEqual(sorted(events[2:4]), ["+left", "+right"])
+        self.assertEqual(sorted(events[4:6]), ["-left", "-right"])
+        self.assertEqual(events[6:], ["+last", "-last"])
+
+    def test_waiting_serial_test_is_not_overtaken(self):
+        # Serial "a" waits on serial "b", declared later; "c" must not start while "a" waits.
+        results, events = _run(
+            [
+                {**_sleeper("a", 0.1), "depends_on": ["b"]},
+                _sleeper("c", 0.1),
+                _sleeper("b", 0.1),
+            ]
+        )
+        self.assertEqual([r["status"] for r in results.values()], ["passed"] * 3)
+        self.assertEqual(events, ["+b", "-b", "+a", "-a", "+c", "-c"])
+
+    def test_worker_crash_is_recorded_as_failed(self):
+        outcome = {}
+
+        def target():
+            crash = UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+            with mock.patch.object(package.LogMux, "run", side_effect=crash):
+                outcome["results"], _ = _run([{"name": "crash", "command": "true"}, _sleeper("after", 0.1)])
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive(), "the scheduler hung after a worker crashed")
+        crash = outcome["results"]["crash"]
+        self.assertEqual((crash["status"], crash["ok"]), ("failed", False))
+        self.assertIn("UnicodeDecodeError", crash["output"])
+        self.assertEqual(outcome["results"]["after"]["status"], "failed")
+
+    def test_jobs_caps_parallel_tests(self):
+        tests = [_sleeper(f"p{i}", 0.3, parallel=True) for i in range(4)]
+        _, events = _run(tests, jobs=1)
+        self.assertEqual(events, ["+p0", "-p0", "+p1", "-p1", "+p2", "-p2", "+p3", "-p3"])
+        with mock.patch.dict("os.environ", {"PACKAGE_TEST_JOBS": "2"}):
+            _, events = _run(tests)
+        self.assertEqual(_max_concurrency(events), 2, events)
+        with mock.patch.dict("os.environ", {"PACKAGE_TEST_JOBS": ""}):
+            _, events = _run(tests)
+        self.assertEqual(_max_concurrency(events), 4, events)
+
+    def test_failed_dependency_skips_dependents_only(self):
+        results, _ = _run(
+            [
+                {"name": "broken", "command": "exit 3", "parallel": True},
+                {"name": "needs-broken", "command": "true", "depends_on": ["broken"], "parallel": True},
+                {"name": "transitive", "command": "true", "depends_on": ["needs-broken"]},
+                {"name": "independent", "command": "echo hello", "parallel": True},
+                {"name": "empty"},
+            ]
+        )
+        self.assertEqual((results["broken"]["status"], results["broken"]["exit_code"]), ("failed", 3))
+        for name in ("needs-broken", "transitive"):
+            self.assertEqual(
+                (results[name]["status"], results[name]["ok"], results[name]["reason"]),
+                ("skipped", False, "dependency failed"),
+            )
+        self.assertEqual((results["independent"]["status"], results["independent"]["output"]), ("passed", "hello\n"))
+        self.assertEqual((results["empty"]["status"], results["empty"]["ok"]), ("skipped", True))
+
+    def test_timeout_kills_the_test(self):
+        results, _ = _run(
+            [
+                {"name": "hangs", "command": "sleep 30", "timeout": 0.5},
+                {"name": "after", "command": "true", "depends_on": ["hangs"]},
+            ]
+        )
+        hangs = results["hangs"]
+        self.assertEqual(
+            (hangs["status"], hangs["exit_code"], hangs["ok"]), ("timeout", package.TIMEOUT_EXIT_CODE, False)
+        )
+        self.assertLess(hangs["seconds"], 10)
+        self.assertEqual(results["after"]["status"], "skipped")
+
+
+# Runs `package.py test demo` against a scratch containers/ tree given as argv[1].
+_DRIVER = """
+import sys
+from pathlib import Path
+
+sys.path.insert(0, {scripts!r})
+import package
+
+root = Path(sys.argv[1])
+package.ROOT = root
+package.CONTAINERS_DIR = root / "containers"
+package._INDEX = package.MetadataIndex(root / "index.json")
+sys.argv = ["package.py", "test", "demo", "--report-dir", str(root / "reports")]
+package.main()
+"""
+
+
+class InterruptTest(unittest.TestCase):
+    def test_ctrl_c_reaches_tests_in_their_own_session(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "containers" / "demo").mkdir(parents=True)
+            command = "trap 'echo cleaned > ../../cleaned' EXIT; touch ../../started; sleep 30"
+            tests = [{"name": name, "command": command, "parallel": True, "timeout": 60} for name in ("a", "b")]
+            (root / "containers" / "demo" / "container.yaml").write_text(json.dumps({"slug": "demo", "tests": tests}))
+            driver = _DRIVER.format(scripts=str(Path(package.__file__).parent))
+            proc = subprocess.Popen(
+                [sys.executable, "-c", driver, tmp], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            deadline = time.monotonic() + 10
+            while not (root / "started").exists() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            proc.send_signal(signal.SIGINT)
+            self.assertEqual(proc.wait(10), 128 + signal.SIGINT)
+            self.assertEqual((root / "cleaned").read_text(), "cleaned\n")
+
+
+class RunBenchmarksTest(unittest.TestCase):
+    def bench(self, benchmarks, names=()):
+        """Run ``benchmarks`` in a scratch package dir; returns the report and the event log."""
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+            with mock.patch.dict("os.environ", {"RUN_COMPOSE_BENCH": "", "PACKAGE_TEST_JOBS": "4"}):
+                args = argparse.Namespace(names=list(names), report_dir=tmp)
+                package.run_benchmarks(Path(tmp), {"slug": "demo", "benchmarks": benchmarks}, args)
+                # Only the benchmark processes see the opt-in; later commands in this process do not.
+                self.assertEqual(os.environ["RUN_COMPOSE_BENCH"], "")
+            report = json.loads((Path(tmp) / "demo-bench.json").read_text())
+            events = (Path(tmp) / "events.log").read_text().split()
+        return report, events
+
+    def test_runs_one_at_a_time_with_the_opt_in_set(self):
+        benchmarks = [_sleeper(f"b{i}", 0.2, parallel=True) for i in range(3)]
+        benchmarks.append({"name": "gate", "command": 'test "$RUN_COMPOSE_BENCH" = 1'})
+        report, events = self.bench(benchmarks)
+        self.assertEqual(events, ["+b0", "-b0", "+b1", "-b1", "+b2", "-b2"])
+        self.assertEqual([test["status"] for test in report["tests"]], ["passed"] * 4)
+
+    def test_selects_by_name(self):
+        _, events = self.bench([_sleeper("a", 0), _sleeper("b", 0), _sleeper("c", 0)], names=["c", "a"])
+        self.assertEqual(events, ["+a", "-a", "+c", "-c"])
+
+    def test_rejects_unknown_names(self):
+        args = argparse.Namespace(names=["nope"], report_dir=None)
+        with self.assertRaisesRegex(SystemExit, r"unknown benchmark\(s\) for demo: nope \(choose from a\)"):
+            package.run_benchmarks(Path("."), {"slug": "demo", "benchmarks": [_sleeper("a", 0)]}, args)
+
+    def test_tests_do_not_run_benchmarks(self):
+        metadata = {"slug": "demo", "tests": [_sleeper("t", 0)], "benchmarks": [_sleeper("b", 0)]}
+        self.assertEqual([test["name"] for test in package.test_plan(metadata)], ["t"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""_parse_version ordering and the streaming scan_latest listing scanner."""
+from __future__ import annotations
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import package  # noqa: E402
+
+PATTERN = r"spark-([0-9]+\.[0-9]+\.[0-9]+(?:-preview[0-9]+|-rc[0-9]+)?)/"
+
+
+def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+class ParseVersionTest(unittest.TestCase):
+    def test_documented_order(self):
+        ordered = [
+            "4.0.0-SNAPSHOT",
+            "4.0.0-preview1",
+            "4.0.0-preview2",
+            "4.0.0rc1",
+            "4.0.0-rc2",
+            "4.0.0",
+            "4.0.0.post1",
+            "4.0.1",
+            "4.0.10",
+            "4.1",
+            "10.0",
+        ]
+        shuffled = list(ordered)
+        random.Random(7).shuffle(shuffled)
+        self.assertEqual(sorted(shuffled, key=package._parse_version), ordered)
+
+    def test_trailing_zeros_are_equal(self):
+        self.assertEqual(package._parse_version("4.0.0"), package._parse_version("4.0"))
+        self.assertEqual(package._parse_version("v2.1"), package._parse_version("2.1.0"))
+        self.assertEqual(package._parse_version("1_2_0"), package._parse_version("1.2"))
+
+    def test_phase_aliases(self):
+        key = package._parse_version
+        self.assertEqual(key("1.0a1"), key("1.0-alpha1"))
+        self.assertEqual(key("1.0b2"), key("1.0.beta.2"))
+        self.assertEqual(key("1.0-M1"), key("1.0-milestone1"))
+        self.assertLess(key("1.0-M3"), key("1.0-RC1"))
+        self.assertLess(key("1.0.dev1"), key("1.0a1"))
+
+    def test_free_form_remainders_never_raise(self):
+        values = ["1.0", "1.0-foo", "1.0-2", "1.0-foo2", "latest", "", "2024.2.0", "1.0+local.7", "1.0-bar"]
+        ordered = sorted(values, key=package._parse_version)
+        self.assertEqual(ordered[:2], ["", "latest"])
+        self.assertLess(ordered.index("1.0"), ordered.index("1.0-2"))
+        self.assertEqual(ordered[-1], "2024.2.0")
+
+    def test_numeric_suffixes_compare_as_numbers(self):
+        self.assertLess(package._parse_version("1.0-build9"), package._parse_version("1.0-build10"))
+
+    def test_version_key_matches_parse_version(self):
+        self.assertEqual(package.version_key("4.0.0rc1"), package._parse_version("4.0.0rc1"))
+
+
+class ScanLatestTest(unittest.TestCase):
+    LISTING = (
+        "<html><body><pre>\n"
+        + "".join(
+            f'<a href="spark-{v}/">spark-{v}/</a>  2024-01-01 00:00  -\n'
+            for v in ["3.5.1", "4.0.0-preview2", "4.0.0", "3.10.2", "4.0.1-rc1", "4.0.1", "3.5.7", "4.0.0-preview1"]
+        )
+        + "</pre></body></html>\n"
+    ).encode("utf-8")
+
+    def test_highest_version(self):
+        self.assertEqual(package.scan_latest([self.LISTING], PATTERN), "4.0.1")
+
+    def test_every_chunk_boundary(self):
+        # A small overlap keeps the carried window shorter than the listing, so boundaries really split matches.
+        for size in range(1, 64):
+            with self.subTest(size=size):
+                self.assertEqual(package.scan_latest(_chunks(self.LISTING, size), PATTERN, overlap=32), "4.0.1")
+
+    def test_match_at_the_very_end(self):
+        listing = b"spark-1.0.0/ spark-2.0.0/ spark-9.9.9/"
+        for size in (1, 5, 13):
+            with self.subTest(size=size):
+                self.assertEqual(package.scan_latest(_chunks(listing, size), PATTERN, overlap=16), "9.9.9")
+
+    def test_multibyte_characters_split_across_chunks(self):
+        listing = "é spark-1.2.3/ ü spark-1.10.0/ ✓".encode("utf-8")
+        for size in range(1, 8):
+            with self.subTest(size=size):
+                self.assertEqual(package.scan_latest(_chunks(listing, size), PATTERN, overlap=16), "1.10.0")
+
+    def test_pattern_without_groups_uses_the_whole_match(self):
+        self.assertEqual(package.scan_latest([b"1.2 1.10 1.9"], r"\d+\.\d+"), "1.10")
+
+    def test_agrees_with_a_full_parse_of_every_value(self):
+        rng = random.Random(11)
+        suffixes = ["", "", "", "-rc1", "-preview2", ".post1", "-SNAPSHOT", "a1"]
+        for trial in range(50):
+            values = [
+                ".".join(str(rng.randrange(12)) for _ in range(rng.randint(1, 4))) + rng.choice(suffixes)
+                for _ in range(rng.randint(1, 60))
+            ]
+            listing = "".join(f"<a>v{value}/</a>\n" for value in values).encode("utf-8")
+            with self.subTest(trial=trial):
+                latest = package.scan_latest(_chunks(listing, 37), r"v([^/<]+)/", overlap=24)
+                self.assertEqual(package._parse_version(latest), max(map(package._parse_version, values)))
+
+    def test_no_match(self):
+        self.assertIsNone(package.scan_latest(_chunks(b"<html>nothing here</html>", 4), PATTERN, overlap=8))
+        self.assertIsNone(package.scan_latest([], PATTERN))
+
+
+if __name__ == "__main__":
+    unittest.main()